@@ -0,0 +1,489 @@
+import argparse
+import hashlib
+import importlib.util
+import json
+import keyword
+import os
+import re
+import timeit
+from pathlib import Path
+
+# Compiles tema1.abi.json into plain Python encode/decode functions, one per
+# type and endpoint, so decoding a supply listing does not go through the
+# generic ABI interpreter of multiversx_sdk. The generated module is cached on
+# disk next to the ABI hash and reused across runs.
+#
+# Generated values: structs are __slots__ classes named after the ABI type,
+# simple enums are their discriminant (int), bytes-like types are bytes,
+# Address is the 32-byte public key and List<T> is a list. Variadic outputs of
+# structs are decoded one record at a time by iter_<endpoint>_output(), which
+# shares equal Address values and list items (e.g. the creator and URIs of
+# every nftSupply entry) between the records it yields.
+
+DEFAULT_ABI_PATH = Path("tema1.abi.json")
+DEFAULT_CACHE_DIR = Path(".abi_codec_cache")
+CODEGEN_VERSION = 2
+
+_UINT_SIZES = {"u8": 1, "u16": 2, "u32": 4, "u64": 8}
+_BYTES_TYPES = ("bytes", "TokenIdentifier", "EgldOrEsdtTokenIdentifier")
+
+_PRELUDE = '''\
+import struct
+
+_U32 = struct.Struct(">I")
+
+
+def _read_u32(view, offset):
+    return _U32.unpack_from(view, offset)[0], offset + 4
+
+
+def _read_nested_bytes(view, offset):
+    length = _U32.unpack_from(view, offset)[0]
+    start = offset + 4
+    end = start + length
+    if end > len(view):
+        raise ValueError("Truncated nested-encoded value")
+    return bytes(view[start:end]), end
+
+
+def _top_uint(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def _nested_bytes(value):
+    return _U32.pack(len(value)) + bytes(value)
+
+
+class Interner:
+    # Shares one object between equal values
+    def __init__(self):
+        self._values = {}
+
+    def __call__(self, value):
+        return self._values.setdefault(value, value)
+'''
+
+
+def parse_type(type_name):
+    """
+    Split an ABI type expression into (name, [arguments]),
+    e.g. "List<bytes>" -> ("List", [("bytes", [])]).
+    """
+    match = re.fullmatch(r"\s*([A-Za-z0-9_]+)\s*(?:<(.*)>)?\s*", type_name)
+    if not match:
+        raise ValueError(f"Cannot parse ABI type: {type_name}")
+    name, inner = match.group(1), match.group(2)
+    if inner is None:
+        return name, []
+
+    args = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(inner):
+        if char == "<":
+            depth += 1
+        elif char == ">":
+            depth -= 1
+        elif char == "," and depth == 0:
+            args.append(parse_type(inner[start:i]))
+            start = i + 1
+    args.append(parse_type(inner[start:]))
+    return name, args
+
+
+def _symbol(parsed):
+    name, args = parsed
+    if not args:
+        return name
+    return name + "_" + "_".join(_symbol(arg) for arg in args)
+
+
+def _field_name(name):
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+class _Compiler:
+    def __init__(self, abi_json):
+        self.abi_json = abi_json
+        self.types = abi_json.get("types", {})
+        self.lines = [_PRELUDE]
+        self.emitted = set()
+
+    def emit(self, source):
+        self.lines.append(source)
+
+    # Fixed-width types are decoded inline by their parent
+    def _inline_nested_decode(self, parsed, target):
+        name, args = parsed
+        if name in _UINT_SIZES:
+            size = _UINT_SIZES[name]
+            if size == 1:
+                return [f"{target} = view[offset]", "offset += 1"]
+            return [f"{target} = int.from_bytes(view[offset:offset + {size}], 'big')", f"offset += {size}"]
+        if name == "bool":
+            return [f"{target} = view[offset] == 1", "offset += 1"]
+        if name == "Address":
+            return [f"{target} = bytes(view[offset:offset + 32])", "offset += 32"]
+        if name in _BYTES_TYPES:
+            return [f"{target}, offset = _read_nested_bytes(view, offset)"]
+        if name in self.types and self.types[name]["type"] == "enum":
+            return [f"{target} = view[offset]", "offset += 1"]
+        self.require(parsed)
+        return [f"{target}, offset = nested_decode_{_symbol(parsed)}(view, offset)"]
+
+    def _inline_nested_encode(self, parsed, value):
+        name, args = parsed
+        if name in _UINT_SIZES:
+            return [f"out += ({value}).to_bytes({_UINT_SIZES[name]}, 'big')"]
+        if name == "bool":
+            return [f"out.append(1 if {value} else 0)"]
+        if name == "Address":
+            return [f"out += {value}"]
+        if name in _BYTES_TYPES:
+            return [f"out += _nested_bytes({value})"]
+        if name in self.types and self.types[name]["type"] == "enum":
+            return [f"out.append({value})"]
+        self.require(parsed)
+        return [f"nested_encode_{_symbol(parsed)}({value}, out)"]
+
+    def require(self, parsed):
+        symbol = _symbol(parsed)
+        if symbol in self.emitted:
+            return
+        self.emitted.add(symbol)
+        name, args = parsed
+
+        if name == "BigUint":
+            self.emit(f'''
+def nested_decode_{symbol}(view, offset):
+    value, offset = _read_nested_bytes(view, offset)
+    return int.from_bytes(value, "big"), offset
+
+
+def nested_encode_{symbol}(value, out):
+    out += _nested_bytes(_top_uint(value))
+
+
+def top_decode_{symbol}(part):
+    return int.from_bytes(part, "big")
+
+
+def top_encode_{symbol}(value):
+    return _top_uint(value)
+''')
+        elif name == "List":
+            item = args[0]
+            decode_item = "\n        ".join(self._inline_nested_decode(item, "item"))
+            encode_item = "\n        ".join(self._inline_nested_encode(item, "item"))
+            self.emit(f'''
+def nested_decode_{symbol}(view, offset):
+    count, offset = _read_u32(view, offset)
+    items = []
+    for _ in range(count):
+        {decode_item}
+        items.append(item)
+    return items, offset
+
+
+def nested_encode_{symbol}(value, out):
+    out += _U32.pack(len(value))
+    for item in value:
+        {encode_item}
+
+
+def top_decode_{symbol}(part):
+    view = memoryview(part)
+    offset = 0
+    items = []
+    while offset < len(view):
+        {decode_item}
+        items.append(item)
+    return items
+
+
+def top_encode_{symbol}(value):
+    out = bytearray()
+    for item in value:
+        {encode_item}
+    return bytes(out)
+''')
+        elif name in self.types and self.types[name]["type"] == "struct":
+            self._emit_struct(name, self.types[name])
+        else:
+            # Primitives and enums: one generic function each, used for top-level values
+            self._emit_simple(parsed)
+
+    def _emit_simple(self, parsed):
+        symbol = _symbol(parsed)
+        name, _ = parsed
+        decode = "\n    ".join(self._inline_nested_decode(parsed, "value"))
+        encode = "\n    ".join(self._inline_nested_encode(parsed, "value"))
+
+        if name in _UINT_SIZES or (name in self.types and self.types[name]["type"] == "enum"):
+            top_decode = 'return int.from_bytes(part, "big")'
+            top_encode = "return _top_uint(value)"
+        elif name == "bool":
+            top_decode = "return bytes(part) == b\"\\x01\""
+            top_encode = 'return b"\\x01" if value else b""'
+        elif name in _BYTES_TYPES or name == "Address":
+            top_decode = "return bytes(part)"
+            top_encode = "return bytes(value)"
+        else:
+            raise NotImplementedError(f"ABI type not supported by the codec compiler: {name}")
+
+        self.emit(f'''
+def nested_decode_{symbol}(view, offset):
+    {decode}
+    return value, offset
+
+
+def nested_encode_{symbol}(value, out):
+    {encode}
+
+
+def top_decode_{symbol}(part):
+    {top_decode}
+
+
+def top_encode_{symbol}(value):
+    {top_encode}
+''')
+
+    def _emit_struct(self, name, definition):
+        fields = [(_field_name(field["name"]), parse_type(field["type"])) for field in definition["fields"]]
+        names = [field for field, _ in fields]
+
+        decode_lines = []
+        encode_lines = []
+        for field, parsed in fields:
+            decode_lines += self._inline_nested_decode(parsed, field)
+            encode_lines += self._inline_nested_encode(parsed, f"value.{field}")
+        decode_body = "\n    ".join(decode_lines)
+        encode_body = "\n    ".join(encode_lines)
+        slots = ", ".join(repr(field) for field in names) + ("," if len(names) == 1 else "")
+        params = ", ".join(names)
+        assigns = "\n        ".join(f"self.{field} = {field}" for field in names)
+        fields_repr = ", ".join(f"{field}={{self.{field}!r}}" for field in names)
+
+        self.emit(f'''
+class {name}:
+    __slots__ = ({slots})
+
+    def __init__(self, {params}):
+        {assigns}
+
+    def __eq__(self, other):
+        return isinstance(other, {name}) and all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    def __repr__(self):
+        return f"{name}({fields_repr})"
+
+
+def nested_decode_{name}(view, offset):
+    {decode_body}
+    return {name}({params}), offset
+
+
+def nested_encode_{name}(value, out):
+    {encode_body}
+
+
+def top_decode_{name}(part):
+    return nested_decode_{name}(memoryview(part), 0)[0]
+
+
+def top_encode_{name}(value):
+    out = bytearray()
+    nested_encode_{name}(value, out)
+    return bytes(out)
+''')
+
+    def _emit_endpoint(self, endpoint):
+        name = endpoint["name"]
+        inputs = [(_field_name(arg["name"]), parse_type(arg["type"])) for arg in endpoint.get("inputs", [])]
+        params = ", ".join(arg for arg, _ in inputs)
+        encoded = []
+        for arg, parsed in inputs:
+            self.require(parsed)
+            encoded.append(f"top_encode_{_symbol(parsed)}({arg})")
+
+        self.emit(f'''
+def encode_{name}_args({params}):
+    return [{", ".join(encoded)}]
+''')
+
+        outputs = endpoint.get("outputs", [])
+        if not outputs:
+            self.emit(f'''
+def decode_{name}_output(parts):
+    return None
+''')
+            return
+        if len(outputs) > 1:
+            raise NotImplementedError(f"Endpoints with several outputs are not supported: {name}")
+
+        type_name, type_args = parse_type(outputs[0]["type"])
+        if type_name in ("variadic", "MultiResultVec"):
+            item = type_args[0]
+            self.require(item)
+            shared = self._shared_fields(item)
+            if shared:
+                interned = "\n        ".join(shared)
+                self.emit(f'''
+def iter_{name}_output(parts, intern=None):
+    intern = Interner() if intern is None else intern
+    for part in parts:
+        value = top_decode_{_symbol(item)}(part)
+        {interned}
+        yield value
+
+
+def decode_{name}_output(parts):
+    return list(iter_{name}_output(parts))
+''')
+                return
+            self.emit(f'''
+def iter_{name}_output(parts):
+    for part in parts:
+        yield top_decode_{_symbol(item)}(part)
+
+
+def decode_{name}_output(parts):
+    return [top_decode_{_symbol(item)}(part) for part in parts]
+''')
+        else:
+            parsed = (type_name, type_args)
+            self.require(parsed)
+            self.emit(f'''
+def decode_{name}_output(parts):
+    return top_decode_{_symbol(parsed)}(parts[0] if parts else b"")
+''')
+
+    def _shared_fields(self, parsed):
+        # Statements interning the repeatable fields of a struct record: Address
+        # fields and the items of lists of bytes-like values or addresses
+        name, args = parsed
+        definition = self.types.get(name)
+        if args or not definition or definition["type"] != "struct":
+            return []
+        hashable = _BYTES_TYPES + ("Address",)
+        statements = []
+        for field in definition["fields"]:
+            field_name = _field_name(field["name"])
+            field_type, field_args = parse_type(field["type"])
+            if field_type == "Address":
+                statements.append(f"value.{field_name} = intern(value.{field_name})")
+            elif field_type == "List" and field_args[0][0] in hashable:
+                statements.append(f"value.{field_name} = [intern(item) for item in value.{field_name}]")
+        return statements
+
+    def compile(self):
+        for type_name, definition in self.types.items():
+            if definition["type"] == "enum":
+                if any(variant.get("fields") for variant in definition["variants"]):
+                    raise NotImplementedError(f"Enums with fields are not supported: {type_name}")
+                variants = {variant["name"]: variant["discriminant"] for variant in definition["variants"]}
+                self.emit(f"\n{type_name.upper()}_VARIANTS = {variants!r}\n")
+            self.require((type_name, []))
+        for endpoint in self.abi_json.get("endpoints", []):
+            self._emit_endpoint(endpoint)
+        return "\n".join(self.lines)
+
+
+def compile_abi(abi_json):
+    """
+    Return the Python source of a codec module for the given ABI (parsed JSON).
+    """
+    return _Compiler(abi_json).compile()
+
+
+def load_codec(abi_path=DEFAULT_ABI_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Load the codec for an ABI file, compiling it only when the cached module
+    does not match the ABI contents.
+
+    Returns:
+    module: Generated module with top_decode_<Type>, encode_<endpoint>_args,
+    decode_<endpoint>_output, ... functions.
+    """
+    abi_path = Path(abi_path)
+    abi_bytes = abi_path.read_bytes()
+    digest = hashlib.sha256(abi_bytes + str(CODEGEN_VERSION).encode()).hexdigest()[:16]
+    module_path = Path(cache_dir) / f"{abi_path.name.split('.')[0]}_codec_{digest}.py"
+
+    if not module_path.exists():
+        source = compile_abi(json.loads(abi_bytes))
+        module_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = module_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(source)
+        tmp_path.replace(module_path)
+
+    spec = importlib.util.spec_from_file_location(module_path.stem, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _sample_supply(codec, count):
+    token_data = codec.EsdtTokenData(
+        token_type=1,
+        amount=1,
+        frozen=False,
+        hash=bytes(46),
+        name=b"ahmed.raza11",
+        attributes=b"tags:class8;rarity3;power2",
+        creator=bytes(32),
+        royalties=250,
+        uris=[b"https://ipfs.io/ipfs/QmSaK2Tq1R8immF4dt2gwmJAmote3bbeMY3VNPmq5TbUf2"],
+    )
+    return [codec.top_encode_EsdtTokenData(token_data) for _ in range(count)]
+
+
+def benchmark(abi_path=DEFAULT_ABI_PATH, count=1000, repeat=5):
+    """
+    Time decoding an nftSupply response of `count` items with the generated
+    codec and with the generic multiversx_sdk Abi.
+
+    Returns:
+    dict: Best time per run in seconds for each path.
+    """
+    from multiversx_sdk.abi import Abi
+
+    codec = load_codec(abi_path)
+    parts = _sample_supply(codec, count)
+    generic_abi = Abi.load(Path(abi_path))
+
+    results = {
+        "generated": min(timeit.repeat(lambda: codec.decode_nftSupply_output(parts), number=1, repeat=repeat)),
+        "generic": min(timeit.repeat(
+            lambda: generic_abi.decode_endpoint_output_parameters("nftSupply", parts), number=1, repeat=repeat
+        )),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile an ABI into a Python codec module.")
+    parser.add_argument("--abi", default=str(DEFAULT_ABI_PATH))
+    parser.add_argument("--output", help="Write the generated source here instead of the cache")
+    parser.add_argument("--bench", action="store_true", help="Compare against the generic ABI decoder")
+    parser.add_argument("--count", type=int, default=1000, help="Items per benchmark run")
+    args = parser.parse_args()
+
+    if args.output:
+        Path(args.output).write_text(compile_abi(json.loads(Path(args.abi).read_text())))
+        print(f"Codec written to {args.output}")
+    if args.bench:
+        results = benchmark(args.abi, args.count)
+        print(f"nftSupply x{args.count}: generated {results['generated'] * 1000:.2f} ms, "
+              f"generic {results['generic'] * 1000:.2f} ms "
+              f"({results['generic'] / results['generated']:.1f}x)")
+    if not args.output and not args.bench:
+        codec = load_codec(args.abi)
+        print(f"Codec cached at {codec.__file__}")
+
+
+if __name__ == "__main__":
+    main()
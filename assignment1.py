@@ -1,13 +1,19 @@
+import argparse
+import asyncio
+import cProfile
 import os
+import pstats
+import queue
+import sys
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
 from multiversx_sdk import (
     Address,
+    AddressComputer,
     Transaction,
-    ProxyNetworkProvider,
     UserSigner,
     TransactionPayload,
-    TokenPayment,
-    abi,
     TokenTransfer, SmartContractTransactionsFactory, TransactionsFactoryConfig
 )
 from multiversx_sdk import (
@@ -17,53 +23,331 @@ from multiversx_sdk import (
     TransactionComputer, TransactionsConverter
 )
 from pathlib import Path
-from multiversx_sdk.abi import Abi, AbiDefinition
+from abi_codegen import load_codec
+from gas_estimator import GasEstimator
+import instrumentation
+from instrumentation import InstrumentedProvider, increment, stage
+from nft_attributes import decode_attributes, encode_text_attributes
+from nft_catalog import NftCatalog
+from nonce_manager import NonceManager
+from query_cache import CachedQueryController, readonly_endpoints
+from sender_pool import SenderPool
+from matching_engine import match_students
+from multi_gateway import provider_for
+from signer_agent import AgentSigner
+from students import fetch_students_cards
+from supply_store import DEFAULT_DB_PATH, SupplyStore
+from traffic_control import ControlledProvider, StatusAwareProvider, TrafficController, classify_error, is_not_found
+from tx_journal import TransactionJournal
+from tx_tracker import TransactionTracker
+from multiversx_sdk.abi import Abi
 
 
 # Load environment variables
 load_dotenv()
 
 
-
 WALLET_ADDRESS = os.getenv("WALLET_ADDRESS")
 SC_ADDRESS = os.getenv("SC_ADDRESS")
+GATEWAY_URL = os.getenv("GATEWAY_URL", "https://devnet-gateway.multiversx.com")
+# Comma-separated gateways to balance over, see multi_gateway.py; overrides GATEWAY_URL
+GATEWAY_URLS = os.getenv("GATEWAY_URLS", "")
 
-if not WALLET_ADDRESS or not SC_ADDRESS:
-    raise ValueError("Environment variables WALLET_ADDRESS and SC_ADDRESS must be set.")
+abi_path = Path("tema1.abi.json")
+wallet_path = Path("output/wallet.json")
 
-# Initialize provider and signer
-abi_1 = Abi.load(Path("tema1.abi.json"))
-provider = ProxyNetworkProvider("https://devnet-gateway.multiversx.com")
-config = TransactionsFactoryConfig(chain_id="D")
-factory = SmartContractTransactionsFactory(config, abi_1)
 transaction_converter = TransactionsConverter()
 transaction_computer = TransactionComputer()
 
 
-wallet_path = Path("output/wallet.json")
-signer = UserSigner.from_wallet(wallet_path, "password")
+# Everything below is built on first use, so importing this module does not
+# decrypt the wallet, load the ABI or talk to the gateway.
 
-# Load ABI
-abi_path = Path("tema1.abi.json")
-if not abi_path.exists():
-    raise FileNotFoundError(f"ABI file not found at {abi_path}")
-contract_abi = abi.Abi.load(abi_path)
+def _require_addresses():
+    if not WALLET_ADDRESS or not SC_ADDRESS:
+        raise ValueError("Environment variables WALLET_ADDRESS and SC_ADDRESS must be set.")
 
-# Initialize query controller
-query_runner = QueryRunnerAdapter(provider)
-query_controller = SmartContractQueriesController(query_runner, contract_abi)
 
-# Get the current wallet nonce
-def get_wallet_nonce():
+# Rate limits, adaptive concurrency and retries shared by all gateway calls, see traffic_control.py
+@lru_cache(maxsize=None)
+def get_traffic_controller():
+    return TrafficController(
+        query_rate=float(os.getenv("GATEWAY_QUERY_RATE", "100")),
+        send_rate=float(os.getenv("GATEWAY_SEND_RATE", "50")),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_provider():
+    # Every gateway call is timed and counted (instrumentation.py), and goes
+    # through the traffic controller; the timings include its waits and retries
+    provider = provider_for(GATEWAY_URLS or GATEWAY_URL, provider_factory=StatusAwareProvider)
+    return InstrumentedProvider(ControlledProvider(provider, get_traffic_controller()))
+
+
+@lru_cache(maxsize=None)
+def get_abi():
+    if not abi_path.exists():
+        raise FileNotFoundError(f"ABI file not found at {abi_path}")
+    return Abi.load(abi_path)
+
+
+# Encode/decode functions generated from the ABI, see abi_codegen.py
+@lru_cache(maxsize=None)
+def get_codec():
+    return load_codec(abi_path)
+
+
+@lru_cache(maxsize=None)
+def get_factory():
+    config = TransactionsFactoryConfig(chain_id="D")
+    return SmartContractTransactionsFactory(config, get_abi())
+
+
+# Signer set through configure(), used instead of the keystore
+_configured_signer = None
+
+
+# Use a running signer agent when available so the keystore is not decrypted on every start
+def load_signer():
+    if _configured_signer is not None:
+        return _configured_signer
+    agent_socket = os.getenv("SIGNER_AGENT_SOCK")
+    if agent_socket:
+        return AgentSigner(agent_socket, WALLET_ADDRESS)
+    return UserSigner.from_wallet(wallet_path, "password")
+
+
+@lru_cache(maxsize=None)
+def get_signer():
+    _require_addresses()
+    return load_signer()
+
+
+# Token identifiers never change once issued, other readonly views use QUERY_CACHE_TTL
+QUERY_CACHE_TTLS = {"getTokenId": 3600, "tokenId": 3600}
+QUERY_CACHE_TTL = 30
+
+
+def _contract_block_nonce():
+    shard = AddressComputer().get_shard_of_address(Address.new_from_bech32(SC_ADDRESS))
+    return get_provider().get_network_status(shard).nonce
+
+
+@lru_cache(maxsize=None)
+def get_query_controller():
+    _require_addresses()
+    query_runner = QueryRunnerAdapter(get_provider())
+    query_controller = SmartContractQueriesController(query_runner, get_abi())
+
+    # Readonly views are answered from memory until the contract's shard produces a new block
+    return CachedQueryController(
+        query_controller,
+        readonly_endpoints(abi_path),
+        ttls=QUERY_CACHE_TTLS,
+        default_ttl=QUERY_CACHE_TTL,
+        block_nonce_fn=_contract_block_nonce,
+        stable_functions=QUERY_CACHE_TTLS,
+    )
+
+
+# Nonces are fetched once per sender and then handed out locally
+@lru_cache(maxsize=None)
+def get_nonce_manager():
+    return NonceManager(get_provider())
+
+
+# Local SQLite copy of the contract supply, see supply_store.py
+@lru_cache(maxsize=None)
+def get_supply_store():
+    return SupplyStore(
+        get_query_controller(),
+        SC_ADDRESS,
+        os.getenv("SUPPLY_DB", DEFAULT_DB_PATH),
+        codec=get_codec(),
+        root_hash_fn=_contract_root_hash,
+    )
+
+
+def _contract_root_hash():
+    # Storage root of the contract account; nftSupply is only downloaded when it moved
+    return get_provider().get_account(Address.new_from_bech32(SC_ADDRESS)).root_hash
+
+
+# In-memory index of the supply, updated by the store on every change (nft_catalog.py);
+# SUPPLY_INDEX=columns uses the NumPy columns of nft_columns.py instead
+@lru_cache(maxsize=None)
+def get_supply_index():
+    if os.getenv("SUPPLY_INDEX", "catalog") == "columns":
+        from nft_columns import NftColumns
+
+        index = NftColumns([], [], [], [])
+    else:
+        index = NftCatalog()
+    return get_supply_store().attach(index)
+
+
+# Simulated gas limits, cached per transaction shape; ESTIMATE_GAS=0 keeps the fixed limits
+ESTIMATE_GAS = os.getenv("ESTIMATE_GAS", "1") != "0"
+
+
+@lru_cache(maxsize=None)
+def get_gas_estimator():
+    return GasEstimator(get_provider())
+
+
+def estimate_gas_limit(transaction, function, fallback):
+    if not ESTIMATE_GAS:
+        return fallback
+    return get_gas_estimator().estimate(transaction, function, fallback)
+
+
+# Extra sending wallets, see sender_pool.py: SENDER_KEYSTORES (comma-separated
+# paths or globs, unlocked with WALLET_PASSWORD) or a multi-key SENDER_PEM
+@lru_cache(maxsize=None)
+def get_sender_pool():
+    keystores = os.getenv("SENDER_KEYSTORES")
+    pem_path = os.getenv("SENDER_PEM")
+    if keystores:
+        patterns = [pattern.strip() for pattern in keystores.split(",") if pattern.strip()]
+        return SenderPool.from_keystores(get_provider(), patterns, os.getenv("WALLET_PASSWORD", "password"))
+    if pem_path:
+        return SenderPool.from_pem(get_provider(), pem_path)
+    return None
+
+
+# Waits for sent transactions to complete, see tx_tracker.py
+@lru_cache(maxsize=None)
+def get_tracker():
+    return TransactionTracker(get_provider(), codec=get_codec())
+
+
+# Durable record of sent transactions, see tx_journal.py; off unless TX_JOURNAL names a file
+@lru_cache(maxsize=None)
+def get_journal():
+    path = os.getenv("TX_JOURNAL")
+    return TransactionJournal(path) if path else None
+
+
+def _on_network(tx_hash):
+    """
+    Whether the gateway knows a transaction, pending or executed.
+
+    Only a "not found" answer means it does not; any other failure (after the
+    traffic controller's retries) is raised, since guessing either way could
+    send a transaction twice or drop it.
+    """
     try:
-        account_address = Address.new_from_bech32(WALLET_ADDRESS)
-        account_info = provider.get_account(account_address)
-        return account_info.nonce
+        get_provider().get_transaction_status(tx_hash)
+        return True
     except Exception as e:
-        raise RuntimeError(f"Error getting wallet nonce: {e}")
+        if is_not_found(e):
+            return False
+        raise RuntimeError(f"Error checking transaction {tx_hash}: {e}")
+
+
+_LAZY_ATTRIBUTES = {
+    "traffic_controller": get_traffic_controller,
+    "provider": get_provider,
+    "contract_abi": get_abi,
+    "codec": get_codec,
+    "factory": get_factory,
+    "signer": get_signer,
+    "query_controller": get_query_controller,
+    "nonce_manager": get_nonce_manager,
+    "supply_store": get_supply_store,
+    "supply_index": get_supply_index,
+    "gas_estimator": get_gas_estimator,
+    "sender_pool": get_sender_pool,
+    "tracker": get_tracker,
+    "journal": get_journal,
+}
+
+
+def configure(gateway_url=None, wallet_address=None, sc_address=None, signer=None, gateway_urls=None):
+    """
+    Point the module at another gateway, wallet or contract (for example a
+    mock gateway) and drop every client built so far.
+
+    Parameters:
+    signer: Object with sign(bytes) used instead of the keystore.
+    gateway_urls (list | None): Several gateways to balance over instead of gateway_url.
+    """
+    global GATEWAY_URL, GATEWAY_URLS, WALLET_ADDRESS, SC_ADDRESS, _configured_signer
+    if gateway_url or gateway_urls:
+        GATEWAY_URLS = ",".join(gateway_urls or [])
+    GATEWAY_URL = gateway_url or GATEWAY_URL
+    WALLET_ADDRESS = wallet_address or WALLET_ADDRESS
+    SC_ADDRESS = sc_address or SC_ADDRESS
+    _configured_signer = signer or _configured_signer
+    for getter in _LAZY_ATTRIBUTES.values():
+        getter.cache_clear()
+
+
+# Keep `assignment1.provider`, `assignment1.signer`, ... working for callers
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Get the next wallet nonce
+def get_wallet_nonce():
+    _require_addresses()
+    return get_nonce_manager().get_nonce(WALLET_ADDRESS)
 
 # Mint an NFT Collection
 
+NFT_ROYALTIES = 250  # Example: 2.5% royalties (250 = 2.5%)
+NFT_HASH_HEX = "516d53614b325471315238696d6d463464743267776d4a416d6f7465336262654d5933564e506d71355462556632"  # IPFS hash example
+NFT_CREATE_GAS_LIMIT = 60000000
+
+
+def build_nft_create_data(nft_name, ticker, nft_class, rarity, power, img_uri):
+    """
+    Build the ESDTNFTCreate data field for one NFT.
+
+    Returns:
+    str: Transaction data, e.g. "ESDTNFTCreate@<ticker>@01@<name>@...".
+    """
+    # Encode all data fields into hexadecimal
+    name_hex = nft_name.encode().hex()
+    ticker_hex = ticker.encode().hex()
+    quantity_hex = f"{1:02x}"  # Quantity is 1 for NFTs
+    royalties_hex = f"{NFT_ROYALTIES:04x}"
+    attributes_hex = encode_text_attributes(nft_class, rarity, power).hex()
+    img_uri_hex = img_uri.encode().hex()
+
+    # Construct the transaction data
+    return (
+        f"ESDTNFTCreate@{ticker_hex}"
+        f"@{quantity_hex}"
+        f"@{name_hex}"
+        f"@{royalties_hex}"
+        f"@{NFT_HASH_HEX}"
+        f"@{attributes_hex}"
+        f"@{img_uri_hex}"
+    )
+
+
+def build_nft_create_transaction(tx_data, nonce, sender_address=None):
+    payload = TransactionPayload.from_str(tx_data)
+    sender_address = sender_address or WALLET_ADDRESS
+
+    # Create the transaction where sender and receiver are the same wallet address
+    transaction = Transaction(
+        sender=Address.from_bech32(sender_address).bech32(),
+        receiver=Address.from_bech32(sender_address).bech32(),
+        value=0,  # No EGLD should be sent (a plain int, so the transaction hash can be computed locally)
+        data=payload.data,
+        gas_limit=NFT_CREATE_GAS_LIMIT,  # Upper bound, replaced by the estimate below
+        chain_id="D",  # Set the correct chain ID (Devnet or Mainnet)
+        nonce=nonce,
+    )
+    transaction.gas_limit = estimate_gas_limit(transaction, "ESDTNFTCreate", NFT_CREATE_GAS_LIMIT)
+    return transaction
+
+
 def create_nft(nft_name, ticker, nft_class, rarity, power, img_uri):
     """
     Function to create an NFT with dynamic attributes and include an image URI.
@@ -76,158 +360,529 @@ def create_nft(nft_name, ticker, nft_class, rarity, power, img_uri):
     power (int): Power of the NFT (1 byte).
     img_uri (str): Image URI for the NFT.
 
+    With a journal (TX_JOURNAL), the mint is journaled under
+    "mint:TICKER:ADDRESS:NONCE:NAME" before it is sent, like the records of
+    create_nft_many().
+
     Returns:
     str: Transaction hash of the submitted transaction.
     """
+    journal = get_journal()
+    key = None
+    wallet_nonce = None
+    sent = False
     try:
-        nonce = get_wallet_nonce()
-
-        # Dynamically construct the attributes string in hexadecimal format
-        attributes = f"tags:class{nft_class};rarity{rarity};power{power}"
-
-        # Encode all data fields into hexadecimal
-        name_hex = nft_name.encode().hex()
-        ticker_hex = ticker.encode().hex()
-        quantity_hex = f"{1:02x}"  # Quantity is 1 for NFTs
-        royalties_hex = f"{250:04x}"  # Example: 2.5% royalties (250 = 2.5%)
-        hash_hex = "516d53614b325471315238696d6d463464743267776d4a416d6f7465336262654d5933564e506d71355462556632"  # IPFS hash example
-        attributes_hex = attributes.encode().hex()
-        img_uri_hex = img_uri.encode().hex()
-
-        # Construct the transaction data
-        tx_data = (
-            f"ESDTNFTCreate@{ticker_hex}"
-            f"@{quantity_hex}"
-            f"@{name_hex}"
-            f"@{royalties_hex}"
-            f"@{hash_hex}"
-            f"@{attributes_hex}"
-            f"@{img_uri_hex}"
-        )
+        with stage("encode"):
+            tx_data = build_nft_create_data(nft_name, ticker, nft_class, rarity, power, img_uri)
+        instrumentation.debug("Transaction Data: %s", tx_data)
 
-        # Log the data for debugging
-        print("Transaction Data:", tx_data)
-
-        payload = TransactionPayload.from_str(tx_data)
-
-        # Create the transaction where sender and receiver are the same wallet address
-        transaction = Transaction(
-            sender=Address.from_bech32(WALLET_ADDRESS).bech32(),
-            receiver=Address.from_bech32(WALLET_ADDRESS).bech32(),
-            value=TokenPayment.egld_from_amount(0),  # No EGLD should be sent
-            data=payload.data,
-            gas_limit=60000000,  # Adjust the gas limit as needed
-            chain_id="D",  # Set the correct chain ID (Devnet or Mainnet)
-            nonce=nonce,
-        )
+        if journal is not None:
+            # Never reuse a nonce a previous run signed, even if it has not executed yet
+            next_nonce = journal.next_nonce(WALLET_ADDRESS)
+            if next_nonce is not None:
+                get_nonce_manager().skip_to(WALLET_ADDRESS, next_nonce)
+        wallet_nonce = get_wallet_nonce()
+        transaction = build_nft_create_transaction(tx_data, wallet_nonce)
 
         # Sign the transaction and submit it
-        transaction_computer = TransactionComputer()
-        signable_bytes = transaction_computer.compute_bytes_for_signing(transaction)
-        transaction.signature = signer.sign(signable_bytes)
-        tx_hash = provider.send_transaction(transaction)
-        print(f"Transaction submitted. TX Hash: {tx_hash}")
-        return tx_hash
+        with stage("sign"):
+            signable_bytes = transaction_computer.compute_bytes_for_signing(transaction)
+            transaction.signature = get_signer().sign(signable_bytes)
+        if journal is not None:
+            key = f"mint:{ticker}:{WALLET_ADDRESS}:{wallet_nonce}:{nft_name}"
+            journal.record(key, "signed", transaction=transaction, sender=WALLET_ADDRESS, nonce=wallet_nonce,
+                           hash=transaction_computer.compute_transaction_hash(transaction).hex(),
+                           function="ESDTNFTCreate")
+            journal.sync()
+        sent = True
+        with stage("submit"):
+            tx_hash = get_provider().send_transaction(transaction)
     except Exception as e:
+        # Give the nonce back unless the gateway may have accepted the transaction
+        _send_failed(journal, key, None, wallet_nonce, e, sent)
         raise RuntimeError(f"Error creating NFT: {e}")
+    instrumentation.info("Transaction submitted. TX Hash: %s", tx_hash)
+    if journal is not None:
+        journal.record(key, "submitted", hash=tx_hash)
+    return tx_hash
+
+
+# Mint many NFTs through an encode -> sign -> submit pipeline
+
+_PIPELINE_DONE = object()
+
+
+def create_nft_many(records, ticker, chunk_size=100, queue_size=1000, flush_interval=0.5, batch_signer=None,
+                    sender_pool=None, journal=None):
+    """
+    Mint many NFTs from one wallet, or spread over the wallets of a sender pool.
+
+    Records are streamed through separate encode, sign and submit threads
+    connected by bounded queues, so a slow gateway holds back encoding instead
+    of buffering the whole collection in memory. Signed transactions are sent
+    in chunks through the gateway's multi-transaction endpoint.
+
+    Once a chunk is rejected the remaining records are not sent, since their
+    nonces would sit behind a gap; they are reported with an error instead.
+
+    With a journal, every record is journaled under "mint:TICKER:INDEX:NAME".
+    Calling again with the same records after a crash resumes the run:
+    submitted records are reported from the journal, signed ones are re-sent
+    as they were unless the gateway already has them, and the rest are built
+    afresh with nonces past everything signed before.
+
+    Parameters:
+    records (iterable): (nft_name, nft_class, rarity, power, img_uri) tuples.
+    ticker (str): Ticker of the NFT collection.
+    chunk_size (int): Transactions per send-multiple request.
+    queue_size (int): Capacity of each queue between stages.
+    flush_interval (float): Seconds to wait for a full chunk before sending a partial one.
+    batch_signer (BatchSigner | None): Sign chunks on a process pool instead of inline.
+    sender_pool (SenderPool | None): Send each NFT from the least-loaded wallet
+        of the pool (each needs the ESDTRoleNFTCreate role on the collection).
+    journal (TransactionJournal | None): Defaults to get_journal().
+
+    Returns:
+    list: One {"tx_hash": str | None, "error": str | None} dict per record,
+    in input order; with a sender pool, sent ones also name their "sender".
+    """
+    if batch_signer is not None and sender_pool is not None:
+        raise ValueError("A BatchSigner holds a single key and cannot sign for a sender pool")
+    signer = get_signer() if batch_signer is None and sender_pool is None else None
+    provider = get_provider()
+    journal = journal if journal is not None else get_journal()
+    journal_keys = {}
+    if journal is not None:
+        # Never reuse a nonce a previous run signed, even if it has not executed yet
+        if sender_pool is None:
+            nonce_streams = [(WALLET_ADDRESS, get_nonce_manager())]
+        else:
+            nonce_streams = [(sender.address, sender.nonces) for sender in sender_pool.senders]
+        for address, nonces in nonce_streams:
+            next_nonce = journal.next_nonce(address)
+            if next_nonce is not None:
+                nonces.skip_to(address, next_nonce)
+    results = []
+    results_lock = threading.Lock()
+    aborted = threading.Event()
+    sign_queue = queue.Queue(maxsize=queue_size)
+    submit_queue = queue.Queue(maxsize=queue_size)
+
+    def set_result(index, tx_hash=None, error=None, sender=None):
+        result = {"tx_hash": tx_hash, "error": error}
+        if sender is not None:
+            result["sender"] = sender
+        with results_lock:
+            results[index] = result
+
+    def journal_record(index, state, **fields):
+        key = journal_keys.get(index)
+        if key is not None:
+            journal.record(key, state, **fields)
+
+    def resume(index, key):
+        # True if the journal shows this record already went out (or queues its signed transaction again)
+        entry = journal.get(key)
+        if entry is None or entry["state"] not in ("signed", "submitted", "confirmed"):
+            return False
+        sender_address = entry.get("sender") if sender_pool is not None else None
+        if entry["state"] == "signed":
+            try:
+                on_network = _on_network(entry["hash"])
+            except RuntimeError as e:
+                # Unknown whether it went out: stop here rather than risk sending it twice
+                aborted.set()
+                set_result(index, error=str(e))
+                return True
+            if not on_network:
+                increment("journal_resent")
+                sign_queue.put((index, journal.transaction(entry), None))
+                return True
+            journal.record(key, "submitted")
+        increment("journal_skipped")
+        set_result(index, tx_hash=entry["hash"], sender=sender_address)
+        return True
+
+    def release(sender):
+        if sender is not None:
+            sender_pool.release(sender)
+
+    def give_back(transaction):
+        # The transaction never reached the gateway: its nonce can be used again
+        nonces = get_nonce_manager() if sender_pool is None else sender_pool.get(transaction.sender).nonces
+        nonces.release(transaction.sender, transaction.nonce)
+
+    def encode_stage():
+        try:
+            for index, record in enumerate(records):
+                with results_lock:
+                    results.append(None)
+                if aborted.is_set():
+                    set_result(index, error="Skipped after an earlier submit failure")
+                    continue
+                if journal is not None:
+                    journal_keys[index] = f"mint:{ticker}:{index}:{record[0]}"
+                    if resume(index, journal_keys[index]):
+                        continue
+                sender = sender_pool.acquire() if sender_pool is not None else None
+                try:
+                    with stage("encode"):
+                        nft_name, nft_class, rarity, power, img_uri = record
+                        tx_data = build_nft_create_data(nft_name, ticker, nft_class, rarity, power, img_uri)
+                        if sender is None:
+                            transaction = build_nft_create_transaction(tx_data, get_wallet_nonce())
+                        else:
+                            transaction = build_nft_create_transaction(tx_data, sender.next_nonce(), sender.address)
+                except Exception as e:
+                    release(sender)
+                    set_result(index, error=f"Error encoding NFT: {e}")
+                    continue
+                if journal is not None:
+                    journal_record(index, "built", sender=transaction.sender, nonce=transaction.nonce,
+                                   function="ESDTNFTCreate")
+                sign_queue.put((index, transaction, sender))
+        finally:
+            sign_queue.put(_PIPELINE_DONE)
+
+    def sign_stage():
+        while True:
+            item = sign_queue.get()
+            if item is _PIPELINE_DONE:
+                submit_queue.put(_PIPELINE_DONE)
+                return
+            index, transaction, sender = item
+            if transaction.signature:
+                # Re-sent from the journal as it was signed before
+                submit_queue.put(item)
+                continue
+            try:
+                with stage("sign"):
+                    signable_bytes = transaction_computer.compute_bytes_for_signing(transaction)
+                    transaction.signature = (signer if sender is None else sender.signer).sign(signable_bytes)
+            except Exception as e:
+                aborted.set()
+                release(sender)
+                give_back(transaction)
+                journal_record(index, "failed", error=str(e))
+                set_result(index, error=f"Error signing NFT: {e}")
+                continue
+            record_signed(index, transaction)
+            submit_queue.put(item)
+
+    def record_signed(index, transaction):
+        if index in journal_keys:
+            tx_hash = transaction_computer.compute_transaction_hash(transaction).hex()
+            journal.record(journal_keys[index], "signed", transaction=transaction, hash=tx_hash)
+
+    def sign_batch(batch):
+        try:
+            with stage("sign", mode="batch"):
+                batch_signer.sign_transactions([transaction for _, transaction, _ in batch if not transaction.signature])
+        except Exception as e:
+            aborted.set()
+            for index, transaction, sender in batch:
+                release(sender)
+                give_back(transaction)
+                journal_record(index, "failed", error=str(e))
+                set_result(index, error=f"Error signing NFT: {e}")
+            return
+        for index, transaction, _ in batch:
+            record_signed(index, transaction)
+        for item in batch:
+            submit_queue.put(item)
+
+    def batch_sign_stage():
+        # Same as sign_stage, but hands whole chunks to the process pool
+        batch = []
+        while True:
+            try:
+                item = sign_queue.get(timeout=flush_interval)
+            except queue.Empty:
+                if batch:
+                    sign_batch(batch)
+                    batch = []
+                continue
+            if item is _PIPELINE_DONE:
+                break
+            batch.append(item)
+            if len(batch) >= chunk_size:
+                sign_batch(batch)
+                batch = []
+        if batch:
+            sign_batch(batch)
+        submit_queue.put(_PIPELINE_DONE)
+
+    def submit_chunk(chunk):
+        if aborted.is_set():
+            for index, transaction, sender in chunk:
+                release(sender)
+                give_back(transaction)
+                set_result(index, error="Skipped after an earlier submit failure")
+            return
+        if journal is not None:
+            # Write-ahead: the signed transactions are on disk before they leave
+            journal.sync()
+        maybe_accepted = False
+        try:
+            with stage("submit", mode="batch"):
+                _, tx_hashes = provider.send_transactions([tx for _, tx, _ in chunk])
+        except Exception as e:
+            # Set when a multi-gateway send failed for some senders of the chunk only
+            tx_hashes = getattr(e, "tx_hashes", None) or {}
+            # After a timeout the gateway may still have taken the chunk; its nonces stay spent
+            maybe_accepted = classify_error(e) in ("timeout", "unavailable")
+            instrumentation.error("Error sending transactions: %s", e)
+        for position, (index, transaction, sender) in enumerate(chunk):
+            release(sender)
+            tx_hash = tx_hashes.get(str(position))
+            sender_address = transaction.sender if sender_pool is not None else None
+            if tx_hash:
+                increment("transactions_submitted")
+                journal_record(index, "submitted", hash=tx_hash)
+                set_result(index, tx_hash=tx_hash, sender=sender_address)
+            else:
+                increment("transactions_rejected")
+                aborted.set()
+                if not maybe_accepted:
+                    give_back(transaction)
+                journal_record(index, "failed", error="Transaction was not accepted by the gateway")
+                set_result(index, error="Transaction was not accepted by the gateway")
+
+    def submit_stage():
+        chunk = []
+        while True:
+            try:
+                item = submit_queue.get(timeout=flush_interval)
+            except queue.Empty:
+                # Upstream is slower than the gateway, send what we have
+                if chunk:
+                    submit_chunk(chunk)
+                    chunk = []
+                continue
+            if item is _PIPELINE_DONE:
+                break
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                submit_chunk(chunk)
+                chunk = []
+        if chunk:
+            submit_chunk(chunk)
+
+    sign = batch_sign_stage if batch_signer is not None else sign_stage
+    threads = [threading.Thread(target=target, daemon=True) for target in (encode_stage, sign, submit_stage)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if journal is not None:
+        journal.sync()
+    if aborted.is_set():
+        # Unsent nonces were given back above; catch up with what the gateway executed
+        if sender_pool is not None:
+            sender_pool.resync_nonces()
+        else:
+            try:
+                get_nonce_manager().resync(WALLET_ADDRESS)
+            except RuntimeError as e:
+                instrumentation.warning("Could not resync nonce of %s: %s", WALLET_ADDRESS, e)
+
+    return results
 
 
 
 
 # Query NFT properties from the SC
+def _create_nft_properties_query():
+    contract_address = Address.new_from_bech32(SC_ADDRESS)
+    return get_query_controller().create_query(
+        contract=contract_address.bech32(),
+        function="getYourNftCardProperties",
+        arguments=[],
+    )
+
+
+def _nft_properties_from_response(response):
+    # Decoded by the codec compiled from the ABI, enums come back as discriminants
+    with stage("decode", endpoint="getYourNftCardProperties"):
+        nft_properties = get_codec().decode_getYourNftCardProperties_output(response.return_data_parts)
+    instrumentation.debug("NFT properties: %s", nft_properties)
+
+    return [nft_properties.class_, nft_properties.rarity, nft_properties.power]
+
+
 def get_your_nft_properties():
     try:
-        contract_address = Address.new_from_bech32(SC_ADDRESS)
-        query = query_controller.create_query(
-            contract=contract_address.bech32(),
-            function="getYourNftCardProperties",
-            arguments=[],
-        )
-        response = query_controller.run_query(query)
-        raw_data_parts = query_controller.parse_query_response(response)
-        print(f"Raw NFT properties: {raw_data_parts}")
+        response = get_query_controller().run_query(_create_nft_properties_query())
+        return _nft_properties_from_response(response)
+    except Exception as e:
+        raise RuntimeError(f"Error getting NFT properties: {e}")
 
-        # Access the attributes directly from the SimpleNamespace object
-        nft_properties = raw_data_parts[0]
-        rarity = nft_properties.rarity.__discriminant__
-        class_id = getattr(nft_properties, 'class').__discriminant__
-        power = nft_properties.power.__discriminant__
 
-        return [class_id, rarity, power]
+async def get_your_nft_properties_async(async_provider):
+    try:
+        response = await _controlled_async(async_provider).run_query(_create_nft_properties_query())
+        return _nft_properties_from_response(response)
     except Exception as e:
         raise RuntimeError(f"Error getting NFT properties: {e}")
 
 # Query available NFTs
 
 
-def query_available_nfts():
+def _create_nft_supply_query():
+    contract_address = Address.new_from_bech32(SC_ADDRESS)
+    return get_query_controller().create_query(
+        contract=contract_address.bech32(),
+        function="nftSupply",
+        arguments=[],
+    )
+
+
+def query_available_nfts(stream=False):
+    """
+    The NFTs listed by nftSupply, as dicts with their position as "nonce".
+
+    Parameters:
+    stream (bool): Return a generator decoding one NFT at a time instead of
+        a list, so the caller can start (or stop) before the whole supply is
+        decoded; see iter_available_nfts(). Decoding errors are then raised
+        while iterating.
+    """
     try:
-        contract_address = Address.new_from_bech32(SC_ADDRESS)
-        query = query_controller.create_query(
-            contract=contract_address.bech32(),
-            function="nftSupply",
-            arguments=[],
-        )
-        response = query_controller.run_query(query)
-        raw_data_parts = query_controller.parse_query_response(response)
-        print(f"Raw data parts for available NFTs: {raw_data_parts}")
-
-        nfts = []
-        nonce = 1  # Start nonce at 1
-
-        for idx, part in enumerate(raw_data_parts, start=1):
-            print(f"Processing part: {part}")
-
-            # Access the attributes directly from the SimpleNamespace object
-            for nft in part:
-                print(f"NFT object: {vars(nft)}")
-                attributes = nft.attributes
-                if isinstance(attributes, bytes):
-                    print(f"Attributes bytes: {attributes}")
-                    try:
-                        # Assuming the first byte is rarity, second byte is class, third byte is power
-                        rarity = attributes[0]
-                        class_ = attributes[1]
-                        power = attributes[2]
-                    except IndexError:
-                        print(f"Error extracting attributes from: {attributes}")
-                        continue
-                else:
-                    print(f"Attributes are not in bytes format: {attributes}")
-                    continue
-                
-                token_id = nft.hash.hex() if nft.hash else None  # Check if hash exists
-                if not token_id:
-                    print(f"Missing token_id for NFT: {nft.name}")
-                    continue  # Skip this NFT if it doesn't have a token ID
-                
-                print(f"Token ID: {token_id}, Rarity: {rarity}, Class: {class_}, Power: {power}")
-
-                # Debug print the nonce value before adding the NFT
-                print(f"Adding NFT with nonce: {nonce}")
-
-                # Only append the NFT if all required attributes are valid
-                if token_id and rarity is not None and class_ is not None and power is not None:
-                    nfts.append({
-                        "nonce": nonce,  # Adding nonce starting from 1
-                        "token_id": token_id,
-                        "rarity": rarity,
-                        "class": class_,
-                        "power": power
-                    })
-                else:
-                    print(f"Skipping NFT with invalid attributes: {nft.name}")
-                
-                nonce += 1  # Increment nonce after processing each NFT
-
-        return nfts
+        response = get_query_controller().run_query(_create_nft_supply_query())
+        if stream:
+            return iter_available_nfts(response)
+        return _nfts_from_response(response)
     except Exception as e:
         raise RuntimeError(f"Error querying available NFTs: {e}")
 
 
+async def query_available_nfts_async(async_provider):
+    try:
+        response = await _controlled_async(async_provider).run_query(_create_nft_supply_query())
+        return _nfts_from_response(response)
+    except Exception as e:
+        raise RuntimeError(f"Error querying available NFTs: {e}")
+
+
+def query_available_nfts_cached(max_age=None):
+    """
+    Same result shape as query_available_nfts(), served from the local supply
+    store after pulling any nonces minted since the last sync.
+
+    Parameters:
+    max_age (float | None): Skip the sync if the store was synced less than this many seconds ago.
+    """
+    try:
+        store = get_supply_store()
+        store.sync(max_age=max_age)
+        return store.available_nfts()
+    except Exception as e:
+        raise RuntimeError(f"Error querying available NFTs: {e}")
+
+
+def available_supply(max_age=None):
+    """
+    The supply as an NftCatalog (or NftColumns), after syncing the local
+    store. The store pushes every change into the same index, so it is
+    never rebuilt; use it under get_supply_store().locked() while exchanges
+    run on other threads.
+
+    Parameters:
+    max_age (float | None): Skip the sync if the store was synced less than this many seconds ago.
+    """
+    try:
+        get_supply_store().sync(max_age=max_age)
+        return get_supply_index()
+    except Exception as e:
+        raise RuntimeError(f"Error querying available NFTs: {e}")
+
+
+def iter_available_nfts(response):
+    """
+    Decode an nftSupply response lazily, one NFT dict at a time, so callers
+    can start working before the whole supply has been decoded.
+    """
+    nonce = 1  # Start nonce at 1
+
+    for nft in get_codec().iter_nftSupply_output(response.return_data_parts):
+        # Accepts both the minted text layout and the raw byte layout
+        properties = decode_attributes(nft.attributes)
+        if properties is None:
+            increment("nfts_skipped", reason="attributes")
+            if instrumentation.DEBUG:
+                instrumentation.debug("Error extracting attributes from: %s", nft.attributes)
+            continue
+        class_, rarity, power = properties
+
+        token_id = nft.hash.hex() if nft.hash else None  # Check if hash exists
+        if not token_id:
+            increment("nfts_skipped", reason="token_id")
+            if instrumentation.DEBUG:
+                instrumentation.debug("Missing token_id for NFT: %s", nft.name)
+            continue  # Skip this NFT if it doesn't have a token ID
+
+        yield {
+            "nonce": nonce,  # Adding nonce starting from 1
+            "token_id": token_id,
+            "rarity": rarity,
+            "class": class_,
+            "power": power
+        }
+        nonce += 1  # Increment nonce after processing each NFT
+
+
+def _nfts_from_response(response):
+    with stage("decode", endpoint="nftSupply"):
+        return list(iter_available_nfts(response))
+
+
+
+# Query the card every registered student needs
+def query_students_cards(**kwargs):
+    """
+    Address -> CardProperties for every student in studentsAddresses.
+    Keyword arguments are passed to students.fetch_students_cards().
+    """
+    try:
+        return fetch_students_cards(get_query_controller(), SC_ADDRESS, codec=get_codec(), **kwargs)
+    except Exception as e:
+        raise RuntimeError(f"Error querying students cards: {e}")
+
+
+# Assign an available NFT to every student at once
+def plan_exchanges(supply=None, max_age=None, **kwargs):
+    """
+    Match every student's card against the whole supply, see matching_engine.py.
+
+    Parameters:
+    supply (list | NftCatalog | NftColumns | None): Available NFTs with their
+        token nonces; the index of available_supply() if None. nftSupply
+        alone does not carry token nonces, so query_available_nfts() results
+        are not suitable here.
+    max_age (float | None): Passed to available_supply().
+    Keyword arguments are passed to query_students_cards().
+
+    Returns:
+    Matching: .assignments carry the exchangeNft nonce for each student.
+    """
+    demands = query_students_cards(**kwargs)
+    if supply is not None:
+        with stage("match"):
+            return match_students(demands, supply)
+    index = available_supply(max_age=max_age)
+    # Exchanges sent meanwhile update the index through the store
+    with stage("match"), get_supply_store().locked():
+        return match_students(demands, index)
+
 
 # Find a matching NFT
 def find_matching_nft(nfts, target_properties):
+    # NftCatalog and NftColumns answer from an index or vectorized filter
+    # instead of scanning the whole supply
+    if hasattr(nfts, "find") and not isinstance(nfts, list):
+        return nfts.find(nft_class=target_properties["class"], rarity=target_properties["rarity"])
+
     for nft in nfts:
         if (
             nft["class"] == target_properties["class"] and
@@ -238,80 +893,315 @@ def find_matching_nft(nfts, target_properties):
 
 # Trade an NFT
 
-def create_and_trade_nft(nonce):
-    try:
-        # Corrected function call with the correct nonce
-        tx_data = f"exchangeNft@{nonce:02x}"
-        payload = TransactionPayload.from_str(tx_data)
+EXCHANGE_GAS_LIMIT = 6000000
+
+
+EXCHANGE_PAYMENT_TOKEN = "AHMEDRAZA-4fc0cb-03"
 
-        # NFT payment (TokenPayment) is required as part of the transaction
-        nft_payment = Token("AHMEDRAZA-4fc0cb-03"     
-        )
-        transfer = TokenTransfer(
-            token=nft_payment, 
-            amount=1,       
-        ) 
-        transaction = factory.create_transaction_for_execute(
-            sender=Address.from_bech32(WALLET_ADDRESS),  
-            contract=Address.from_bech32(SC_ADDRESS),  
-            function="exchangeNft",  
-            gas_limit=6000000, 
-            arguments=[nonce],  
-            token_transfers=[transfer],  
-        )
 
-        # Print transaction details
-        print("Transaction:", transaction_converter.transaction_to_dictionary(transaction))
-        print("Transaction data:", transaction.data.decode())
+def build_exchange_transaction(nonce, wallet_nonce, payment_token=EXCHANGE_PAYMENT_TOKEN, sender=None):
+    # sender: a sender_pool.Sender paying with its own NFT, or None for the main wallet
+    # NFT payment (TokenPayment) is required as part of the transaction
+    nft_payment = Token(payment_token)
+    transfer = TokenTransfer(
+        token=nft_payment, 
+        amount=1,       
+    ) 
+    transaction = get_factory().create_transaction_for_execute(
+        sender=Address.from_bech32(WALLET_ADDRESS if sender is None else sender.address),  
+        contract=Address.from_bech32(SC_ADDRESS),  
+        function="exchangeNft",  
+        gas_limit=EXCHANGE_GAS_LIMIT, 
+        arguments=[nonce],  
+        token_transfers=[transfer],  
+    )
+    transaction.nonce = wallet_nonce
+    transaction.gas_limit = estimate_gas_limit(transaction, "exchangeNft", EXCHANGE_GAS_LIMIT)
 
-        # Sign and send the transaction
+    # Transaction details, only built when debug tracing is on
+    if instrumentation.DEBUG:
+        instrumentation.debug("Transaction: %s", transaction_converter.transaction_to_dictionary(transaction))
+        instrumentation.debug("Transaction data: %s", transaction.data.decode())
+
+    # Sign the transaction
+    with stage("sign"):
         signable_bytes = transaction_computer.compute_bytes_for_signing(transaction)
-        transaction.signature = signer.sign(signable_bytes)
+        transaction.signature = (get_signer() if sender is None else sender.signer).sign(signable_bytes)
+    return transaction
+
+
+def _exchange_key(nonce, sender):
+    return f"exchange:{WALLET_ADDRESS if sender is None else sender.address}:{nonce}"
+
+
+def _journaled_exchange(journal, key):
+    # Hash of the exchange if a previous run already sent it, else None
+    entry = journal.get(key)
+    if entry is not None and entry["state"] == "signed" and _on_network(entry["hash"]):
+        # Sent by a run that stopped before recording it
+        journal.record(key, "submitted")
+        entry["state"] = "submitted"
+    if entry is not None and entry["state"] in ("submitted", "confirmed"):
+        instrumentation.info("Exchange already submitted. TX Hash: %s", entry["hash"])
+        return entry["hash"]
+    return None
+
+
+def _exchange_nonce(sender):
+    return get_wallet_nonce() if sender is None else sender.next_nonce()
+
+
+def _sign_exchange(journal, key, nonce, wallet_nonce, payment_token, sender):
+    transaction = build_exchange_transaction(nonce, wallet_nonce, payment_token, sender)
+    if journal is not None:
+        tx_hash = transaction_computer.compute_transaction_hash(transaction).hex()
+        journal.record(key, "signed", transaction=transaction, sender=WALLET_ADDRESS if sender is None else sender.address,
+                       nonce=wallet_nonce, hash=tx_hash, function="exchangeNft")
+        journal.sync()
+    return transaction
+
+
+def _exchange_submitted(journal, key, nonce, tx_hash):
+    instrumentation.info("Transaction submitted. TX Hash: %s", tx_hash)
+    if journal is not None:
+        journal.record(key, "submitted", hash=tx_hash)
+
+    # Our exchange changes the contract state, drop cached views of it
+    get_query_controller().invalidate(SC_ADDRESS)
+
+    # Keep the local supply copy in step if this process is using it
+    if get_supply_store.cache_info().currsize:
+        get_supply_store().mark_exchanged(nonce)
+
+
+def _send_failed(journal, key, sender, wallet_nonce, error, sent):
+    if journal is not None and key is not None:
+        entry = journal.get(key)
+        # A send that timed out may still have reached the gateway; leave it to the next run to check
+        maybe_sent = sent and classify_error(error) in ("timeout", "unavailable")
+        if entry is not None and entry["state"] == "signed" and not maybe_sent:
+            journal.record(key, "failed", error=str(error))
+    if sender is None:
+        get_nonce_manager().send_failed(WALLET_ADDRESS, wallet_nonce, error, sent)
+    else:
+        sender.nonces.send_failed(sender.address, wallet_nonce, error, sent)
+
+
+def create_and_trade_nft(nonce, sender=None, payment_token=EXCHANGE_PAYMENT_TOKEN):
+    # With a journal (TX_JOURNAL), an exchange for the same contract NFT is only ever sent once
+    journal = get_journal()
+    key = _exchange_key(nonce, sender)
+    if journal is not None:
+        tx_hash = _journaled_exchange(journal, key)
+        if tx_hash:
+            return tx_hash
+    wallet_nonce = None
+    sent = False
+    try:
+        wallet_nonce = _exchange_nonce(sender)
+        transaction = _sign_exchange(journal, key, nonce, wallet_nonce, payment_token, sender)
 
         # Send the transaction
-        tx_hash = provider.send_transaction(transaction)
-        print(f"Transaction submitted. TX Hash: {tx_hash}")
-        return tx_hash
+        sent = True
+        with stage("submit"):
+            tx_hash = get_provider().send_transaction(transaction)
+    except Exception as e:
+        _send_failed(journal, key, sender, wallet_nonce, e, sent)
+        raise RuntimeError(f"Error creating and trading NFT: {e}")
+    _exchange_submitted(journal, key, nonce, tx_hash)
+    return tx_hash
+
+
+def create_async_provider():
+    """
+    asyncio provider for the *_async functions: one pooled keep-alive session
+    per configured gateway (several are balanced as in get_provider()).
+    Use it with `async with` so the sessions are closed.
+    """
+    from async_provider import AsyncProxyNetworkProvider
+
+    return provider_for(GATEWAY_URLS or GATEWAY_URL, provider_factory=AsyncProxyNetworkProvider)
+
 
+def _controlled_async(async_provider):
+    # The traffic controller and instrumentation of get_provider(), around an asyncio provider
+    return InstrumentedProvider(ControlledProvider(async_provider, get_traffic_controller()))
+
+
+async def create_and_trade_nft_async(async_provider, nonce, sender=None, payment_token=EXCHANGE_PAYMENT_TOKEN):
+    """
+    create_and_trade_nft() with the send awaited on the event loop, so many
+    exchanges can be in flight at once. The blocking steps (journal, nonce,
+    gas estimation, signing) run in the default executor.
+
+    Parameters:
+    async_provider: From create_async_provider().
+    """
+    loop = asyncio.get_running_loop()
+    journal = await loop.run_in_executor(None, get_journal)
+    key = _exchange_key(nonce, sender)
+    if journal is not None:
+        tx_hash = await loop.run_in_executor(None, _journaled_exchange, journal, key)
+        if tx_hash:
+            return tx_hash
+    wallet_nonce = None
+    sent = False
+    try:
+        wallet_nonce = await loop.run_in_executor(None, _exchange_nonce, sender)
+        transaction = await loop.run_in_executor(
+            None, _sign_exchange, journal, key, nonce, wallet_nonce, payment_token, sender
+        )
+
+        sent = True
+        with stage("submit"):
+            tx_hash = await _controlled_async(async_provider).send_transaction(transaction)
     except Exception as e:
+        await loop.run_in_executor(None, _send_failed, journal, key, sender, wallet_nonce, e, sent)
         raise RuntimeError(f"Error creating and trading NFT: {e}")
+    await loop.run_in_executor(None, _exchange_submitted, journal, key, nonce, tx_hash)
+    return tx_hash
+
+
+# Command line interface: python -m assignment1 <command>
+
+def _wait_for(tx_hash, function):
+    tracker = get_tracker()
+    tracker.track(tx_hash, function)
+    result = tracker.wait(tx_hash)
+    if get_journal() is not None:
+        get_journal().record_result(result)
+    if not result.ok:
+        raise RuntimeError(f"Transaction {tx_hash} {result.status}: {result.error}")
+    return result
+
+
+def _cmd_mint(args):
+    tx_hash = create_nft(args.name, args.ticker, args.nft_class, args.rarity, args.power, args.img_uri)
+    print(f"Mint submitted. TX Hash: {tx_hash}")
+    if args.wait:
+        result = _wait_for(tx_hash, "ESDTNFTCreate")
+        print(f"Mint completed. NFT nonce: {result.values}")
+
 
+def _cmd_properties(args):
+    class_id, rarity, power = get_your_nft_properties()
+    print(f"Class: {class_id}, Rarity: {rarity}, Power: {power}")
 
 
+def _available_nfts(args):
+    if args.local:
+        return query_available_nfts_cached(max_age=args.max_age)
+    return query_available_nfts(stream=True)
 
 
+def _cmd_supply(args):
+    for nft in _available_nfts(args):
+        print(nft)
 
 
+def _cmd_match(args):
+    if args.nft_class is None or args.rarity is None:
+        assigned_props = get_your_nft_properties()
+        target_properties = {"class": assigned_props[0], "rarity": assigned_props[1]}
+    else:
+        target_properties = {"class": args.nft_class, "rarity": args.rarity}
 
-# Main flow
-# if __name__ == "__main__":
-#     try:
-        # Mint an NFT
-        # nft_name = "ahmed.raza11"
-        # nft_ticker = "AHMEDRAZA-4fc0cb"
-        # create_nft(nft_name, nft_ticker,8,3,2 , 'https://ipfs.io/ipfs/QmSaK2Tq1R8immF4dt2gwmJAmote3bbeMY3VNPmq5TbUf2')
+    # Streamed: the scan stops decoding at the first match
+    nfts = available_supply(max_age=args.max_age) if args.local else query_available_nfts(stream=True)
+    matched_nft = find_matching_nft(nfts, target_properties)
+    if matched_nft:
+        print(f"Matching NFT: {matched_nft}")
+    else:
+        print("No matching NFT found.")
 
-        # # Get assigned NFT properties
-        # assigned_props = get_your_nft_properties()
 
-        # # Query available NFTs
-        # available_nfts = query_available_nfts()
+def _cmd_assign(args):
+    matching = plan_exchanges(max_age=args.max_age)
+    for assignment in matching:
+        print(f"{assignment.student} -> nonce {assignment.nonce} (power {assignment.power}, wanted {assignment.wanted_power})")
+    for student in matching.unmatched:
+        print(f"{student} -> no NFT available")
+    print(matching.stats())
 
-        # # Find a matching NFT
-        # target_properties = {
-        #     "class": assigned_props[0],
-        #     "rarity": assigned_props[1],
-        # }
-        # matched_nft = find_matching_nft(available_nfts, target_properties)
 
-        # if matched_nft:
-        #     tx_hash = create_and_trade_nft("choudry.waseem", matched_nft["nonce"])
-        #     print(f"Trade successful. TX Hash: {tx_hash}")
-        # else:
-        #     print("No matching NFT found.")
-    # except Exception as e:
-    #     print(f"An error occurred: {e}")
+def _cmd_exchange(args):
+    tx_hash = create_and_trade_nft(args.nonce)
+    print(f"Trade successful. TX Hash: {tx_hash}")
+    if args.wait:
+        _wait_for(tx_hash, "exchangeNft")
+        print("Trade completed.")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m assignment1", description="Tema1 NFT helper")
+    parser.add_argument("--log-level", choices=list(instrumentation.LEVEL_NAMES), help="Trace events to show (default: info)")
+    parser.add_argument("--metrics", metavar="PATH", help="Write stage timings and counters here (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="Run the command under cProfile; print the top functions or dump the stats to PATH")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    mint = subparsers.add_parser("mint", help="Mint an NFT")
+    mint.add_argument("name")
+    mint.add_argument("ticker")
+    mint.add_argument("nft_class", type=int)
+    mint.add_argument("rarity", type=int)
+    mint.add_argument("power", type=int)
+    mint.add_argument("img_uri")
+    mint.set_defaults(handler=_cmd_mint)
+
+    properties = subparsers.add_parser("properties", help="Show the card properties assigned to you")
+    properties.set_defaults(handler=_cmd_properties)
+
+    supply = subparsers.add_parser("supply", help="List the NFTs held by the contract")
+    supply.set_defaults(handler=_cmd_supply)
+
+    match = subparsers.add_parser("match", help="Find an available NFT matching your (or the given) properties")
+    match.add_argument("--class", dest="nft_class", type=int)
+    match.add_argument("--rarity", type=int)
+    match.set_defaults(handler=_cmd_match)
+
+    assign = subparsers.add_parser("assign", help="Assign an available NFT to every registered student")
+    # Exchanges need token nonces, which only the local store has
+    assign.add_argument("--max-age", type=float, help="Skip syncing the local store if it is this fresh (seconds)")
+    assign.set_defaults(handler=_cmd_assign)
+
+    for command in (supply, match):
+        command.add_argument("--local", action="store_true", help="Serve the supply from the local SQLite store")
+        command.add_argument("--max-age", type=float, help="With --local, skip syncing if the store is this fresh (seconds)")
+
+    exchange = subparsers.add_parser("exchange", help="Exchange an NFT for the one with the given nonce")
+    exchange.add_argument("nonce", type=int)
+    exchange.set_defaults(handler=_cmd_exchange)
+
+    for command in (mint, exchange):
+        command.add_argument("--wait", action="store_true", help="Wait until the transaction is executed")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.log_level:
+        instrumentation.set_level(args.log_level)
+    profiler = cProfile.Profile() if args.profile is not None else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        args.handler(args)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            if args.profile:
+                profiler.dump_stats(args.profile)
+            else:
+                pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        if args.metrics:
+            instrumentation.METRICS.write(args.metrics)
+    return 0
 
 
-tx_hash = create_and_trade_nft(76)
-print(f"Trade successful. TX Hash: {tx_hash}")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import asyncio
+import base64
+import json
+
+import aiohttp
+from multiversx_sdk import SmartContractQueryResponse, TransactionsConverter
+from multiversx_sdk.network_providers.accounts import AccountOnNetwork
+from multiversx_sdk.network_providers.errors import GenericError
+from multiversx_sdk.network_providers.network_config import NetworkConfig
+from multiversx_sdk.network_providers.transaction_status import TransactionStatus
+from multiversx_sdk.network_providers.transactions import TransactionOnNetwork
+
+from traffic_control import GatewayHTTPError, parse_retry_after
+
+
+# asyncio counterpart of ProxyNetworkProvider. All requests share one pooled
+# keep-alive session, so many queries and sends can be in flight at once.
+# HTTP errors are traffic_control.GatewayHTTPError, so the provider can sit
+# under the same traffic controller, instrumentation and multi-gateway
+# routing as the blocking one (assignment1.create_async_provider()).
+class AsyncProxyNetworkProvider:
+    def __init__(self, url, max_connections=100, keepalive_timeout=30, timeout=10):
+        self.url = url.rstrip("/")
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session = None
+        self._converter = TransactionsConverter()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method, resource_url, payload=None):
+        url = f"{self.url}/{resource_url}"
+        try:
+            async with self._get_session().request(method, url, json=payload) as response:
+                if response.status >= 400:
+                    # Same error as traffic_control.StatusAwareProvider, so the controller can tell throttling apart
+                    raise GatewayHTTPError(url, await self._error_of(response), response.status,
+                                           parse_retry_after(response.headers.get("Retry-After")))
+                return self._get_data(await response.json(content_type=None), url)
+        except GenericError:
+            raise
+        except TimeoutError as e:
+            raise GenericError(url, e)
+        except aiohttp.ClientConnectionError as e:
+            # A plain ConnectionError is what traffic_control.classify_error recognises as unavailable
+            raise GenericError(url, ConnectionError(str(e) or type(e).__name__))
+        except Exception as e:
+            raise GenericError(url, e)
+
+    async def do_get(self, resource_url):
+        return await self._request("GET", resource_url)
+
+    async def do_post(self, resource_url, payload):
+        return await self._request("POST", resource_url, payload)
+
+    async def _error_of(self, response):
+        # The JSON error body if there is one, the raw text otherwise
+        text = await response.text()
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+    def _get_data(self, parsed, url):
+        err = parsed.get("error")
+        code = parsed.get("code")
+        if not err and code == "successful":
+            return parsed.get("data", dict())
+        raise GenericError(url, f"code: {code}, error: {err}")
+
+    async def get_network_config(self):
+        response = await self.do_get("network/config")
+        return NetworkConfig.from_http_response(response["config"])
+
+    async def get_account(self, address):
+        response = await self.do_get(f"address/{address.to_bech32()}")
+        return AccountOnNetwork.from_http_response(response["account"])
+
+    async def get_transaction(self, tx_hash, with_process_status=False):
+        if with_process_status:
+            response, process_status = await asyncio.gather(
+                self.do_get(f"transaction/{tx_hash}?withResults=true"),
+                self.get_transaction_status(tx_hash),
+            )
+        else:
+            response = await self.do_get(f"transaction/{tx_hash}?withResults=true")
+            process_status = None
+        return TransactionOnNetwork.from_proxy_http_response(tx_hash, response["transaction"], process_status)
+
+    async def get_transaction_status(self, tx_hash):
+        response = await self.do_get(f"transaction/{tx_hash}/process-status")
+        return TransactionStatus(response.get("status", ""))
+
+    async def send_transaction(self, transaction):
+        response = await self.do_post(
+            "transaction/send", self._converter.transaction_to_dictionary(transaction)
+        )
+        return response.get("txHash", "")
+
+    async def send_transactions(self, transactions):
+        payload = [self._converter.transaction_to_dictionary(tx) for tx in transactions]
+        response = await self.do_post("transaction/send-multiple", payload)
+        return response.get("numOfSentTxs", 0), response.get("txsHashes", dict())
+
+    async def run_query(self, query):
+        """
+        Run a SmartContractQuery built by SmartContractQueriesController.create_query().
+
+        Returns:
+        SmartContractQueryResponse: Response that can be passed to parse_query_response().
+        """
+        payload = {
+            "scAddress": query.contract,
+            "funcName": query.function,
+            "args": [arg.hex() for arg in query.arguments],
+            "value": str(query.value or 0),
+        }
+        if query.caller:
+            payload["caller"] = query.caller
+
+        response = await self.do_post("vm-values/query", payload)
+        data = response.get("data", dict())
+        return SmartContractQueryResponse(
+            function=query.function,
+            return_code=data.get("returnCode", ""),
+            return_message=data.get("returnMessage", ""),
+            return_data_parts=[base64.b64decode(part or "") for part in data.get("returnData") or []],
+        )
+
+    async def get_accounts(self, addresses):
+        # Fetch several accounts concurrently over the shared session
+        return await asyncio.gather(*(self.get_account(address) for address in addresses))
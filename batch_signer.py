@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from multiversx_sdk import TransactionComputer, TransactionsConverter, UserSecretKey, UserSigner
+
+# Signs large batches of transactions on a process pool. The secret key is
+# handed to each worker once, when the pool starts; after that only
+# transaction dictionaries and signatures cross the process boundary.
+
+_worker_signer = None
+_worker_computer = None
+_worker_converter = None
+
+
+def _init_worker(secret_key_bytes):
+    global _worker_signer, _worker_computer, _worker_converter
+    _worker_signer = UserSigner(UserSecretKey(secret_key_bytes))
+    _worker_computer = TransactionComputer()
+    _worker_converter = TransactionsConverter()
+
+
+def _sign_chunk(transaction_dicts):
+    signatures = []
+    for transaction_dict in transaction_dicts:
+        transaction = _worker_converter.dictionary_to_transaction(transaction_dict)
+        signable_bytes = _worker_computer.compute_bytes_for_signing(transaction)
+        signatures.append(_worker_signer.sign(signable_bytes))
+    return signatures
+
+
+class BatchSigner:
+    def __init__(self, secret_key, max_workers=None, chunk_size=256):
+        """
+        Parameters:
+        secret_key (UserSecretKey | bytes): Key every transaction is signed with.
+        max_workers (int | None): Worker processes, defaults to the CPU count.
+        chunk_size (int): Transactions sent to a worker at a time.
+        """
+        secret_key_bytes = secret_key.buffer if isinstance(secret_key, UserSecretKey) else bytes(secret_key)
+        self.chunk_size = chunk_size
+        self._converter = TransactionsConverter()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(secret_key_bytes,),
+        )
+
+    @classmethod
+    def from_wallet(cls, wallet_path, password, **kwargs):
+        # The keystore is decrypted once here, not in every worker
+        return cls(UserSigner.from_wallet(Path(wallet_path), password).secret_key, **kwargs)
+
+    @classmethod
+    def from_pem(cls, pem_path, index=0, **kwargs):
+        return cls(UserSigner.from_pem_file(Path(pem_path), index).secret_key, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def sign_transactions(self, transactions):
+        """
+        Sign the transactions in place, spread over the worker processes.
+
+        Returns:
+        list: The same transactions, in input order, with their signature set.
+        """
+        transactions = list(transactions)
+        transaction_dicts = [self._converter.transaction_to_dictionary(tx) for tx in transactions]
+        chunks = [
+            transaction_dicts[start:start + self.chunk_size]
+            for start in range(0, len(transaction_dicts), self.chunk_size)
+        ]
+
+        # map() yields results in submission order, so signatures line up with transactions
+        position = 0
+        for signatures in self._executor.map(_sign_chunk, chunks):
+            for signature in signatures:
+                transactions[position].signature = signature
+                position += 1
+        return transactions
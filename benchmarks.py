@@ -0,0 +1,342 @@
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+
+from multiversx_sdk import SmartContractQueryResponse, Transaction, UserSecretKey, UserSigner
+
+import assignment1
+from abi_codegen import DEFAULT_ABI_PATH, benchmark as codec_benchmark, load_codec
+from batch_signer import BatchSigner
+from nft_attributes import decode_supply, encode_text_attributes
+from matching_engine import match_students
+from nft_catalog import NftCatalog
+
+# Benchmarks for the mint / query / match / exchange hot paths.
+#
+# Every case is timed with timeit.repeat: the number of calls per repeat is
+# picked by Timer.autorange() (at least ~0.2 s per repeat) and the statistics
+# are computed over the per-call times of the repeats. Comparisons against a
+# saved baseline use the minimum, the least noisy of them.
+#
+#   python benchmarks.py                          run everything
+#   python benchmarks.py encode decode --quick    selected groups, small sizes
+#   python benchmarks.py --save-baseline          write output/bench_baseline.json
+#   python benchmarks.py --compare                fail on regressions against it
+
+DEFAULT_BASELINE_PATH = Path("output/bench_baseline.json")
+MATCH_SIZES = (10**3, 10**4, 10**5, 10**6)
+QUICK_MATCH_SIZES = (10**3, 10**4)
+SAMPLE_ADDRESS = "erd1qyu5wthldzr8wx5c9ucg8kjagg0jfs53s8nr3zpz3hypefsdd8ssycr6th"
+
+
+def measure(function, repeat=7, number=None, min_time=0.2):
+    """
+    Time function() with timeit.
+
+    Returns:
+    dict: Per-call seconds (min, median, mean, stdev, max) and the call counts.
+    """
+    timer = timeit.Timer(function)
+    if number is None:
+        number, _ = timer.autorange()
+        # autorange() stops at 0.2 s; scale up if a larger minimum was asked for
+        number = max(1, int(number * min_time / 0.2))
+    gc.collect()
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "max": max(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+# Synthetic data
+
+def _variant_counts():
+    # Number of classes, rarities and powers the ABI defines
+    codec = load_codec(DEFAULT_ABI_PATH)
+    return len(codec.CLASS_VARIANTS), len(codec.RARITY_VARIANTS), len(codec.POWER_VARIANTS)
+
+
+def _sample_token_data_parts(count, seed=0):
+    codec = load_codec(DEFAULT_ABI_PATH)
+    classes, rarities, powers = _variant_counts()
+    rng = random.Random(seed)
+    parts = []
+    for index in range(count):
+        nft_class, rarity, power = rng.randrange(classes), rng.randrange(rarities), rng.randrange(powers)
+        parts.append(codec.top_encode_EsdtTokenData(codec.EsdtTokenData(
+            token_type=1,
+            amount=1,
+            frozen=False,
+            hash=rng.randbytes(32),
+            name=f"Tema1 #{index + 1}".encode(),
+            attributes=encode_text_attributes(nft_class, rarity, power),
+            creator=bytes(32),
+            royalties=250,
+            uris=[b"https://ipfs.io/ipfs/QmSaK2Tq1R8immF4dt2gwmJAmote3bbeMY3VNPmq5TbUf2"],
+        )))
+    return parts
+
+
+def _sample_nfts(count, seed=0):
+    classes, rarities, powers = _variant_counts()
+    rng = random.Random(seed)
+    return [
+        {
+            "nonce": nonce,
+            "token_id": rng.randbytes(32).hex(),
+            "rarity": rng.randrange(rarities),
+            "class": rng.randrange(classes),
+            "power": rng.randrange(powers),
+        }
+        for nonce in range(1, count + 1)
+    ]
+
+
+def _sample_transactions(count):
+    return [
+        Transaction(
+            sender=SAMPLE_ADDRESS,
+            receiver=SAMPLE_ADDRESS,
+            gas_limit=3_000_000,
+            chain_id="D",
+            nonce=nonce,
+            data=assignment1.build_nft_create_data("bench", "TEMA1-a1b2c3", 1, 2, 0, "https://example.com/nft.png").encode(),
+        )
+        for nonce in range(count)
+    ]
+
+
+# Benchmark groups. Each yields (name, function) pairs, or (name, result) for
+# cases that time themselves.
+
+def bench_encode(args):
+    yield "encode.build_nft_create_data", lambda: assignment1.build_nft_create_data(
+        "ahmed.raza11", "AHMEDRAZA-4fc0cb", 8, 3, 2, "https://ipfs.io/ipfs/QmSaK2Tq1R8immF4dt2gwmJAmote3bbeMY3VNPmq5TbUf2"
+    )
+    yield "encode.text_attributes", lambda: encode_text_attributes(8, 3, 2)
+
+
+def bench_decode(args):
+    count = 1000
+    parts = _sample_token_data_parts(count)
+    response = SmartContractQueryResponse(function="nftSupply", return_code="ok", return_message="", return_data_parts=parts)
+    codec = load_codec(DEFAULT_ABI_PATH)
+    yield f"decode.nfts_from_response[{count}]", lambda: assignment1._nfts_from_response(response)
+    yield f"decode.codec_nftSupply[{count}]", lambda: codec.decode_nftSupply_output(parts)
+    yield f"decode.attribute_columns[{count}]", lambda: decode_supply(parts, codec)
+    if not args.quick:
+        # The generic SDK decoder, for reference (abi_codegen.benchmark already times it)
+        results = codec_benchmark(DEFAULT_ABI_PATH, count=count, repeat=args.repeat)
+        yield f"decode.generic_abi_nftSupply[{count}]", {"min": results["generic"], "median": results["generic"]}
+
+
+def bench_match(args):
+    sizes = QUICK_MATCH_SIZES if args.quick else MATCH_SIZES
+    try:
+        from nft_columns import NftColumns
+    except ImportError:
+        NftColumns = None
+    classes, _, powers = _variant_counts()
+    for size in sizes:
+        nfts = _sample_nfts(size)
+        # One past the last class does not exist, so every lookup is a worst case full miss
+        missing = {"class": classes, "rarity": 0}
+        present = {"class": nfts[-1]["class"], "rarity": nfts[-1]["rarity"]}
+        yield f"match.list_scan_miss[{size}]", lambda: assignment1.find_matching_nft(nfts, missing)
+        yield f"match.list_scan_hit[{size}]", lambda: assignment1.find_matching_nft(nfts, present)
+        catalog = NftCatalog(nfts)
+        yield f"match.catalog_miss[{size}]", lambda: assignment1.find_matching_nft(catalog, missing)
+        if NftColumns is not None:
+            columns = NftColumns.from_nfts(nfts)
+            yield f"match.columns_miss[{size}]", lambda: assignment1.find_matching_nft(columns, missing)
+        if size <= 100_000:
+            # One student per NFT, all served in a single global assignment
+            demands = {index: (nft["class"], nft["rarity"], (nft["power"] + index) % powers) for index, nft in enumerate(nfts)}
+            yield f"match.assign_all[{size}]", lambda: match_students(demands, nfts)
+        del nfts, catalog
+
+
+def bench_sign(args):
+    secret_key = UserSecretKey.generate()
+    signer = UserSigner(secret_key)
+    computer = assignment1.transaction_computer
+    transaction = _sample_transactions(1)[0]
+    yield "sign.single", lambda: signer.sign(computer.compute_bytes_for_signing(transaction))
+
+    count = 256 if args.quick else 2048
+    transactions = _sample_transactions(count)
+
+    def sign_inline():
+        for tx in transactions:
+            tx.signature = signer.sign(computer.compute_bytes_for_signing(tx))
+
+    yield f"sign.inline[{count}]", sign_inline
+    # The pool is started outside the timed region, as create_nft_many() reuses it
+    with BatchSigner(secret_key) as batch_signer:
+        batch_signer.sign_transactions(transactions[:1])
+        yield f"sign.batch_signer[{count}]", lambda: batch_signer.sign_transactions(transactions)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_e2e(args):
+    from mock_gateway import MockGateway, Tema1Model
+
+    mints = 50 if args.quick else 300
+    queries = 50 if args.quick else 200
+    per_tx = []
+    query_latencies = []
+    for _ in range(max(1, min(args.repeat, 3))):
+        model = Tema1Model(supply_size=1000, students=10, block_time=args.block_time, max_nonce_gap=mints, seed=0).start()
+        with MockGateway(model, latency=args.latency) as gateway:
+            secret_key = UserSecretKey.generate()
+            address = secret_key.generate_public_key().to_address("erd").to_bech32()
+            assignment1.configure(gateway.url, address, model.contract_address, UserSigner(secret_key))
+
+            # Mint: encode -> sign -> submit -> wait for every transaction to execute
+            records = [(f"bench{i}", 1, 2, 0, "https://example.com/nft.png") for i in range(mints)]
+            started = time.perf_counter()
+            results = assignment1.create_nft_many(records, "BENCH-a1b2c3", flush_interval=0.05)
+            tracker = assignment1.get_tracker()
+            tracker.track_many([result["tx_hash"] for result in results], "ESDTNFTCreate")
+            tracked = tracker.run()
+            per_tx.append((time.perf_counter() - started) / mints)
+            if any(not result.ok for result in tracked) or len(tracked) != mints:
+                raise RuntimeError("End-to-end mint did not complete")
+
+            # Query + match, bypassing the cache so every call reaches the gateway
+            for _ in range(queries):
+                started = time.perf_counter()
+                nfts = assignment1.iter_available_nfts(
+                    assignment1.get_query_controller().query_controller.run_query(assignment1._create_nft_supply_query())
+                )
+                assignment1.find_matching_nft(nfts, {"class": 1, "rarity": 2})
+                query_latencies.append(time.perf_counter() - started)
+
+            # Exchange one minted NFT for a contract NFT with the same class and rarity
+            minted = tracked[0].values
+            wanted = model._mint_to_contract((1, 2, 0))
+            started = time.perf_counter()
+            transaction = assignment1.build_exchange_transaction(
+                wanted, assignment1.get_wallet_nonce(), payment_token=f"BENCH-a1b2c3-{minted:02x}"
+            )
+            tx_hash = assignment1.get_provider().send_transaction(transaction)
+            tracker.track(tx_hash, "exchangeNft")
+            exchange = tracker.wait(tx_hash)
+            exchange_time = time.perf_counter() - started
+            if not exchange.ok:
+                raise RuntimeError(f"End-to-end exchange failed: {exchange.error}")
+        model.stop()
+
+    yield f"e2e.mint_confirmed_per_tx[{mints}]", {
+        "min": min(per_tx), "median": statistics.median(per_tx), "throughput": 1 / min(per_tx),
+    }
+    yield f"e2e.query_and_match[{queries}]", {
+        "min": min(query_latencies),
+        "median": statistics.median(query_latencies),
+        "p95": _percentile(query_latencies, 0.95),
+        "p99": _percentile(query_latencies, 0.99),
+        "max": max(query_latencies),
+    }
+    yield "e2e.exchange_confirmed", {"min": exchange_time, "median": exchange_time}
+
+
+GROUPS = {
+    "encode": bench_encode,
+    "decode": bench_decode,
+    "match": bench_match,
+    "sign": bench_sign,
+    "e2e": bench_e2e,
+}
+
+
+def run(groups, args):
+    results = {}
+    for group in groups:
+        for name, case in GROUPS[group](args):
+            stats = case if isinstance(case, dict) else measure(case, repeat=args.repeat)
+            results[name] = stats
+            extra = "".join(
+                f", {key} {_format_time(stats[key])}" for key in ("p95", "p99") if key in stats
+            )
+            print(f"{name:45s} min {_format_time(stats['min']):>10s}  median {_format_time(stats['median']):>10s}{extra}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the change of every case against the baseline.
+
+    Returns:
+    list: Names of the cases slower than baseline * (1 + threshold).
+    """
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = stats["min"] / previous["min"] if previous["min"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:45s} {ratio:6.2f}x baseline{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the mint/query/match/exchange hot paths.")
+    parser.add_argument("groups", nargs="*", help=f"Groups to run: {', '.join(GROUPS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs, for a fast check")
+    parser.add_argument("--block-time", type=float, default=0.05, help="Mock gateway block time for e2e")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock gateway latency for e2e")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--save-baseline", nargs="?", const=str(DEFAULT_BASELINE_PATH), metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE_PATH), metavar="PATH")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before failing --compare")
+    args = parser.parse_args(argv)
+    unknown = set(args.groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+
+    results = run(args.groups or list(GROUPS), args)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(json.dumps(results, indent=2, sort_keys=True))
+            print(f"Results written to {path}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from multiversx_sdk import Address, AddressComputer, Mnemonic, UserPEM, UserSecretKey, UserWallet
+from multiversx_sdk.wallet import core
+
+# Many wallets at once, for sender pools and test accounts.
+#
+# All keys are derived from one mnemonic (m/44'/508'/0'/0'/index'), so the
+# whole set can be recovered from it. The expensive parts are spread over a
+# process pool: the BIP39 seed is stretched once per worker instead of once
+# per key, and every scrypt-encrypted keystore is written by a worker while
+# the main process writes the multi-key PEM and the address manifest.
+
+_worker_seed = None
+
+
+def _init_worker(mnemonic_text):
+    global _worker_seed
+    _worker_seed = core.mnemonic_to_bip39seed(mnemonic_text)
+
+
+def _derive_range(start, stop, shard, number_of_shards, hrp):
+    # Keys for address indices [start, stop), keeping only those in the wanted shard
+    address_computer = AddressComputer(number_of_shards=number_of_shards)
+    keys = []
+    for index in range(start, stop):
+        secret_key = UserSecretKey(core.bip39seed_to_secret_key(_worker_seed, index))
+        address = secret_key.generate_public_key().to_address(hrp)
+        address_shard = address_computer.get_shard_of_address(address)
+        if shard is None or address_shard == shard:
+            keys.append((index, secret_key.buffer, address.to_bech32(), address_shard))
+    return keys
+
+
+def _write_keystores(entries, password, hrp):
+    for secret_key_bytes, path in entries:
+        UserWallet.from_secret_key(UserSecretKey(secret_key_bytes), password).save(Path(path), address_hrp=hrp)
+    return len(entries)
+
+
+def generate_wallets(count, output_dir="./output/wallets", password="password", shard=None, number_of_shards=3,
+                     mnemonic=None, hrp="erd", keystores=True, max_workers=None, chunk_size=64):
+    """
+    Derive count wallets and write their keystores, a multi-key PEM and an address manifest.
+
+    Parameters:
+    count (int): Number of wallets.
+    output_dir (str | Path): Directory for wallet{index}.json, wallets.pem,
+        addresses.json and mnemonic.json (the mnemonic, encrypted with password).
+    password (str): Password of the keystores.
+    shard (int | None): Only keep addresses in this shard.
+    mnemonic (str | None): Mnemonic to derive from; a new one is generated if None.
+    keystores (bool): Write one JSON keystore per wallet; the PEM alone is much faster.
+    max_workers (int | None): Worker processes, defaults to the CPU count.
+    chunk_size (int): Address indices or keystores handed to a worker at a time.
+
+    Returns:
+    list: Manifest entries {"index", "address", "shard", "keystore"}, in index order.
+    """
+    if shard is not None and not 0 <= shard < number_of_shards:
+        raise ValueError(f"Shard {shard} is not one of the {number_of_shards} shards")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    mnemonic = Mnemonic(mnemonic) if mnemonic else Mnemonic.generate()
+    max_workers = max_workers or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(mnemonic.get_text(),)) as executor:
+        # Derive in rounds until enough addresses landed in the wanted shard;
+        # map() keeps index order, so the same mnemonic always gives the same set
+        derive = partial(_derive_range, shard=shard, number_of_shards=number_of_shards, hrp=hrp)
+        keys = []
+        next_index = 0
+        while len(keys) < count:
+            span = (count - len(keys)) * (number_of_shards if shard is not None else 1)
+            starts = range(next_index, next_index + span, chunk_size)
+            stops = [min(start + chunk_size, next_index + span) for start in starts]
+            for derived in executor.map(derive, starts, stops):
+                keys.extend(derived)
+            next_index += span
+        keys = keys[:count]
+
+        manifest = [
+            {
+                "index": index,
+                "address": address,
+                "shard": address_shard,
+                "keystore": str(output_dir / f"wallet{index}.json") if keystores else None,
+            }
+            for index, _, address, address_shard in keys
+        ]
+
+        futures = []
+        if keystores:
+            entries = [(secret_key_bytes, entry["keystore"]) for (_, secret_key_bytes, _, _), entry in zip(keys, manifest)]
+            futures = [
+                executor.submit(_write_keystores, entries[start:start + chunk_size], password, hrp)
+                for start in range(0, len(entries), chunk_size)
+            ]
+
+        # The workers encrypt keystores while this process writes the rest
+        UserWallet.from_mnemonic(mnemonic.get_text(), password).save(output_dir / "mnemonic.json")
+        pem_text = "\n".join(
+            UserPEM(label=address, secret_key=UserSecretKey(secret_key_bytes)).to_text()
+            for _, secret_key_bytes, address, _ in keys
+        )
+        (output_dir / "wallets.pem").write_text(pem_text + "\n")
+        (output_dir / "addresses.json").write_text(json.dumps(manifest, indent=2))
+
+        for future in futures:
+            future.result()
+    return manifest
+
+
+def addresses_from_pem(pem_path, hrp="erd"):
+    # Address of every key in a (possibly multi-key) PEM file
+    return [
+        Address(entry.secret_key.generate_public_key().buffer, hrp).to_bech32()
+        for entry in UserPEM.from_file_all(Path(pem_path))
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate many wallets from one mnemonic")
+    parser.add_argument("count", type=int, nargs="?", help="Number of wallets to generate")
+    parser.add_argument("--output", default="./output/wallets", help="Output directory")
+    parser.add_argument("--password", default=os.getenv("WALLET_PASSWORD", "password"), help="Keystore password")
+    parser.add_argument("--shard", type=int, help="Only generate addresses in this shard")
+    parser.add_argument("--shards", type=int, default=3, help="Number of shards of the network")
+    parser.add_argument("--mnemonic", help="Derive from this mnemonic instead of a new one")
+    parser.add_argument("--hrp", default="erd", help="Address prefix")
+    parser.add_argument("--no-keystores", action="store_true", help="Only write the PEM and the manifest")
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument("--addresses", metavar="PEM", help="Print the addresses of a PEM file and exit")
+    args = parser.parse_args(argv)
+
+    if args.addresses:
+        for address in addresses_from_pem(args.addresses, args.hrp):
+            print(address)
+        return
+    if not args.count:
+        parser.error("count is required")
+
+    manifest = generate_wallets(
+        args.count,
+        output_dir=args.output,
+        password=args.password,
+        shard=args.shard,
+        number_of_shards=args.shards,
+        mnemonic=args.mnemonic,
+        hrp=args.hrp,
+        keystores=not args.no_keystores,
+        max_workers=args.workers,
+    )
+    shards = {}
+    for entry in manifest:
+        shards[entry["shard"]] = shards.get(entry["shard"], 0) + 1
+    print(f"Generated {len(manifest)} wallets in {args.output} (per shard: {dict(sorted(shards.items()))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import math
+import threading
+import time
+
+from multiversx_sdk import TransactionsConverter
+
+import instrumentation
+
+# Gas limits from simulation instead of fixed guesses.
+#
+# A transaction's gas is the base cost (min_gas_limit), gas_per_data_byte for
+# every byte of data, and whatever the execution itself consumes. The first
+# transaction of each shape, (function, data size rounded up to a power of
+# two), is simulated through the gateway's transaction/cost endpoint; the
+# execution part of the answer is cached with the data length it was sampled
+# at and reused, with a safety margin, for every later transaction of that
+# shape. Execution cost can grow with the data (ESDTNFTCreate stores it), so
+# for longer data than the sample the cached gas is scaled up in proportion
+# to the length, which bounds any cost linear in the data size. The cache is dropped whenever the
+# network config changes. If simulation fails the caller's fallback limit is
+# used, and the shape is not simulated again for retry_after seconds.
+
+ESDT_TRANSFER_FUNCTIONS = {
+    # Built-in transfer -> index of the called function in its arguments
+    "ESDTTransfer": 2,
+    "ESDTNFTTransfer": 4,
+}
+
+
+def function_of(data):
+    """
+    Name of the function a transaction calls, looking through ESDT transfers.
+
+    Parameters:
+    data (bytes): Transaction data, e.g. b"ESDTNFTTransfer@...@65786368616e67654e6674@...".
+
+    Returns:
+    str: Function name, or "" for plain transfers.
+    """
+    fields = bytes(data).decode(errors="replace").split("@")
+    function = fields[0]
+    index = ESDT_TRANSFER_FUNCTIONS.get(function)
+    if index is not None and len(fields) > index + 1:
+        try:
+            return bytes.fromhex(fields[index + 1]).decode()
+        except ValueError:
+            return function
+    return function
+
+
+def size_bucket(length):
+    # 0, 1, 2, 4, 8, ...: the smallest power of two that holds the data
+    return 1 << (length - 1).bit_length() if length > 0 else 0
+
+
+class GasEstimator:
+    def __init__(self, provider, margin=1.1, retry_after=60, config_check_interval=600, max_gas_limit=600_000_000):
+        """
+        Parameters:
+        provider: ProxyNetworkProvider used for the network config and simulations.
+        margin (float): Multiplier applied to the simulated execution gas.
+        retry_after (float): Seconds before a shape whose simulation failed is tried again.
+        config_check_interval (float): Seconds between network config checks.
+        max_gas_limit (int): Upper bound on any estimate.
+        """
+        self.provider = provider
+        self.margin = margin
+        self.retry_after = retry_after
+        self.config_check_interval = config_check_interval
+        self.max_gas_limit = max_gas_limit
+
+        self._converter = TransactionsConverter()
+        self._lock = threading.Lock()
+        self._shape_locks = {}
+        self._execution_gas = {}
+        self._failed_at = {}
+        self._network_config = None
+        self._fingerprint = None
+        self._config_checked_at = 0
+        self._stats = {"hits": 0, "simulations": 0, "fallbacks": 0, "refreshes": 0}
+
+    def _check_network_config(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._network_config is not None and now - self._config_checked_at < self.config_check_interval:
+                return self._network_config
+            self._config_checked_at = now
+
+        network_config = self.provider.get_network_config()
+        fingerprint = tuple(sorted(network_config.to_dictionary().items()))
+        with self._lock:
+            if self._fingerprint is not None and fingerprint != self._fingerprint:
+                self._execution_gas.clear()
+                self._failed_at.clear()
+                self._stats["refreshes"] += 1
+            self._fingerprint = fingerprint
+            self._network_config = network_config
+        return network_config
+
+    def invalidate(self):
+        with self._lock:
+            self._execution_gas.clear()
+            self._failed_at.clear()
+
+    def _base_gas(self, network_config, data):
+        return network_config.min_gas_limit + network_config.gas_per_data_byte * len(data)
+
+    def _simulate(self, transaction):
+        # The cost endpoint ignores the signature, so unsigned transactions are fine
+        payload = self._converter.transaction_to_dictionary(transaction)
+        response = self.provider.do_post_generic("transaction/cost", payload)
+        return_message = response.get("returnMessage", "")
+        if return_message:
+            raise RuntimeError(return_message)
+        gas_units = response.get("txGasUnits", 0)
+        if not gas_units:
+            raise RuntimeError("transaction/cost returned no gas units")
+        return gas_units
+
+    def estimate(self, transaction, function=None, fallback=None):
+        """
+        Gas limit for a transaction, simulating it only if its shape is new.
+
+        Parameters:
+        transaction (Transaction): Transaction to estimate, before it is signed.
+        function (str | None): Function called; read from the data if None.
+        fallback (int | None): Limit returned when simulation is not possible.
+
+        Returns:
+        int: Gas limit to set on the transaction.
+        """
+        data = bytes(transaction.data or b"")
+        function = function or function_of(data)
+        key = (function, size_bucket(len(data)))
+
+        try:
+            network_config = self._check_network_config()
+        except Exception as e:
+            if fallback is None:
+                raise RuntimeError(f"Error reading the network config: {e}")
+            with self._lock:
+                self._stats["fallbacks"] += 1
+            return fallback
+
+        with self._lock:
+            shape_lock = self._shape_locks.setdefault(key, threading.Lock())
+
+        # One simulation per shape: concurrent callers wait for it instead of repeating it
+        with shape_lock:
+            with self._lock:
+                sample = self._execution_gas.get(key)
+                failed_at = self._failed_at.get(key)
+                if sample is not None:
+                    self._stats["hits"] += 1
+            if sample is None:
+                if failed_at is None or time.monotonic() - failed_at >= self.retry_after:
+                    try:
+                        simulated = self._simulate(transaction)
+                    except Exception as e:
+                        instrumentation.warning("Gas simulation for %s failed: %s", function, e)
+                        simulated = None
+                    with self._lock:
+                        if simulated is None:
+                            self._failed_at[key] = time.monotonic()
+                        else:
+                            self._stats["simulations"] += 1
+                            sample = (max(0, simulated - self._base_gas(network_config, data)), len(data))
+                            self._execution_gas[key] = sample
+                            self._failed_at.pop(key, None)
+
+        if sample is None:
+            if fallback is None:
+                raise RuntimeError(f"Error estimating gas for {function}: simulation failed")
+            with self._lock:
+                self._stats["fallbacks"] += 1
+            return fallback
+
+        execution_gas, sampled_length = sample
+        if len(data) > sampled_length:
+            execution_gas = execution_gas * len(data) / sampled_length
+        gas_limit = self._base_gas(network_config, data) + math.ceil(execution_gas * self.margin)
+        return min(gas_limit, self.max_gas_limit)
+
+    def apply(self, transaction, function=None, fallback=None):
+        # Set the estimate on the transaction; sign it afterwards
+        transaction.gas_limit = self.estimate(transaction, function, fallback)
+        return transaction.gas_limit
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["shapes"] = len(self._execution_gas)
+        return stats
@@ -0,0 +1,323 @@
+import bisect
+import inspect
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+# Stage timings, counters and leveled trace events for the hot paths.
+#
+# Stages are timed into fixed-bucket latency histograms:
+#
+#   with stage("decode"):
+#       ...
+#
+# Trace events are formatted lazily, and only when their level is enabled.
+# Inside per-item loops, guard them with the module flags so a disabled event
+# costs one attribute lookup:
+#
+#   if instrumentation.DEBUG:
+#       instrumentation.debug("Skipping NFT %s", nft.name)
+#
+# snapshot() returns everything recorded so far; to_json() and
+# to_prometheus() render it for files or a scrape endpoint.
+
+ERROR = 40
+WARNING = 30
+INFO = 20
+DEBUG = False  # True when DEBUG_LEVEL events are enabled, see set_level()
+TRACE = False  # True when TRACE_LEVEL events are enabled
+DEBUG_LEVEL = 10
+TRACE_LEVEL = 5
+
+LEVEL_NAMES = {"error": ERROR, "warning": WARNING, "info": INFO, "debug": DEBUG_LEVEL, "trace": TRACE_LEVEL}
+
+# Upper bounds in seconds, roughly x2.5 apart, from 100 us to 60 s
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_level = INFO
+
+
+def set_level(level):
+    """
+    Set the lowest level of trace events that are emitted.
+
+    Parameters:
+    level (int | str): A level constant or one of "error", "warning", "info", "debug", "trace".
+    """
+    global _level, DEBUG, TRACE
+    if isinstance(level, str):
+        level = LEVEL_NAMES[level.lower()]
+    _level = level
+    DEBUG = level <= DEBUG_LEVEL
+    TRACE = level <= TRACE_LEVEL
+
+
+def enabled(level):
+    return level >= _level
+
+
+def _default_sink(level, message):
+    # Info and above keep going to stdout as the old prints did; diagnostics go to stderr
+    if level >= INFO and level < WARNING:
+        print(message)
+    else:
+        name = next(name for name, value in LEVEL_NAMES.items() if value == level)
+        print(f"[{name}] {message}", file=sys.stderr)
+
+
+_sink = _default_sink
+
+
+def set_sink(sink):
+    # sink(level, message), e.g. to collect events in tests or forward them to logging
+    global _sink
+    _sink = sink or _default_sink
+
+
+def event(level, message, *args):
+    if level < _level:
+        return
+    _sink(level, message % args if args else message)
+
+
+def error(message, *args):
+    event(ERROR, message, *args)
+
+
+def warning(message, *args):
+    event(WARNING, message, *args)
+
+
+def info(message, *args):
+    event(INFO, message, *args)
+
+
+def debug(message, *args):
+    event(DEBUG_LEVEL, message, *args)
+
+
+def trace(message, *args):
+    event(TRACE_LEVEL, message, *args)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One count per bound plus the overflow (+Inf) bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        # Estimated by linear interpolation inside the bucket holding the q-th value
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([str(bound) for bound in self.bounds] + ["+Inf"], self.counts)),
+        }
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        labels = self.labels
+        if exc_type is not None:
+            labels = dict(labels, outcome="error")
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **labels)
+        return False
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """
+        Returns:
+        dict: {"histograms": [...], "counters": [...]}, each entry with its name and labels.
+        """
+        with self._lock:
+            histograms = [
+                dict(name=name, labels=dict(labels), **histogram.to_dict())
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"timestamp": time.time(), "histograms": histograms, "counters": counters}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix="tema1_"):
+        # Prometheus text exposition format
+        def render_labels(labels, extra=None):
+            items = list(labels.items()) + ([extra] if extra else [])
+            if not items:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for entry in snapshot["counters"]:
+            name = f"{prefix}{entry['name']}_total"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{render_labels(entry['labels'])} {entry['value']}")
+        for entry in snapshot["histograms"]:
+            name = f"{prefix}{entry['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, count in entry["buckets"].items():
+                cumulative += count
+                lines.append(f"{name}_bucket{render_labels(entry['labels'], ('le', bound))} {cumulative}")
+            lines.append(f"{name}_sum{render_labels(entry['labels'])} {entry['sum']}")
+            lines.append(f"{name}_count{render_labels(entry['labels'])} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # .prom / .txt files get the Prometheus format, anything else JSON
+        text = self.to_prometheus() if str(path).endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w") as output:
+            output.write(text)
+
+
+METRICS = Metrics()
+
+
+def stage(name, **labels):
+    # Time one of the pipeline stages: gateway, decode, sign, submit, confirm
+    return METRICS.timer("stage_seconds", stage=name, **labels)
+
+
+def observe_stage(name, seconds, **labels):
+    METRICS.observe("stage_seconds", seconds, stage=name, **labels)
+
+
+def increment(name, amount=1, **labels):
+    METRICS.increment(name, amount, **labels)
+
+
+class InstrumentedProvider:
+    """
+    Wraps a network provider so every call is timed as the "gateway" stage,
+    labelled with the method name, and failures are counted. Coroutine
+    methods are wrapped as coroutines.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def __getattr__(self, name):
+        attribute = getattr(self.provider, name)
+        if not callable(attribute):
+            return attribute
+
+        if inspect.iscoroutinefunction(attribute):
+            async def call_async(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await attribute(*args, **kwargs)
+                except Exception:
+                    METRICS.increment("gateway_errors", method=name)
+                    raise
+                finally:
+                    METRICS.observe("stage_seconds", time.perf_counter() - started, stage="gateway", method=name)
+
+            return call_async
+
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            except Exception:
+                METRICS.increment("gateway_errors", method=name)
+                raise
+            finally:
+                METRICS.observe("stage_seconds", time.perf_counter() - started, stage="gateway", method=name)
+
+        return call
+
+
+set_level(os.getenv("TRACE_LEVEL", "info"))
@@ -1,11 +1,17 @@
-from multiversx_sdk import Address, ProxyNetworkProvider, SmartContractTransactionsFactory, UserSigner, Transaction, TransactionsConverter, TransactionsFactoryConfig
+import os
+from multiversx_sdk import Address, SmartContractTransactionsFactory, UserSigner, Transaction, TransactionsConverter, TransactionsFactoryConfig
 from multiversx_sdk.abi import Abi
 from pathlib import Path
+from abi_codegen import load_codec
+from gas_estimator import GasEstimator
+from multi_gateway import provider_for
+from tx_tracker import TransactionTracker
 
 # Initialize the provider
 config = TransactionsFactoryConfig(chain_id="D")
 
-provider = ProxyNetworkProvider("https://devnet-gateway.multiversx.com")
+# GATEWAY_URLS="url1,url2" balances over several gateways, see multi_gateway.py
+provider = provider_for(os.getenv("GATEWAY_URLS") or os.getenv("GATEWAY_URL", "https://devnet-gateway.multiversx.com"))
 network_config = provider.get_network_config()
 # provider.set_chain_id("D")  # For Devnet, use "1" for Mainnet
 
@@ -31,9 +37,10 @@ transaction = factory.create_transaction_for_execute(
     contract=contract_address,
     function="getYourNftCardProperties",
     arguments=[],  # No arguments required for this function
-    gas_limit=500_000,  # Adjust gas limit as needed
+    gas_limit=500_000,  # Upper bound, replaced by the simulated estimate below
     sender=ahmed,  # Address of the caller
 )
+GasEstimator(provider).apply(transaction, "getYourNftCardProperties", fallback=500_000)
 
 
 # Sign the transaction
@@ -42,8 +49,11 @@ signed_transaction = signer.sign(transaction)
 # Send the signed transaction to the network
 tx_hash = provider.send_transaction(signed_transaction)
 
-# Wait for the transaction result
-result = provider.get_transaction_status(tx_hash)
+# Wait for the transaction to be executed and decode its result
+tracker = TransactionTracker(provider, codec=load_codec(abi_path), round_duration=network_config.round_duration / 1000)
+tracker.track(tx_hash, "getYourNftCardProperties")
+result = tracker.wait(tx_hash)
+tracker.close()
 
 # Print the result
 print("Transaction Hash:", tx_hash)
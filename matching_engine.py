@@ -0,0 +1,164 @@
+import bisect
+
+# Assigns available NFTs to every student at once.
+#
+# exchangeNft only checks class and rarity, so every (class, rarity) pair is an
+# independent bucket and the largest possible assignment simply serves
+# min(demand, supply) students in each bucket. Within a bucket power breaks
+# ties: students first get a card with exactly the power they asked for, and
+# the rest are paired with the nearest power still in stock (the higher one
+# when two are equally near). Powers are grouped into per-value stacks, so the
+# whole run is one pass over demand and supply plus a sort of the distinct
+# power values, instead of a scan of the supply per student.
+
+
+class Assignment:
+    __slots__ = ("student", "nonce", "nft_class", "rarity", "wanted_power", "power")
+
+    def __init__(self, student, nonce, nft_class, rarity, wanted_power, power):
+        self.student = student
+        self.nonce = nonce
+        self.nft_class = nft_class
+        self.rarity = rarity
+        self.wanted_power = wanted_power
+        self.power = power
+
+    @property
+    def exact(self):
+        return self.power == self.wanted_power
+
+    def __repr__(self):
+        return (
+            f"Assignment({self.student!r}, nonce={self.nonce}, class={self.nft_class}, "
+            f"rarity={self.rarity}, power={self.power}/{self.wanted_power})"
+        )
+
+
+class Matching:
+    def __init__(self, assignments, unmatched):
+        # assignments: Assignment per served student, in demand order
+        # unmatched: students whose (class, rarity) ran out of supply
+        self.assignments = assignments
+        self.unmatched = unmatched
+
+    def __len__(self):
+        return len(self.assignments)
+
+    def __iter__(self):
+        return iter(self.assignments)
+
+    def nonces(self):
+        # exchangeNft arguments, one per served student
+        return [assignment.nonce for assignment in self.assignments]
+
+    def by_student(self):
+        return {assignment.student: assignment for assignment in self.assignments}
+
+    def stats(self):
+        exact = sum(1 for assignment in self.assignments if assignment.exact)
+        return {
+            "assigned": len(self.assignments),
+            "exact_power": exact,
+            "nearest_power": len(self.assignments) - exact,
+            "unmatched": len(self.unmatched),
+            "power_distance": sum(abs(a.power - a.wanted_power) for a in self.assignments),
+        }
+
+
+def _properties(card):
+    # Codec CardProperties, (class, rarity, power) tuples, or supply-style dicts
+    if isinstance(card, dict):
+        return card["class"], card["rarity"], card["power"]
+    if hasattr(card, "class_"):
+        return card.class_, card.rarity, card.power
+    nft_class, rarity, power = card
+    return nft_class, rarity, power
+
+
+def _iter_supply(supply):
+    # (nonce, class, rarity, power) for NFT dicts, an NftCatalog or NftColumns
+    if hasattr(supply, "column"):
+        available = supply.available
+        columns = [supply.column(name)[available].tolist() for name in ("nonce", "class", "rarity", "power")]
+        return zip(*columns)
+    return ((nft["nonce"], nft["class"], nft["rarity"], nft["power"]) for nft in supply)
+
+
+def _demand_items(demands):
+    if isinstance(demands, dict):
+        return demands.items()
+    return demands
+
+
+def match_students(demands, supply):
+    """
+    Assign one available NFT to as many students as possible.
+
+    Parameters:
+    demands (dict | iterable): Student -> card to obtain, e.g. the result of
+        query_students_cards(), or (student, card) pairs. Students whose card
+        is None are skipped.
+    supply (list | NftCatalog | NftColumns): Available NFTs, e.g. from query_available_nfts().
+
+    Returns:
+    Matching: Assignments in demand order and the students left unmatched.
+    An NFT is never assigned twice; among equal powers the lowest nonce goes first.
+    """
+    # (class, rarity) -> power -> nonces, highest first so pop() yields the lowest
+    stock = {}
+    for nonce, nft_class, rarity, power in _iter_supply(supply):
+        stock.setdefault((nft_class, rarity), {}).setdefault(power, []).append(nonce)
+    for powers in stock.values():
+        for nonces in powers.values():
+            nonces.sort(reverse=True)
+
+    # (class, rarity) -> [(position, student, power)], position keeps demand order
+    wanted = {}
+    for position, (student, card) in enumerate(_demand_items(demands)):
+        if card is None:
+            continue
+        nft_class, rarity, power = _properties(card)
+        wanted.setdefault((nft_class, rarity), []).append((position, student, power))
+
+    placed = []
+    unmatched = []
+    for key, students in wanted.items():
+        powers = stock.get(key)
+        if not powers:
+            unmatched.extend(students)
+            continue
+
+        # Exact power first
+        leftovers = []
+        for entry in students:
+            nonces = powers.get(entry[2])
+            if nonces:
+                placed.append((entry, key, nonces.pop(), entry[2]))
+            else:
+                leftovers.append(entry)
+
+        # Then the nearest power still in stock
+        in_stock = sorted(power for power, nonces in powers.items() if nonces)
+        for entry in leftovers:
+            if not in_stock:
+                unmatched.append(entry)
+                continue
+            wanted_power = entry[2]
+            index = bisect.bisect_left(in_stock, wanted_power)
+            if index == len(in_stock) or (
+                index > 0 and wanted_power - in_stock[index - 1] < in_stock[index] - wanted_power
+            ):
+                index -= 1
+            power = in_stock[index]
+            nonces = powers[power]
+            placed.append((entry, key, nonces.pop(), power))
+            if not nonces:
+                del in_stock[index]
+
+    placed.sort(key=lambda item: item[0][0])
+    unmatched.sort()
+    assignments = [
+        Assignment(student, nonce, nft_class, rarity, wanted_power, power)
+        for (_, student, wanted_power), (nft_class, rarity), nonce, power in placed
+    ]
+    return Matching(assignments, [student for _, student, _ in unmatched])
@@ -0,0 +1,820 @@
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from multiversx_sdk import Address, TransactionComputer, TransactionsConverter, UserPublicKey
+
+from abi_codegen import DEFAULT_ABI_PATH, load_codec
+from nft_attributes import decode_attributes, encode_raw_attributes
+
+# Local stand-in for the MultiversX proxy gateway, for offline load tests.
+#
+# Tema1Model keeps accounts, tokens and the Tema1 contract state in memory and
+# executes sent transactions in blocks produced every block_time seconds.
+# Contract views are answered with values encoded by the generated codec, so
+# clients decode them exactly as they would devnet responses. MockGateway
+# serves the proxy routes used by this project over HTTP, with configurable
+# latency and error injection; several gateways can share one model to stand
+# in for a pool of nodes.
+#
+#   python mock_gateway.py --port 7950 --block-time 0.6 --latency 0.02 --error-rate 0.01
+#   GATEWAY_URL=http://127.0.0.1:7950 python -m assignment1 supply
+
+DEFAULT_CONTRACT_ADDRESS = "erd1qyu5wthldzr8wx5c9ucg8kjagg0jfs53s8nr3zpz3hypefsdd8ssycr6th"
+DEFAULT_BALANCE = 100 * 10**18  # 100 EGLD for every account seen for the first time
+NETWORK_CONFIG = {
+    "erd_chain_id": "D",
+    "erd_gas_per_data_byte": 1500,
+    "erd_min_gas_limit": 50000,
+    "erd_min_gas_price": 1000000000,
+    "erd_gas_price_modifier": "0.01",
+    "erd_min_transaction_version": 1,
+    "erd_num_shards_without_meta": 3,
+    "erd_rounds_per_epoch": 2400,
+    "erd_top_up_factor": "0.5",
+    "erd_start_time": 0,
+}
+# Gas consumed by execution, on top of the base and data costs
+EXECUTION_GAS = {
+    "ESDTNFTCreate": 1_500_000,
+    "exchangeNft": 3_000_000,
+    "getYourNftCardProperties": 2_000_000,
+    "createNftWithAttributes": 5_000_000,
+    "issueNft": 10_000_000,
+}
+DEFAULT_EXECUTION_GAS = 1_000_000
+MAX_NONCE_GAP = 100
+RETURN_CODE_OK = "6f6b"
+
+
+class GatewayError(Exception):
+    # Rejected request, answered with this HTTP status and message
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ContractError(Exception):
+    # signalError from contract execution; the transaction fails
+    pass
+
+
+class _Account:
+    __slots__ = ("nonce", "balance", "tokens")
+
+    def __init__(self, balance):
+        self.nonce = 0
+        self.balance = balance
+        # Token identifier -> {token nonce: EsdtTokenData}
+        self.tokens = {}
+
+
+def _hex_args(fields):
+    return [bytes.fromhex(field) for field in fields]
+
+
+def _split_identifier(identifier):
+    # "TICKER-abcdef-03" -> ("TICKER-abcdef", 3); fungible identifiers keep nonce 0
+    parts = identifier.split("-")
+    if len(parts) == 3:
+        return f"{parts[0]}-{parts[1]}", int(parts[2], 16)
+    return identifier, 0
+
+
+class Tema1Model:
+    def __init__(
+        self,
+        abi_path=DEFAULT_ABI_PATH,
+        contract_address=DEFAULT_CONTRACT_ADDRESS,
+        token_id="TEMA1-a1b2c3",
+        supply_size=100,
+        students=10,
+        block_time=0.6,
+        max_block_transactions=10000,
+        max_nonce_gap=MAX_NONCE_GAP,
+        verify_signatures=False,
+        seed=None,
+    ):
+        """
+        Parameters:
+        supply_size (int): NFTs held by the contract at start.
+        students (int): Registered students, each assigned a card.
+        block_time (float): Seconds between blocks.
+        max_block_transactions (int): Transactions executed per block at most.
+        max_nonce_gap (int): How far ahead of the account nonce a transaction may be.
+        verify_signatures (bool): Reject transactions with bad signatures (slower).
+        seed (int | None): Seed for the generated supply and students.
+        """
+        self.codec = load_codec(abi_path)
+        self.contract_address = contract_address
+        self.contract_pubkey = Address.new_from_bech32(contract_address).get_public_key()
+        self.token_id = token_id
+        self.chain_id = NETWORK_CONFIG["erd_chain_id"]
+        self.block_time = block_time
+        self.max_block_transactions = max_block_transactions
+        self.max_nonce_gap = max_nonce_gap
+        self.verify_signatures = verify_signatures
+        self.random = random.Random(seed)
+
+        self._converter = TransactionsConverter()
+        self._computer = TransactionComputer()
+        self._lock = threading.Lock()
+        self._accounts = {}
+        self._mempool = {}  # sender -> {nonce: transaction record}
+        self._transactions = {}
+        self._blocks = {}  # block nonce -> hashes executed in it
+        self.block_nonce = 1
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Contract state
+        self.supply = {}  # token nonce -> EsdtTokenData held by the contract
+        self._next_token_nonce = {}
+        self.students_cards = {}  # student pubkey -> CardProperties
+        self.cards_properties = []
+        for _ in range(supply_size):
+            self._mint_to_contract(self._random_properties())
+        for _ in range(students):
+            pubkey = bytes(self.random.getrandbits(8) for _ in range(32))
+            self._assign_card(pubkey)
+
+    # State helpers
+
+    def _random_properties(self):
+        return (
+            self.random.randrange(len(self.codec.CLASS_VARIANTS)),
+            self.random.randrange(len(self.codec.RARITY_VARIANTS)),
+            self.random.randrange(len(self.codec.POWER_VARIANTS)),
+        )
+
+    def _account(self, bech32):
+        account = self._accounts.get(bech32)
+        if account is None:
+            account = self._accounts[bech32] = _Account(DEFAULT_BALANCE)
+        return account
+
+    def _new_token_nonce(self, identifier):
+        nonce = self._next_token_nonce.get(identifier, 0) + 1
+        self._next_token_nonce[identifier] = nonce
+        return nonce
+
+    def _token_data(self, name, attributes, creator, uris=()):
+        return self.codec.EsdtTokenData(
+            token_type=1,
+            amount=1,
+            frozen=False,
+            hash=hashlib.sha256(name + attributes).digest(),
+            name=name,
+            attributes=attributes,
+            creator=creator,
+            royalties=0,
+            uris=list(uris),
+        )
+
+    def _mint_to_contract(self, properties, name=None):
+        nonce = self._new_token_nonce(self.token_id)
+        nft_class, rarity, power = properties
+        name = name or f"Tema1 #{nonce}".encode()
+        self.supply[nonce] = self._token_data(name, encode_raw_attributes(nft_class, rarity, power), self.contract_pubkey)
+        return nonce
+
+    def _assign_card(self, pubkey):
+        # Students are given the properties of a card the contract holds
+        if self.supply:
+            nonce = self.random.choice(list(self.supply))
+            properties = decode_attributes(self.supply[nonce].attributes)
+        else:
+            properties = self._random_properties()
+        card = self.codec.CardProperties(*properties)
+        self.students_cards[pubkey] = card
+        self.cards_properties.append(card)
+        return card
+
+    def fund(self, bech32, amount):
+        with self._lock:
+            self._account(bech32).balance += amount
+
+    # Block production
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._produce_blocks, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _produce_blocks(self):
+        while not self._stop.wait(self.block_time):
+            self.produce_block()
+
+    def produce_block(self):
+        """
+        Execute pending transactions whose nonce is next for their sender.
+
+        Returns:
+        int: Number of transactions executed.
+        """
+        with self._lock:
+            self.block_nonce += 1
+            executed = 0
+            for sender, pending in list(self._mempool.items()):
+                account = self._account(sender)
+                while account.nonce in pending and executed < self.max_block_transactions:
+                    record = pending.pop(account.nonce)
+                    self._execute(account, record)
+                    executed += 1
+                if not pending:
+                    del self._mempool[sender]
+            return executed
+
+    # Transactions
+
+    def submit(self, transaction_dict):
+        """
+        Validate a transaction and add it to the mempool.
+
+        Returns:
+        str: Transaction hash.
+        """
+        try:
+            transaction = self._converter.dictionary_to_transaction(transaction_dict)
+        except Exception as e:
+            raise GatewayError(400, f"invalid transaction: {e}")
+        if transaction.chain_id != self.chain_id:
+            raise GatewayError(400, "invalid chain ID")
+        data = bytes(transaction.data or b"")
+        min_gas = NETWORK_CONFIG["erd_min_gas_limit"] + NETWORK_CONFIG["erd_gas_per_data_byte"] * len(data)
+        if transaction.gas_limit < min_gas:
+            raise GatewayError(400, "insufficient gas limit")
+        if self.verify_signatures:
+            signable = self._computer.compute_bytes_for_signing(transaction)
+            public_key = UserPublicKey(Address.new_from_bech32(transaction.sender).get_public_key())
+            if not public_key.verify(signable, transaction.signature):
+                raise GatewayError(400, "invalid signature")
+        tx_hash = self._computer.compute_transaction_hash(transaction).hex()
+
+        with self._lock:
+            account = self._account(transaction.sender)
+            if transaction.nonce < account.nonce:
+                raise GatewayError(400, "transaction generation failed: lowerNonceInTransaction")
+            if transaction.nonce > account.nonce + self.max_nonce_gap:
+                raise GatewayError(400, "transaction generation failed: nonce too high")
+            fee = transaction.gas_limit * transaction.gas_price
+            if account.balance < fee + int(transaction.value):
+                raise GatewayError(400, "transaction generation failed: insufficient funds")
+            record = {
+                "hash": tx_hash,
+                "transaction": transaction,
+                "status": "pending",
+                "results": [],
+                "events": [],
+                "block_nonce": 0,
+            }
+            self._transactions[tx_hash] = record
+            self._mempool.setdefault(transaction.sender, {})[transaction.nonce] = record
+        return tx_hash
+
+    def _execute(self, account, record):
+        transaction = record["transaction"]
+        account.nonce += 1
+        record["block_nonce"] = self.block_nonce
+        self._blocks.setdefault(self.block_nonce, []).append(record["hash"])
+
+        data = bytes(transaction.data or b"").decode(errors="replace")
+        fields = data.split("@") if data else [""]
+        function = fields[0]
+        gas_needed = (
+            NETWORK_CONFIG["erd_min_gas_limit"]
+            + NETWORK_CONFIG["erd_gas_per_data_byte"] * len(transaction.data or b"")
+            + (EXECUTION_GAS.get(self._called_function(fields), DEFAULT_EXECUTION_GAS) if data else 0)
+        )
+        account.balance -= min(gas_needed, transaction.gas_limit) * transaction.gas_price
+        record["function"] = self._called_function(fields)
+
+        try:
+            if transaction.gas_limit < gas_needed:
+                raise ContractError("not enough gas")
+            value = int(transaction.value)
+            if account.balance < value:
+                raise ContractError("insufficient funds")
+            # Keep the state untouched if execution fails halfway
+            snapshot = self._snapshot(transaction)
+            try:
+                results = self._dispatch(transaction, function, fields[1:], value)
+            except ContractError:
+                self._restore(snapshot)
+                raise
+            account.balance -= value
+            self._account(transaction.receiver).balance += value
+            record["status"] = "success"
+            record["results"] = ["@" + "@".join([RETURN_CODE_OK] + [part.hex() for part in results])]
+        except ContractError as e:
+            record["status"] = "fail"
+            record["events"] = [{
+                "address": transaction.sender,
+                "identifier": "signalError",
+                "topics": [
+                    base64.b64encode(Address.new_from_bech32(transaction.sender).get_public_key()).decode(),
+                    base64.b64encode(str(e).encode()).decode(),
+                ],
+                "data": None,
+            }]
+
+    @staticmethod
+    def _called_function(fields):
+        function = fields[0]
+        if function == "ESDTTransfer" and len(fields) > 3:
+            return bytes.fromhex(fields[3]).decode(errors="replace")
+        if function == "ESDTNFTTransfer" and len(fields) > 5:
+            return bytes.fromhex(fields[5]).decode(errors="replace")
+        return function
+
+    def _snapshot(self, transaction):
+        sender = self._account(transaction.sender)
+        return (sender, {identifier: dict(tokens) for identifier, tokens in sender.tokens.items()}, dict(self.supply))
+
+    def _restore(self, snapshot):
+        sender, tokens, supply = snapshot
+        sender.tokens = tokens
+        self.supply = supply
+
+    def _dispatch(self, transaction, function, fields, value):
+        if function == "ESDTNFTCreate":
+            if transaction.sender != transaction.receiver:
+                raise ContractError("ESDTNFTCreate must be sent to self")
+            return self._esdt_nft_create(transaction.sender, fields)
+
+        payment = None
+        if function in ("ESDTTransfer", "ESDTNFTTransfer"):
+            payment, receiver, function, fields = self._take_payment(transaction, function, fields)
+        else:
+            receiver = transaction.receiver
+
+        if receiver != self.contract_address:
+            if payment is not None:
+                self._account(receiver).tokens.setdefault(payment[0], {})[payment[1]] = payment[2]
+            if function:
+                raise ContractError(f"invalid function: {function}")
+            return []
+
+        handler = getattr(self, f"_endpoint_{function}", None)
+        if handler is None:
+            raise ContractError(f"invalid function (not found): {function}")
+        return handler(transaction.sender, _hex_args(fields), payment)
+
+    def _esdt_nft_create(self, sender, fields):
+        if len(fields) < 6:
+            raise ContractError("invalid arguments to ESDTNFTCreate")
+        identifier = bytes.fromhex(fields[0]).decode()
+        name = bytes.fromhex(fields[2])
+        attributes = bytes.fromhex(fields[5])
+        uris = _hex_args(fields[6:])
+        nonce = self._new_token_nonce(identifier)
+        creator = Address.new_from_bech32(sender).get_public_key()
+        self._account(sender).tokens.setdefault(identifier, {})[nonce] = self._token_data(name, attributes, creator, uris)
+        return [self.codec.top_encode_u64(nonce)]
+
+    def _take_payment(self, transaction, function, fields):
+        # ESDTTransfer@token@amount@function@args or
+        # ESDTNFTTransfer@token@nonce@amount@receiver@function@args (sent to self)
+        if function == "ESDTTransfer":
+            identifier, token_nonce = _split_identifier(bytes.fromhex(fields[0]).decode())
+            receiver = transaction.receiver
+            rest = fields[2:]
+        else:
+            identifier = bytes.fromhex(fields[0]).decode()
+            token_nonce = int(fields[1] or "0", 16)
+            receiver = Address(bytes.fromhex(fields[3]), "erd").to_bech32()
+            rest = fields[4:]
+        tokens = self._account(transaction.sender).tokens.get(identifier, {})
+        if token_nonce not in tokens:
+            raise ContractError("insufficient ESDT balance")
+        token_data = tokens.pop(token_nonce)
+        called = bytes.fromhex(rest[0]).decode() if rest else ""
+        return (identifier, token_nonce, token_data), receiver, called, rest[1:]
+
+    # Tema1 endpoints, called with the sender, decoded hex arguments and the ESDT payment
+
+    def _endpoint_issueNft(self, sender, args, payment):
+        ticker = args[1].decode() if len(args) > 1 else "TEMA1"
+        self.token_id = f"{ticker}-{self.random.getrandbits(24):06x}"
+        return []
+
+    def _endpoint_createNftWithAttributes(self, sender, args, payment):
+        if len(args) < 4:
+            raise ContractError("wrong number of arguments")
+        properties = tuple(int.from_bytes(arg, "big") for arg in args[1:4])
+        self._mint_to_contract(properties, name=args[0])
+        return []
+
+    def _endpoint_getYourNftCardProperties(self, sender, args, payment):
+        pubkey = Address.new_from_bech32(sender).get_public_key()
+        card = self.students_cards.get(pubkey) or self._assign_card(pubkey)
+        return [self.codec.top_encode_CardProperties(card)]
+
+    def _endpoint_exchangeNft(self, sender, args, payment):
+        if payment is None:
+            raise ContractError("an NFT payment is required")
+        nonce = self.codec.top_decode_u64(args[0]) if args else 0
+        wanted = self.supply.get(nonce)
+        if wanted is None:
+            raise ContractError("NFT not found in the supply")
+        offered = decode_attributes(payment[2].attributes)
+        expected = decode_attributes(wanted.attributes)
+        # Class and rarity must agree, the same rule find_matching_nft() applies
+        if offered is None or offered[:2] != expected[:2]:
+            raise ContractError("NFT properties do not match")
+        del self.supply[nonce]
+        self._account(sender).tokens.setdefault(self.token_id, {})[nonce] = wanted
+        self._account(self.contract_address).tokens.setdefault(payment[0], {})[payment[1]] = payment[2]
+        return []
+
+    # Read routes
+
+    def _root_hash(self, bech32, account):
+        # Stands in for the account's storage trie root: it changes whenever
+        # the tokens it holds (and, for the contract, its supply) change
+        root = hashlib.blake2b(digest_size=32)
+        holdings = [(self.token_id, self.supply)] if bech32 == self.contract_address else []
+        for identifier, tokens in sorted(holdings + list(account.tokens.items()), key=lambda item: item[0]):
+            for nonce, token_data in sorted(tokens.items()):
+                root.update(f"{identifier}-{nonce}:{token_data.amount}:".encode())
+                root.update(token_data.hash + token_data.attributes)
+        return root.hexdigest()
+
+    def account(self, bech32):
+        with self._lock:
+            account = self._account(bech32)
+            return {
+                "address": bech32,
+                "nonce": account.nonce,
+                "balance": str(account.balance),
+                "rootHash": self._root_hash(bech32, account),
+            }
+
+    def transaction(self, tx_hash):
+        with self._lock:
+            record = self._transactions.get(tx_hash)
+            if record is None:
+                raise GatewayError(404, "transaction not found")
+            transaction = record["transaction"]
+            return {
+                "type": "normal",
+                "hash": tx_hash,
+                "nonce": transaction.nonce,
+                "value": str(transaction.value),
+                "sender": transaction.sender,
+                "receiver": transaction.receiver,
+                "gasPrice": transaction.gas_price,
+                "gasLimit": transaction.gas_limit,
+                "data": base64.b64encode(bytes(transaction.data or b"")).decode(),
+                "signature": bytes(transaction.signature).hex(),
+                "status": record["status"],
+                "function": record.get("function", ""),
+                "blockNonce": record["block_nonce"],
+                "hyperblockNonce": record["block_nonce"],
+                "smartContractResults": [
+                    {"hash": f"{tx_hash}-{index}", "sender": transaction.receiver, "receiver": transaction.sender,
+                     "data": data, "prevTxHash": tx_hash, "originalTxHash": tx_hash}
+                    for index, data in enumerate(record["results"])
+                ],
+                "logs": {"address": transaction.sender, "events": record["events"]},
+            }
+
+    def hyperblock(self, block_nonce):
+        # Every block is final one block later, like network_status() reports
+        with self._lock:
+            if not 0 < block_nonce < self.block_nonce:
+                raise GatewayError(404, "block not found")
+            records = [self._transactions[tx_hash] for tx_hash in self._blocks.get(block_nonce, ())]
+            return {
+                "nonce": block_nonce,
+                "numTxs": len(records),
+                "transactions": [
+                    {
+                        "type": "normal",
+                        "hash": record["hash"],
+                        "nonce": record["transaction"].nonce,
+                        "sender": record["transaction"].sender,
+                        "receiver": record["transaction"].receiver,
+                        "status": record["status"],
+                    }
+                    for record in records
+                ],
+            }
+
+    def transaction_status(self, tx_hash):
+        with self._lock:
+            record = self._transactions.get(tx_hash)
+            if record is None:
+                raise GatewayError(404, "transaction not found")
+            return record["status"]
+
+    def query(self, request):
+        function = request.get("funcName", "")
+        if request.get("scAddress") != self.contract_address:
+            return {"returnData": None, "returnCode": "function not found", "returnMessage": "contract not found"}
+        handler = getattr(self, f"_view_{function}", None)
+        if handler is None:
+            return {"returnData": None, "returnCode": "function not found", "returnMessage": f"invalid function: {function}"}
+        args = _hex_args(request.get("args") or [])
+        with self._lock:
+            try:
+                parts = handler(args, request.get("caller"))
+            except ContractError as e:
+                return {"returnData": None, "returnCode": "user error", "returnMessage": str(e)}
+        return {
+            "returnData": [base64.b64encode(part).decode() for part in parts],
+            "returnCode": "ok",
+            "returnMessage": "",
+            "gasRemaining": 0,
+        }
+
+    def _view_getTokenId(self, args, caller):
+        return [self.codec.top_encode_TokenIdentifier(self.token_id.encode())]
+
+    _view_tokenId = _view_getTokenId
+
+    def _view_getTokenData(self, args, caller):
+        token_data = self.supply.get(self.codec.top_decode_u64(args[0]) if args else 0)
+        if token_data is None:
+            raise ContractError("NFT not found")
+        return [self.codec.top_encode_EsdtTokenData(token_data)]
+
+    def _view_nftSupply(self, args, caller):
+        encode = self.codec.top_encode_EsdtTokenData
+        return [encode(token_data) for _, token_data in sorted(self.supply.items())]
+
+    def _view_cardsProperties(self, args, caller):
+        return [self.codec.top_encode_CardProperties(card) for card in self.cards_properties]
+
+    def _view_studentsCards(self, args, caller):
+        card = self.students_cards.get(bytes(args[0])) if args else None
+        return [self.codec.top_encode_CardProperties(card)] if card is not None else []
+
+    def _view_studentsAddresses(self, args, caller):
+        return [self.codec.top_encode_Address(pubkey) for pubkey in self.students_cards]
+
+    def _view_getYourNftCardProperties(self, args, caller):
+        # Mutable endpoint, but simulating it as a view is handy for tests
+        if not caller:
+            raise ContractError("caller required")
+        card = self.students_cards.get(Address.new_from_bech32(caller).get_public_key())
+        if card is None:
+            raise ContractError("no card assigned")
+        return [self.codec.top_encode_CardProperties(card)]
+
+    def cost(self, transaction_dict):
+        transaction = self._converter.dictionary_to_transaction(transaction_dict)
+        data = bytes(transaction.data or b"")
+        fields = data.decode(errors="replace").split("@")
+        execution = EXECUTION_GAS.get(self._called_function(fields), DEFAULT_EXECUTION_GAS) if data else 0
+        return NETWORK_CONFIG["erd_min_gas_limit"] + NETWORK_CONFIG["erd_gas_per_data_byte"] * len(data) + execution
+
+    def network_config(self):
+        return dict(NETWORK_CONFIG, erd_round_duration=int(self.block_time * 1000))
+
+    def network_status(self, shard):
+        with self._lock:
+            nonce = self.block_nonce
+        return {
+            "erd_current_round": nonce,
+            "erd_nonce": nonce,
+            "erd_highest_final_nonce": max(0, nonce - 1),
+            "erd_epoch_number": nonce // NETWORK_CONFIG["erd_rounds_per_epoch"],
+        }
+
+    def stats(self):
+        with self._lock:
+            statuses = {}
+            for record in self._transactions.values():
+                statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+            return {
+                "block_nonce": self.block_nonce,
+                "transactions": statuses,
+                "mempool": sum(len(pending) for pending in self._mempool.values()),
+                "supply": len(self.supply),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = [
+        ("GET", re.compile(r"^/address/(?P<address>[^/]+)$"), "_get_account"),
+        ("GET", re.compile(r"^/transaction/(?P<tx_hash>[0-9a-f]+)/process-status$"), "_get_process_status"),
+        ("GET", re.compile(r"^/transaction/(?P<tx_hash>[0-9a-f]+)/status$"), "_get_process_status"),
+        ("GET", re.compile(r"^/transaction/(?P<tx_hash>[0-9a-f]+)$"), "_get_transaction"),
+        ("GET", re.compile(r"^/network/config$"), "_get_network_config"),
+        ("GET", re.compile(r"^/network/status/(?P<shard>\d+)$"), "_get_network_status"),
+        ("GET", re.compile(r"^/hyperblock/by-nonce/(?P<block_nonce>\d+)$"), "_get_hyperblock"),
+        ("POST", re.compile(r"^/transaction/send$"), "_post_send"),
+        ("POST", re.compile(r"^/transaction/send-multiple$"), "_post_send_multiple"),
+        ("POST", re.compile(r"^/transaction/cost$"), "_post_cost"),
+        ("POST", re.compile(r"^/vm-values/query$"), "_post_query"),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _reply(self, status, body, headers=()):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _dispatch(self, method):
+        gateway = self.server.gateway
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = urlsplit(self.path).path
+
+        gateway.wait_latency()
+        injected = gateway.injected_error()
+        if injected is not None:
+            status, headers = injected
+            self._reply(status, {"data": None, "error": "injected failure", "code": "internal_issue"}, headers)
+            return
+
+        for route_method, pattern, name in self.ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                try:
+                    payload = json.loads(body) if body else None
+                    data = getattr(self, name)(gateway.model, payload, **match.groupdict())
+                except GatewayError as e:
+                    self._reply(e.status, {"data": None, "error": e.message, "code": "bad_request"})
+                except Exception as e:
+                    self._reply(500, {"data": None, "error": str(e), "code": "internal_issue"})
+                else:
+                    self._reply(200, {"data": data, "error": "", "code": "successful"})
+                return
+        self._reply(404, {"data": None, "error": f"route not found: {method} {path}", "code": "bad_request"})
+
+    def _get_account(self, model, payload, address):
+        return {"account": model.account(address)}
+
+    def _get_process_status(self, model, payload, tx_hash):
+        return {"status": model.transaction_status(tx_hash)}
+
+    def _get_transaction(self, model, payload, tx_hash):
+        return {"transaction": model.transaction(tx_hash)}
+
+    def _get_network_config(self, model, payload):
+        return {"config": model.network_config()}
+
+    def _get_network_status(self, model, payload, shard):
+        return {"status": model.network_status(int(shard))}
+
+    def _get_hyperblock(self, model, payload, block_nonce):
+        return {"hyperblock": model.hyperblock(int(block_nonce))}
+
+    def _post_send(self, model, payload):
+        return {"txHash": model.submit(payload)}
+
+    def _post_send_multiple(self, model, payload):
+        # Like the proxy: rejected transactions are left out of txsHashes
+        hashes = {}
+        for index, transaction_dict in enumerate(payload or []):
+            try:
+                hashes[str(index)] = model.submit(transaction_dict)
+            except GatewayError:
+                continue
+        return {"numOfSentTxs": len(hashes), "txsHashes": hashes}
+
+    def _post_cost(self, model, payload):
+        return {"txGasUnits": model.cost(payload), "returnMessage": ""}
+
+    def _post_query(self, model, payload):
+        return {"data": model.query(payload or {})}
+
+
+class MockGateway:
+    def __init__(self, model, host="127.0.0.1", port=0, latency=0.0, latency_jitter=0.0, error_rate=0.0, throttle_share=0.5, seed=None):
+        """
+        Parameters:
+        model (Tema1Model): State served by this gateway; may be shared between gateways.
+        port (int): Port to listen on, 0 for any free port.
+        latency (float): Seconds added to every request.
+        latency_jitter (float): Mean of an exponential extra delay, giving a latency tail.
+        error_rate (float): Fraction of requests answered with an error instead.
+        throttle_share (float): Fraction of those errors that are 429 (with Retry-After)
+            rather than 500.
+        """
+        self.model = model
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_share = throttle_share
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.gateway = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def wait_latency(self):
+        delay = self.latency
+        if self.latency_jitter:
+            with self._random_lock:
+                delay += self.random.expovariate(1 / self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def injected_error(self):
+        if not self.error_rate:
+            return None
+        with self._random_lock:
+            if self.random.random() >= self.error_rate:
+                return None
+            throttled = self.random.random() < self.throttle_share
+        if throttled:
+            return 429, [("Retry-After", "1")]
+        return 500, []
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local mock of the MultiversX gateway with the Tema1 contract.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7950, help="Port of the first gateway; others follow")
+    parser.add_argument("--gateways", type=int, default=1, help="Gateways sharing one model")
+    parser.add_argument("--block-time", type=float, default=0.6)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--supply", type=int, default=100)
+    parser.add_argument("--students", type=int, default=10)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    model = Tema1Model(supply_size=args.supply, students=args.students, block_time=args.block_time, seed=args.seed)
+    model.start()
+    gateways = [
+        MockGateway(model, args.host, args.port + index if args.port else 0, args.latency,
+                    args.latency_jitter, args.error_rate, seed=args.seed).start()
+        for index in range(args.gateways)
+    ]
+    for gateway in gateways:
+        print(f"Mock gateway listening on {gateway.url}")
+    print(f"Contract: {model.contract_address}, token: {model.token_id}")
+    try:
+        while True:
+            time.sleep(10)
+            print(model.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for gateway in gateways:
+            gateway.stop()
+        model.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+import asyncio
+import hashlib
+import inspect
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from multiversx_sdk import ProxyNetworkProvider
+
+import instrumentation
+from traffic_control import classify_error, current_retry_budget, is_send_post
+
+# Several gateways behind one provider.
+#
+# Every call is timed per gateway into an exponentially weighted moving
+# average of latency and error rate. Reads go to the gateway with the best
+# score; if it has not answered after hedge_factor times its usual latency
+# the same read is also sent to the next best one and the first answer wins.
+# Sends and account reads are pinned to one gateway per sender address
+# (rendezvous hashing over the healthy gateways), so a sender's nonce is read
+# from and its transactions are broadcast through the same node and do not
+# race through proxies that lag behind each other; a batch with several
+# senders is split into one send per sender. A gateway that fails
+# failure_threshold times in a row is skipped for cooldown seconds, and a
+# call that fails on one gateway is retried on the next; a send only when it
+# was throttled, since after a timeout or a bare 503 it may already be in the
+# mempool. Under a traffic controller each failover spends a retry of the
+# call's RetryBudget, so the controller and the failover together stay within
+# one retry limit.
+# Only transport errors, timeouts and 5xx answers count as a gateway's
+# failure; anything else (a 4xx, an error body in an HTTP 200) is the
+# request's fault and goes back to the caller as is.
+#
+# The gateways may also be async_provider.AsyncProxyNetworkProvider
+# instances: their methods stay coroutines, hedges are tasks on the caller's
+# event loop, and routing, health and pinning work the same way.
+
+# Reads that depend on the sender's view of the chain; routed like its sends
+PINNED_READS = {"get_account"}
+
+
+def is_gateway_fault(error):
+    """
+    Whether an error is the gateway's fault (unreachable, timing out, failing)
+    rather than the request's, which every other gateway would reject as well.
+    """
+    status = getattr(error, "status", None)
+    if status is not None:
+        return status >= 500 or status == 408
+    return classify_error(error) in ("timeout", "unavailable")
+
+
+def _may_fail_over(error, send):
+    # Same rule as the traffic controller's retries: a send moves on only when it was throttled
+    if send:
+        return classify_error(error) == "throttled"
+    return is_gateway_fault(error)
+
+
+def _pin_key(name, args, kwargs):
+    # Sender address a call belongs to, or None if it is not pinned
+    if name == "send_transaction":
+        transaction = args[0] if args else kwargs.get("transaction")
+        return str(transaction.sender)
+    if name in PINNED_READS:
+        address = args[0] if args else kwargs.get("address")
+        return address.to_bech32() if hasattr(address, "to_bech32") else str(address)
+    return None
+
+
+class GatewayHealth:
+    __slots__ = ("url", "provider", "latency", "error_rate", "failures", "down_until", "calls", "errors")
+
+    def __init__(self, url, provider):
+        self.url = url
+        self.provider = provider
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.failures = 0
+        self.down_until = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    def score(self):
+        # Lower is better. Errors scale the latency and also add up to a second,
+        # so a gateway that never answered does not rank first on latency 0
+        return self.latency * (1 + 10 * self.error_rate) + self.error_rate
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "down": self.down_until > time.monotonic(),
+            "calls": self.calls,
+            "errors": self.errors,
+        }
+
+
+class MultiGatewayProvider:
+    def __init__(self, urls, alpha=0.2, hedge_factor=2.0, min_hedge_delay=0.05, max_hedges=1,
+                 failure_threshold=3, cooldown=5.0, max_workers=16, provider_factory=ProxyNetworkProvider):
+        """
+        Parameters:
+        urls (list): Gateway URLs.
+        alpha (float): Weight of the newest sample in the latency and error averages.
+        hedge_factor (float): A read is hedged once it takes this many times the
+            gateway's average latency.
+        min_hedge_delay (float): Seconds a read runs at least before it is hedged.
+        max_hedges (int): Extra gateways a read is sent to while it is still running.
+        failure_threshold (int): Consecutive failures after which a gateway is skipped.
+        cooldown (float): Seconds a failing gateway is skipped for.
+        provider_factory (callable): Builds the provider for one URL.
+        """
+        if not urls:
+            raise ValueError("At least one gateway URL is required")
+        self.gateways = [GatewayHealth(url, provider_factory(url)) for url in urls]
+        self.alpha = alpha
+        self.hedge_factor = hedge_factor
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedges = max_hedges
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gateway")
+
+    @property
+    def url(self):
+        return self.ranked()[0].url
+
+    def ranked(self):
+        # Healthy gateways by score, then the ones cooling down (soonest back first)
+        now = time.monotonic()
+        with self._lock:
+            healthy = sorted((gateway for gateway in self.gateways if gateway.down_until <= now), key=GatewayHealth.score)
+            down = sorted((gateway for gateway in self.gateways if gateway.down_until > now), key=lambda g: g.down_until)
+        return healthy + down
+
+    def pinned(self, key):
+        # Rendezvous hashing: a sender keeps its gateway until that gateway goes down
+        def weight(gateway):
+            return hashlib.blake2b(f"{key}|{gateway.url}".encode(), digest_size=8).digest()
+
+        ranked = self.ranked()
+        now = time.monotonic()
+        healthy = [gateway for gateway in ranked if gateway.down_until <= now]
+        preferred = sorted(healthy, key=weight, reverse=True)
+        return preferred + [gateway for gateway in ranked if gateway not in preferred]
+
+    def _observe(self, gateway, seconds, error=None):
+        fault = error is not None and is_gateway_fault(error)
+        with self._lock:
+            gateway.calls += 1
+            if error is None or not fault:
+                # A rejected request still shows how fast the gateway answers
+                gateway.latency = seconds if gateway.latency == 0 else (
+                    self.alpha * seconds + (1 - self.alpha) * gateway.latency
+                )
+            gateway.error_rate = self.alpha * fault + (1 - self.alpha) * gateway.error_rate
+            if fault:
+                gateway.errors += 1
+                gateway.failures += 1
+                if gateway.failures >= self.failure_threshold:
+                    gateway.down_until = time.monotonic() + self.cooldown
+                    gateway.failures = 0
+                    instrumentation.warning("Gateway %s is failing, skipping it for %ss", gateway.url, self.cooldown)
+            else:
+                gateway.failures = 0
+
+    def _call(self, gateway, name, args, kwargs):
+        started = time.perf_counter()
+        try:
+            result = getattr(gateway.provider, name)(*args, **kwargs)
+        except Exception as e:
+            self._observe(gateway, time.perf_counter() - started, e)
+            raise
+        self._observe(gateway, time.perf_counter() - started)
+        return result
+
+    def _hedge_delay(self, gateway):
+        return max(self.min_hedge_delay, self.hedge_factor * gateway.latency)
+
+    def _can_fail_over(self, candidates, launched):
+        # Another gateway is left and the retry budget of the call (if any) allows it
+        if launched >= len(candidates):
+            return False
+        budget = current_retry_budget()
+        return budget is None or budget.spend()
+
+    def _call_in_order(self, candidates, name, args, kwargs, send=False):
+        # Sends and pinned reads: never hedged, one gateway at a time, moving on
+        # only when a gateway is at fault (for sends, only when it throttled)
+        position = 0
+        while True:
+            try:
+                return self._call(candidates[position], name, args, kwargs)
+            except Exception as e:
+                if not _may_fail_over(e, send) or not self._can_fail_over(candidates, position + 1):
+                    raise
+            position += 1
+            instrumentation.increment("gateway_failovers", method=name)
+
+    def _read(self, candidates, name, args, kwargs):
+        pending = {}
+        launched = 0
+        hedges = 0
+        last_error = None
+
+        def launch():
+            nonlocal launched
+            gateway = candidates[launched]
+            launched += 1
+            pending[self._executor.submit(self._call, gateway, name, args, kwargs)] = gateway
+
+        launch()
+        while pending:
+            timeout = None
+            if hedges < self.max_hedges and launched < len(candidates):
+                timeout = self._hedge_delay(candidates[launched - 1])
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slow answer: ask the next gateway too; the slow call still finishes and is measured
+                hedges += 1
+                instrumentation.increment("gateway_hedges", method=name)
+                launch()
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    if not is_gateway_fault(e):
+                        raise
+                    last_error = e
+            if not pending and self._can_fail_over(candidates, launched):
+                instrumentation.increment("gateway_failovers", method=name)
+                launch()
+        raise last_error
+
+    async def _call_in_order_async(self, candidates, name, args, kwargs, send=False):
+        position = 0
+        while True:
+            try:
+                return await self._call_async(candidates[position], name, args, kwargs)
+            except Exception as e:
+                if not _may_fail_over(e, send) or not self._can_fail_over(candidates, position + 1):
+                    raise
+            position += 1
+            instrumentation.increment("gateway_failovers", method=name)
+
+    async def _call_async(self, gateway, name, args, kwargs):
+        started = time.perf_counter()
+        try:
+            result = await getattr(gateway.provider, name)(*args, **kwargs)
+        except Exception as e:
+            self._observe(gateway, time.perf_counter() - started, e)
+            raise
+        self._observe(gateway, time.perf_counter() - started)
+        return result
+
+    async def _read_async(self, candidates, name, args, kwargs):
+        # _read() for coroutine providers: the hedges are tasks on the caller's event loop
+        pending = set()
+        launched = 0
+        hedges = 0
+        last_error = None
+
+        def launch():
+            nonlocal launched
+            gateway = candidates[launched]
+            launched += 1
+            pending.add(asyncio.ensure_future(self._call_async(gateway, name, args, kwargs)))
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if hedges < self.max_hedges and launched < len(candidates):
+                    timeout = self._hedge_delay(candidates[launched - 1])
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedges += 1
+                    instrumentation.increment("gateway_hedges", method=name)
+                    launch()
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        if not is_gateway_fault(e):
+                            raise
+                        last_error = e
+                if not pending and self._can_fail_over(candidates, launched):
+                    instrumentation.increment("gateway_failovers", method=name)
+                    launch()
+            raise last_error
+        finally:
+            # The losing hedges are not awaited by anyone; let them finish and be measured
+            for task in pending:
+                task.add_done_callback(lambda finished: finished.cancelled() or finished.exception())
+
+    @staticmethod
+    def _by_sender(transactions):
+        by_sender = {}
+        for position, transaction in enumerate(transactions):
+            by_sender.setdefault(str(transaction.sender), []).append(position)
+        return by_sender
+
+    @staticmethod
+    def _merge_hashes(tx_hashes, positions, hashes):
+        # Hashes of one sender's request, keyed by position in that request, back to positions in the batch
+        hashes = hashes or {}
+        tx_hashes.update(
+            (str(position), hashes[str(index)]) for index, position in enumerate(positions) if str(index) in hashes
+        )
+
+    def _send_transactions(self, transactions):
+        """
+        send_transactions(): a batch goes out as one request per sender, each
+        through that sender's gateway.
+
+        Returns:
+        tuple: (number sent, {position in transactions as str: hash}), like
+        ProxyNetworkProvider.send_transactions(). If a sender's request fails,
+        the other senders are still sent and the first error is raised with
+        the hashes accepted so far in its tx_hashes attribute.
+        """
+        num_sent = 0
+        tx_hashes = {}
+        first_error = None
+        for sender, positions in self._by_sender(transactions).items():
+            batch = [transactions[position] for position in positions]
+            try:
+                sent, hashes = self._call_in_order(self.pinned(sender), "send_transactions", (batch,), {}, send=True)
+            except Exception as e:
+                first_error = first_error or e
+                continue
+            num_sent += sent
+            self._merge_hashes(tx_hashes, positions, hashes)
+        if first_error is not None:
+            first_error.tx_hashes = tx_hashes
+            raise first_error
+        return num_sent, tx_hashes
+
+    async def _send_transactions_async(self, transactions):
+        # _send_transactions() for coroutine providers; the senders' requests run concurrently
+        by_sender = self._by_sender(transactions)
+        results = await asyncio.gather(*(
+            self._call_in_order_async(
+                self.pinned(sender), "send_transactions", ([transactions[position] for position in positions],), {},
+                send=True,
+            )
+            for sender, positions in by_sender.items()
+        ), return_exceptions=True)
+        num_sent = 0
+        tx_hashes = {}
+        first_error = None
+        for positions, result in zip(by_sender.values(), results):
+            if isinstance(result, Exception):
+                first_error = first_error or result
+                continue
+            num_sent += result[0]
+            self._merge_hashes(tx_hashes, positions, result[1])
+        if first_error is not None:
+            first_error.tx_hashes = tx_hashes
+            raise first_error
+        return num_sent, tx_hashes
+
+    def __getattr__(self, name):
+        attribute = getattr(self.gateways[0].provider, name)
+        if not callable(attribute):
+            return attribute
+
+        if inspect.iscoroutinefunction(attribute):
+            async def call_async(*args, **kwargs):
+                if name == "send_transactions":
+                    return await self._send_transactions_async(*args, **kwargs)
+                key = _pin_key(name, args, kwargs)
+                if key is not None:
+                    return await self._call_in_order_async(
+                        self.pinned(key), name, args, kwargs, send=name not in PINNED_READS
+                    )
+                if is_send_post(name, args, kwargs):
+                    return await self._call_in_order_async(self.ranked(), name, args, kwargs, send=True)
+                return await self._read_async(self.ranked(), name, args, kwargs)
+
+            return call_async
+
+        def call(*args, **kwargs):
+            if name == "send_transactions":
+                return self._send_transactions(*args, **kwargs)
+            key = _pin_key(name, args, kwargs)
+            if key is not None:
+                return self._call_in_order(self.pinned(key), name, args, kwargs, send=name not in PINNED_READS)
+            if is_send_post(name, args, kwargs):
+                return self._call_in_order(self.ranked(), name, args, kwargs, send=True)
+            return self._read(self.ranked(), name, args, kwargs)
+
+        return call
+
+    def stats(self):
+        with self._lock:
+            return [gateway.to_dict() for gateway in self.gateways]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def close_async(self):
+        # Closes the pooled sessions of coroutine providers as well
+        for gateway in self.gateways:
+            close = getattr(gateway.provider, "close", None)
+            if inspect.iscoroutinefunction(close):
+                await close()
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close_async()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def provider_for(urls, provider_factory=ProxyNetworkProvider):
+    """
+    A provider for one gateway, a MultiGatewayProvider for several.
+
+    Parameters:
+    urls (str | list): One URL, a comma-separated list, or a list of URLs.
+    provider_factory (callable): Builds the provider for one URL.
+    """
+    if isinstance(urls, str):
+        urls = [url.strip() for url in urls.split(",") if url.strip()]
+    if len(urls) == 1:
+        return provider_factory(urls[0])
+    return MultiGatewayProvider(urls, provider_factory=provider_factory)
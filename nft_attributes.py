@@ -0,0 +1,109 @@
+from array import array
+
+# One codec for the two NFT attribute layouts found in this project:
+#
+#   text: b"tags:class8;rarity3;power2", written by create_nft() through ESDTNFTCreate
+#   raw:  exactly three bytes rarity, class, power, as read by query_available_nfts()
+#
+# Both are parsed straight from a memoryview of the buffer, without decoding
+# to str or copying slices.
+
+TEXT_PREFIX = b"tags:"
+RAW_LENGTH = 3
+_KEYS = (b"class", b"rarity", b"power")
+# Text values are unbounded decimals; larger ones do not fit a column
+_COLUMN_MAX = 2 ** 64 - 1
+
+
+def encode_text_attributes(nft_class, rarity, power):
+    return f"tags:class{nft_class};rarity{rarity};power{power}".encode()
+
+
+def encode_raw_attributes(nft_class, rarity, power):
+    return bytes((rarity, nft_class, power))
+
+
+def _read_number(view, offset):
+    value = 0
+    start = offset
+    end = len(view)
+    while offset < end and 48 <= view[offset] <= 57:
+        value = value * 10 + view[offset] - 48
+        offset += 1
+    return (value if offset > start else None), offset
+
+
+def _decode_text(view):
+    values = [None, None, None]
+    offset = len(TEXT_PREFIX)
+    end = len(view)
+    while offset < end:
+        for index, key in enumerate(_KEYS):
+            if view[offset:offset + len(key)] == key:
+                values[index], offset = _read_number(view, offset + len(key))
+                break
+        # Skip to the next ";"-separated entry
+        while offset < end and view[offset] != 59:
+            offset += 1
+        offset += 1
+    if None in values:
+        return None
+    return tuple(values)
+
+
+def decode_attributes(attributes):
+    """
+    Decode NFT attributes in either layout.
+
+    Parameters:
+    attributes (bytes | bytearray | memoryview): Attributes field of an EsdtTokenData.
+
+    Returns:
+    tuple | None: (class, rarity, power), or None if neither layout matches.
+    """
+    view = memoryview(attributes)
+    if view[:len(TEXT_PREFIX)] == TEXT_PREFIX:
+        return _decode_text(view)
+    if len(view) == RAW_LENGTH:
+        return view[1], view[0], view[2]
+    return None
+
+
+class AttributeColumns:
+    # Result of decode_many(): one unsigned 64-bit value per NFT in each array
+    __slots__ = ("class_", "rarity", "power", "valid")
+
+    def __init__(self):
+        self.class_ = array("Q")
+        self.rarity = array("Q")
+        self.power = array("Q")
+        self.valid = array("B")
+
+    def __len__(self):
+        return len(self.valid)
+
+
+def decode_many(attributes_list):
+    """
+    Decode many attribute fields in one pass into integer arrays.
+    Entries that match neither layout, or hold values too large for the
+    arrays, get zeros and valid = 0.
+    """
+    columns = AttributeColumns()
+    for attributes in attributes_list:
+        decoded = decode_attributes(attributes)
+        if decoded is None or max(decoded) > _COLUMN_MAX:
+            decoded = (0, 0, 0)
+            columns.valid.append(0)
+        else:
+            columns.valid.append(1)
+        columns.class_.append(decoded[0])
+        columns.rarity.append(decoded[1])
+        columns.power.append(decoded[2])
+    return columns
+
+
+def decode_supply(parts, codec):
+    # decode_many() over the raw return data parts of an nftSupply query,
+    # decoded by the generated codec (abi_codegen.load_codec)
+    return decode_many(token_data.attributes for token_data in codec.iter_nftSupply_output(parts))
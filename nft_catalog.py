@@ -0,0 +1,91 @@
+from itertools import combinations
+
+# Properties an NFT can be looked up by, in the order used for index keys
+CATALOG_FIELDS = ("class", "rarity", "power")
+
+
+def _index_keys(nft):
+    # One key per non-empty combination of fields, e.g. (("class", "rarity"), (8, 3))
+    for size in range(1, len(CATALOG_FIELDS) + 1):
+        for fields in combinations(CATALOG_FIELDS, size):
+            yield fields, tuple(nft[field] for field in fields)
+
+
+# In-memory index of available NFTs by class, rarity, power and their combinations.
+# insert() and remove() take batches, like NftColumns, so either can be kept
+# in step with a SupplyStore (SupplyStore.attach()).
+class NftCatalog:
+    def __init__(self, nfts=()):
+        self._by_nonce = {}
+        # (fields, values) -> {nonce: nft}; dicts keep insertion order, so the
+        # first candidate is the oldest NFT like in the original linear scan
+        self._index = {}
+        self.insert(nfts)
+
+    def __len__(self):
+        return len(self._by_nonce)
+
+    def __iter__(self):
+        return iter(self._by_nonce.values())
+
+    def __contains__(self, nonce):
+        return nonce in self._by_nonce
+
+    def get(self, nonce):
+        return self._by_nonce.get(nonce)
+
+    def insert(self, nfts):
+        """
+        Add NFTs (dicts with at least nonce, class, rarity and power), e.g.
+        ones minted since the last sync. Re-inserting a known nonce replaces
+        the previous entry.
+        """
+        for nft in nfts:
+            nonce = nft["nonce"]
+            self._discard(nonce)
+            self._by_nonce[nonce] = nft
+            for key in _index_keys(nft):
+                self._index.setdefault(key, {})[nonce] = nft
+
+    def remove(self, nonces):
+        """
+        Remove NFTs, e.g. once they have been exchanged.
+
+        Returns:
+        list: The removed NFTs; nonces not in the catalog are skipped.
+        """
+        removed = (self._discard(nonce) for nonce in nonces)
+        return [nft for nft in removed if nft is not None]
+
+    def _discard(self, nonce):
+        nft = self._by_nonce.pop(nonce, None)
+        if nft is None:
+            return None
+        for key in _index_keys(nft):
+            bucket = self._index.get(key)
+            if bucket is not None:
+                bucket.pop(nonce, None)
+                if not bucket:
+                    del self._index[key]
+        return nft
+
+    def _bucket(self, nft_class, rarity, power):
+        fields = []
+        values = []
+        for field, value in zip(CATALOG_FIELDS, (nft_class, rarity, power)):
+            if value is not None:
+                fields.append(field)
+                values.append(value)
+        if not fields:
+            return self._by_nonce
+        return self._index.get((tuple(fields), tuple(values)), {})
+
+    def candidates(self, nft_class=None, rarity=None, power=None):
+        """
+        Return the NFTs matching every property that is not None, oldest first.
+        """
+        return list(self._bucket(nft_class, rarity, power).values())
+
+    def find(self, nft_class=None, rarity=None, power=None):
+        # First (oldest) matching NFT, or None
+        return next(iter(self._bucket(nft_class, rarity, power).values()), None)
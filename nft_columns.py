@@ -0,0 +1,161 @@
+import numpy as np
+
+# Columns that can be filtered and sorted on
+COLUMNS = ("nonce", "class", "rarity", "power")
+
+
+# Columnar (structure of arrays) NFT catalog for large supplies. Each property
+# lives in its own NumPy array and token hashes share one byte pool, so a
+# million cards take tens of megabytes and filters run as vectorized masks.
+# Properties are unsigned 64-bit like the arrays of nft_attributes.decode_many(),
+# so any value the text attribute layout can carry fits.
+# Removed NFTs only clear their row in `available`; inserted ones are
+# appended, and the arrays are compacted once most rows are dead.
+class NftColumns:
+    def __init__(self, nonce, class_, rarity, power, hash_pool=b"", hash_offsets=None):
+        self.nonce = np.asarray(nonce, dtype=np.uint64)
+        self.class_ = np.asarray(class_, dtype=np.uint64)
+        self.rarity = np.asarray(rarity, dtype=np.uint64)
+        self.power = np.asarray(power, dtype=np.uint64)
+        self.hash_pool = bytes(hash_pool)
+        if hash_offsets is None:
+            hash_offsets = np.zeros(len(self.nonce) + 1, dtype=np.int64)
+        self.hash_offsets = np.asarray(hash_offsets, dtype=np.int64)
+        # Cleared when an NFT is exchanged, so arrays never have to be rebuilt
+        self.available = np.ones(len(self.nonce), dtype=bool)
+
+    @classmethod
+    def from_nfts(cls, nfts):
+        """
+        Build the columns from query_available_nfts()-style dicts.
+        The "token_id" hex strings end up in the shared hash pool.
+        """
+        nfts = list(nfts)
+        count = len(nfts)
+        nonce = np.fromiter((nft["nonce"] for nft in nfts), dtype=np.uint64, count=count)
+        class_ = np.fromiter((nft["class"] for nft in nfts), dtype=np.uint64, count=count)
+        rarity = np.fromiter((nft["rarity"] for nft in nfts), dtype=np.uint64, count=count)
+        power = np.fromiter((nft["power"] for nft in nfts), dtype=np.uint64, count=count)
+
+        hashes = [bytes.fromhex(nft.get("token_id") or "") for nft in nfts]
+        hash_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(token_hash) for token_hash in hashes], out=hash_offsets[1:])
+        return cls(nonce, class_, rarity, power, b"".join(hashes), hash_offsets)
+
+    def __len__(self):
+        return len(self.nonce)
+
+    @property
+    def nbytes(self):
+        arrays = (self.nonce, self.class_, self.rarity, self.power, self.hash_offsets, self.available)
+        return sum(array.nbytes for array in arrays) + len(self.hash_pool)
+
+    def column(self, name):
+        if name == "class":
+            return self.class_
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown column: {name}")
+        return getattr(self, name)
+
+    def token_hash(self, index):
+        return self.hash_pool[self.hash_offsets[index]:self.hash_offsets[index + 1]]
+
+    def mask(self, nft_class=None, rarity=None, power=None, min_rarity=None, min_power=None):
+        # Boolean mask of available NFTs matching every given criterion
+        mask = self.available.copy()
+        for column, value in ((self.class_, nft_class), (self.rarity, rarity), (self.power, power)):
+            if value is not None:
+                mask &= column == value
+        if min_rarity is not None:
+            mask &= self.rarity >= min_rarity
+        if min_power is not None:
+            mask &= self.power >= min_power
+        return mask
+
+    def select(self, order_by=("nonce",), descending=False, limit=None, **criteria):
+        """
+        Return the row indices matching the criteria, sorted by the given columns.
+
+        Example: all Epic (2) Mages (1) with power at least Medium (1), by nonce:
+            columns.select(nft_class=1, rarity=2, min_power=1)
+
+        Parameters:
+        order_by (tuple): Column names, most significant first.
+        descending (bool): Sort from highest to lowest.
+        limit (int | None): Keep only the first rows after sorting.
+        criteria: Keyword arguments accepted by mask().
+        """
+        indices = np.flatnonzero(self.mask(**criteria))
+        if order_by:
+            # lexsort treats the last key as the primary one
+            keys = [self.column(name)[indices] for name in reversed(order_by)]
+            order = np.lexsort(keys)
+            if descending:
+                order = order[::-1]
+            indices = indices[order]
+        if limit is not None:
+            indices = indices[:limit]
+        return indices
+
+    def find(self, nft_class=None, rarity=None, power=None):
+        # Lowest-nonce match as a dict, like find_matching_nft()
+        indices = self.select(nft_class=nft_class, rarity=rarity, power=power, limit=1)
+        if len(indices) == 0:
+            return None
+        return self.to_dicts(indices)[0]
+
+    def insert(self, nfts):
+        """
+        Append NFTs (query_available_nfts()-style dicts with token nonces),
+        e.g. ones minted since the last sync. A nonce already present is
+        replaced: its old row stops being available.
+        """
+        added = NftColumns.from_nfts(nfts)
+        if not len(added):
+            return
+        self.remove(added.nonce)
+        self.nonce = np.concatenate((self.nonce, added.nonce))
+        self.class_ = np.concatenate((self.class_, added.class_))
+        self.rarity = np.concatenate((self.rarity, added.rarity))
+        self.power = np.concatenate((self.power, added.power))
+        self.hash_offsets = np.concatenate((self.hash_offsets[:-1], added.hash_offsets + len(self.hash_pool)))
+        self.hash_pool += added.hash_pool
+        self.available = np.concatenate((self.available, added.available))
+        if 2 * np.count_nonzero(self.available) < len(self.available):
+            self.compact()
+
+    def remove(self, nonces):
+        """
+        Mark NFTs as no longer available, e.g. once they have been exchanged.
+
+        Parameters:
+        nonces (iterable): Token nonces; ones not in the columns are skipped.
+        """
+        nonces = np.fromiter((int(nonce) for nonce in nonces), dtype=np.uint64)
+        self.available &= ~np.isin(self.nonce, nonces)
+
+    def compact(self):
+        # Drop the rows that are no longer available
+        keep = np.flatnonzero(self.available)
+        hashes = [self.token_hash(i) for i in keep]
+        hash_offsets = np.zeros(len(keep) + 1, dtype=np.int64)
+        np.cumsum([len(token_hash) for token_hash in hashes], out=hash_offsets[1:])
+        self.nonce = self.nonce[keep]
+        self.class_ = self.class_[keep]
+        self.rarity = self.rarity[keep]
+        self.power = self.power[keep]
+        self.hash_pool = b"".join(hashes)
+        self.hash_offsets = hash_offsets
+        self.available = np.ones(len(keep), dtype=bool)
+
+    def to_dicts(self, indices):
+        return [
+            {
+                "nonce": int(self.nonce[i]),
+                "token_id": self.token_hash(i).hex() or None,
+                "rarity": int(self.rarity[i]),
+                "class": int(self.class_[i]),
+                "power": int(self.power[i]),
+            }
+            for i in indices
+        ]
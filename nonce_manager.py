@@ -0,0 +1,165 @@
+import threading
+
+from multiversx_sdk import Address
+
+import instrumentation
+from traffic_control import classify_error
+
+
+# Hands out account nonces locally so that consecutive transactions do not
+# each need a get_account() round trip to the gateway.
+#
+# A nonce whose transaction never reached the gateway is given back with
+# release(). If it was the latest one handed out the counter simply steps
+# back; otherwise it is an open gap (later transactions would wait on it
+# forever) and the next get_nonce() fills it before moving on. Nonces of
+# transactions the gateway accepted are never handed out again, even while
+# those transactions are still in the mempool.
+class NonceManager:
+    def __init__(self, provider):
+        self.provider = provider
+        self._lock = threading.Lock()
+        self._next_nonce = {}
+        self._gaps = {}
+        self._address_locks = {}
+
+    def _lock_for(self, address):
+        with self._lock:
+            lock = self._address_locks.get(address)
+            if lock is None:
+                lock = threading.Lock()
+                self._address_locks[address] = lock
+            return lock
+
+    def _fetch_nonce(self, address):
+        try:
+            account_info = self.provider.get_account(Address.new_from_bech32(address))
+            return account_info.nonce
+        except Exception as e:
+            raise RuntimeError(f"Error getting wallet nonce: {e}")
+
+    def get_nonce(self, address):
+        """
+        Reserve the next nonce for the given sender.
+
+        The account nonce is fetched from the gateway on first use and
+        incremented locally afterwards; nonces given back out of order are
+        handed out first.
+
+        Parameters:
+        address (str): Bech32 address of the sender.
+
+        Returns:
+        int: Nonce to put on the next transaction.
+        """
+        with self._lock_for(address):
+            gaps = self._gaps.get(address)
+            if gaps:
+                nonce = min(gaps)
+                gaps.discard(nonce)
+                instrumentation.increment("nonce_gaps_filled")
+                return nonce
+            nonce = self._next_nonce.get(address)
+            if nonce is None:
+                nonce = self._fetch_nonce(address)
+            self._next_nonce[address] = nonce + 1
+            return nonce
+
+    def release(self, address, nonce):
+        """
+        Give back a reserved nonce whose transaction the gateway did not accept.
+
+        Parameters:
+        address (str): Bech32 address of the sender.
+        nonce (int): Nonce returned by get_nonce().
+        """
+        with self._lock_for(address):
+            next_nonce = self._next_nonce.get(address)
+            if next_nonce is None or nonce >= next_nonce:
+                return
+            gaps = self._gaps.setdefault(address, set())
+            gaps.add(nonce)
+            # Step back over every given-back nonce at the top
+            while next_nonce - 1 in gaps:
+                next_nonce -= 1
+                gaps.discard(next_nonce)
+            self._next_nonce[address] = next_nonce
+
+    def send_failed(self, address, nonce, error=None, sent=True):
+        """
+        Settle the nonce of a transaction that failed to go out.
+
+        Parameters:
+        address (str): Bech32 address of the sender.
+        nonce (int | list | None): Its nonce, or the nonces of a batch sent
+            together; None if none was reserved yet.
+        error (Exception | None): Why it failed.
+        sent (bool): Whether the transaction was handed to the gateway at all.
+        """
+        nonces = [nonce] if isinstance(nonce, int) else list(nonce or ())
+        if not nonces:
+            return
+        maybe_accepted = sent and classify_error(error) in ("timeout", "unavailable")
+        if not maybe_accepted:
+            for reserved in sorted(nonces, reverse=True):
+                self.release(address, reserved)
+        if sent:
+            # A timed-out send keeps its nonce; either way catch up with the gateway
+            try:
+                self.resync(address)
+            except RuntimeError as e:
+                instrumentation.warning("Could not resync nonce of %s: %s", address, e)
+
+    def gaps(self, address):
+        # Nonces below the next one that no accepted transaction holds yet
+        with self._lock_for(address):
+            return sorted(self._gaps.get(address, ()))
+
+    def skip_to(self, address, nonce):
+        """
+        Make sure the next nonce handed out is at least the given one, e.g. past
+        transactions a previous run signed but the gateway has not executed yet.
+        """
+        with self._lock_for(address):
+            current = self._next_nonce.get(address)
+            if current is None:
+                current = self._fetch_nonce(address)
+            self._next_nonce[address] = max(current, nonce)
+
+    def resync(self, address):
+        """
+        Reconcile the local nonce with the gateway's account nonce, e.g. after
+        the gateway rejected a transaction or the outcome of a send is unknown.
+
+        Only moves forward: if another client used the account, the next nonce
+        jumps past what it executed and gaps below that are dropped. Nonces
+        reserved locally are kept, since their transactions may still be in
+        the mempool.
+
+        Returns:
+        int: Account nonce reported by the gateway.
+        """
+        with self._lock_for(address):
+            network_nonce = self._fetch_nonce(address)
+            current = self._next_nonce.get(address)
+            if current is not None and network_nonce > current:
+                instrumentation.warning("Nonce of %s moved from %s to %s outside this process",
+                                        address, current, network_nonce)
+            self._next_nonce[address] = max(network_nonce, current or 0)
+            gaps = self._gaps.get(address)
+            if gaps:
+                gaps.difference_update([nonce for nonce in gaps if nonce < network_nonce])
+            return network_nonce
+
+    def reset(self, address=None):
+        # Forget local state so the next get_nonce() goes back to the gateway;
+        # only safe when nothing sent from the address is still pending
+        if address is None:
+            with self._lock:
+                addresses = list(self._address_locks)
+            for known in addresses:
+                self.reset(known)
+            return
+        with self._lock_for(address):
+            self._next_nonce.pop(address, None)
+            self._gaps.pop(address, None)
@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def readonly_endpoints(abi_path):
+    # Names of the endpoints declared "readonly" in an ABI file
+    abi_json = json.loads(Path(abi_path).read_text())
+    return {
+        endpoint["name"]
+        for endpoint in abi_json.get("endpoints", [])
+        if endpoint.get("mutability") == "readonly"
+    }
+
+
+# Result cache in front of SmartContractQueriesController.run_query().
+#
+# Only the given (readonly) functions are cached, keyed by contract, function,
+# encoded arguments and caller, and only when the query succeeded (return
+# code "ok"). Entries expire after a per-function TTL, the
+# least recently used ones are evicted past max_entries, and results are
+# dropped when the observed block nonce advances (except stable_functions) or
+# after one of our own transactions touches the contract; a result fetched
+# before such an invalidation is returned but not stored. Other attributes
+# (create_query, parse_query_response, ...) go to the wrapped controller.
+class CachedQueryController:
+    def __init__(
+        self,
+        query_controller,
+        cacheable_functions,
+        ttls=None,
+        default_ttl=30,
+        max_entries=10000,
+        block_nonce_fn=None,
+        block_check_interval=6,
+        stable_functions=(),
+    ):
+        self.query_controller = query_controller
+        self.cacheable_functions = set(cacheable_functions)
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.block_nonce_fn = block_nonce_fn
+        self.block_check_interval = block_check_interval
+        # Results that do not change from block to block, kept until their TTL
+        self.stable_functions = set(stable_functions)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._block_nonce = None
+        self._block_checked_at = 0
+        # Bumped by every invalidation, so results fetched before it are not stored
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "uncacheable": 0, "evictions": 0, "invalidations": 0}
+
+    def __getattr__(self, name):
+        return getattr(self.query_controller, name)
+
+    @staticmethod
+    def _key(query):
+        arguments = tuple(bytes(argument) for argument in query.arguments)
+        return query.contract, query.function, arguments, query.caller
+
+    def _check_block_nonce(self):
+        if self.block_nonce_fn is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._block_checked_at < self.block_check_interval:
+                return
+            self._block_checked_at = now
+        try:
+            block_nonce = self.block_nonce_fn()
+        except Exception:
+            # Fall back to TTLs only if the nonce cannot be read
+            return
+        self.observe_block_nonce(block_nonce)
+
+    def observe_block_nonce(self, block_nonce):
+        """
+        Report the latest block nonce; cached results from older blocks are dropped.
+        """
+        with self._lock:
+            if self._block_nonce is not None and block_nonce > self._block_nonce:
+                self._clear_locked(keep_stable=True)
+            if self._block_nonce is None or block_nonce > self._block_nonce:
+                self._block_nonce = block_nonce
+
+    def _clear_locked(self, contract=None, keep_stable=False):
+        for key in list(self._entries):
+            if contract is not None and key[0] != contract:
+                continue
+            if keep_stable and key[1] in self.stable_functions:
+                continue
+            del self._entries[key]
+        self._generation += 1
+        self._stats["invalidations"] += 1
+
+    def invalidate(self, contract=None):
+        # Call after sending a transaction that changes the contract's state
+        with self._lock:
+            self._clear_locked(contract)
+
+    def run_query(self, query):
+        if query.function not in self.cacheable_functions:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return self.query_controller.run_query(query)
+
+        self._check_block_nonce()
+        key = self._key(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            self._stats["misses"] += 1
+            generation = self._generation
+
+        response = self.query_controller.run_query(query)
+        if response.return_code != "ok":
+            # Errors (e.g. a view called too early) are not cached
+            return response
+
+        ttl = self.ttls.get(query.function, self.default_ttl)
+        with self._lock:
+            if generation != self._generation:
+                return response
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return response
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
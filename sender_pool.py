@@ -0,0 +1,212 @@
+import glob
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from multiversx_sdk import Address, AddressComputer, Transaction, TransactionComputer, UserPEM, UserSigner
+
+import instrumentation
+from nonce_manager import NonceManager
+
+# Several wallets sending in parallel.
+#
+# One account's transactions are ordered by its nonce and all execute in its
+# shard, so a single wallet caps throughput. The pool holds many senders, each
+# with its own NonceManager, and hands out the least-loaded one; ties go to
+# the shard with the least work in flight, so load spreads over shards as
+# well as accounts.
+
+_transaction_computer = TransactionComputer()
+
+
+class Sender:
+    __slots__ = ("address", "signer", "shard", "nonces", "in_flight", "sent")
+
+    def __init__(self, address, signer, shard, nonces):
+        self.address = address
+        self.signer = signer
+        self.shard = shard
+        self.nonces = nonces
+        self.in_flight = 0
+        self.sent = 0
+
+    def next_nonce(self):
+        return self.nonces.get_nonce(self.address)
+
+    def sign(self, transaction):
+        transaction.signature = self.signer.sign(_transaction_computer.compute_bytes_for_signing(transaction))
+        return transaction
+
+    def __repr__(self):
+        return f"Sender({self.address!r}, shard={self.shard}, in_flight={self.in_flight})"
+
+
+def _signer_address(signer, hrp="erd"):
+    return signer.get_pubkey().to_address(hrp).to_bech32()
+
+
+class SenderPool:
+    def __init__(self, provider, signers, number_of_shards=3, chain_id="D", hrp="erd"):
+        """
+        Parameters:
+        provider: Network provider used for nonces, balances and top-ups.
+        signers (list): UserSigner (or compatible) objects, one per sending wallet.
+        number_of_shards (int): Shards to spread the senders over.
+        """
+        if not signers:
+            raise ValueError("A sender pool needs at least one wallet")
+        self.provider = provider
+        self.chain_id = chain_id
+        self.hrp = hrp
+        address_computer = AddressComputer(number_of_shards=number_of_shards)
+        self.senders = []
+        for signer in signers:
+            address = _signer_address(signer, hrp)
+            shard = address_computer.get_shard_of_address(Address.new_from_bech32(address))
+            # A NonceManager per sender keeps every nonce stream independent
+            self.senders.append(Sender(address, signer, shard, NonceManager(provider)))
+        self._by_address = {sender.address: sender for sender in self.senders}
+        self._lock = threading.Lock()
+        self._turn = 0
+
+    @classmethod
+    def from_keystores(cls, provider, paths, password, **kwargs):
+        """
+        Load wallets written by createWallet.py (UserWallet JSON keystores).
+
+        Parameters:
+        paths (list | str): Keystore paths or glob patterns.
+        password (str): Password shared by the keystores.
+        """
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        files = sorted({match for pattern in paths for match in glob.glob(str(pattern))})
+        if not files:
+            raise FileNotFoundError(f"No keystores found at {paths}")
+        return cls(provider, [UserSigner.from_wallet(Path(path), password) for path in files], **kwargs)
+
+    @classmethod
+    def from_pem(cls, provider, pem_path, **kwargs):
+        # Every key of a (possibly multi-key) PEM file becomes a sender
+        entries = UserPEM.from_file_all(Path(pem_path))
+        return cls(provider, [UserSigner(entry.secret_key) for entry in entries], **kwargs)
+
+    def __len__(self):
+        return len(self.senders)
+
+    def get(self, address):
+        return self._by_address[address]
+
+    def by_shard(self):
+        shards = {}
+        for sender in self.senders:
+            shards.setdefault(sender.shard, []).append(sender)
+        return shards
+
+    def acquire(self, shard=None):
+        """
+        Take the least-loaded sender and count one more transaction in flight for it.
+
+        Parameters:
+        shard (int | None): Prefer senders in this shard, e.g. the receiver's,
+            when the pool has any.
+
+        Returns:
+        Sender: Call release() once its transaction is done with.
+        """
+        with self._lock:
+            candidates = self.senders
+            if shard is not None:
+                candidates = [sender for sender in self.senders if sender.shard == shard] or self.senders
+            shard_load = {}
+            for sender in self.senders:
+                shard_load[sender.shard] = shard_load.get(sender.shard, 0) + sender.in_flight
+            # Rotate the starting point so equally loaded senders take turns
+            self._turn = (self._turn + 1) % len(candidates)
+            ordered = candidates[self._turn:] + candidates[:self._turn]
+            sender = min(ordered, key=lambda candidate: (candidate.in_flight, shard_load[candidate.shard]))
+            sender.in_flight += 1
+            sender.sent += 1
+            return sender
+
+    def release(self, sender, count=1):
+        with self._lock:
+            sender.in_flight = max(0, sender.in_flight - count)
+
+    @contextmanager
+    def lease(self, shard=None):
+        sender = self.acquire(shard)
+        try:
+            yield sender
+        finally:
+            self.release(sender)
+
+    def track(self, tracker, tx_hash, sender, function=None, callback=None):
+        # Keep the sender counted as busy until the transaction is executed
+        def done(result):
+            self.release(sender)
+            if callback is not None:
+                callback(result)
+
+        tracker.track(tx_hash, function, done)
+
+    def resync_nonces(self, address=None):
+        # Catch every sender (or one) up with the nonce the gateway executed
+        for sender in self.senders:
+            if address is None or sender.address == address:
+                try:
+                    sender.nonces.resync(sender.address)
+                except RuntimeError as e:
+                    instrumentation.warning("Could not resync nonce of %s: %s", sender.address, e)
+
+    def balances(self):
+        return {
+            sender.address: self.provider.get_account(Address.new_from_bech32(sender.address)).balance
+            for sender in self.senders
+        }
+
+    def top_up(self, funder_signer, min_balance, amount, gas_limit=50_000, funder_nonces=None):
+        """
+        Send EGLD from a funding wallet to every sender whose balance is below min_balance.
+
+        Parameters:
+        funder_signer: Signer of the funding wallet.
+        min_balance (int): Balance in atomic units under which a sender is topped up.
+        amount (int): Atomic units sent to each such sender.
+        funder_nonces (NonceManager | None): Nonce stream of the funding wallet.
+
+        Returns:
+        dict: Sender address -> transaction hash of its top-up.
+        """
+        funder_address = _signer_address(funder_signer, self.hrp)
+        funder_nonces = funder_nonces or NonceManager(self.provider)
+        transactions = []
+        sent = False
+        try:
+            targets = [address for address, balance in self.balances().items() if balance < min_balance]
+            for address in targets:
+                transaction = Transaction(
+                    sender=funder_address,
+                    receiver=address,
+                    value=amount,
+                    gas_limit=gas_limit,
+                    chain_id=self.chain_id,
+                    nonce=funder_nonces.get_nonce(funder_address),
+                )
+                transaction.signature = funder_signer.sign(_transaction_computer.compute_bytes_for_signing(transaction))
+                transactions.append(transaction)
+            if not transactions:
+                return {}
+            sent = True
+            _, tx_hashes = self.provider.send_transactions(transactions)
+        except Exception as e:
+            funder_nonces.send_failed(funder_address, [transaction.nonce for transaction in transactions], e, sent)
+            raise RuntimeError(f"Error topping up senders: {e}")
+
+        tx_hashes = tx_hashes or {}
+        if len(tx_hashes) != len(transactions):
+            for index, transaction in enumerate(transactions):
+                if str(index) not in tx_hashes:
+                    funder_nonces.release(funder_address, transaction.nonce)
+            funder_nonces.resync(funder_address)
+        return {address: tx_hashes[str(index)] for index, address in enumerate(targets) if str(index) in tx_hashes}
@@ -0,0 +1,175 @@
+import argparse
+import getpass
+import json
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+
+from multiversx_sdk import Address, UserPublicKey, UserSigner
+
+# Long-lived signing agent, in the spirit of ssh-agent. Keystores are decrypted
+# (scrypt) once when the agent starts, and scripts ask it for signatures over
+# a Unix socket instead of decrypting the wallet on every run.
+#
+# Protocol: one JSON object per line in each direction.
+#   {"op": "keys"}                                  -> {"keys": [bech32, ...]}
+#   {"op": "sign", "address": bech32, "data": hex}  -> {"signature": hex}
+# Failures are answered with {"error": message}.
+
+DEFAULT_SOCKET_PATH = os.path.expanduser("~/.tema1-signer-agent.sock")
+
+
+def _address_of(signer):
+    return signer.get_pubkey().to_address(hrp="erd").to_bech32()
+
+
+class _AgentHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.agent.handle_request(request)
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class SignerAgent:
+    def __init__(self):
+        # Keyed by the public key bytes, so any hrp resolves to the same key
+        self.signers = {}
+
+    def add_wallet(self, wallet_path, password):
+        signer = UserSigner.from_wallet(Path(wallet_path), password)
+        self.signers[signer.get_pubkey().buffer] = signer
+        return _address_of(signer)
+
+    def add_pem(self, pem_path):
+        signer = UserSigner.from_pem_file(Path(pem_path))
+        self.signers[signer.get_pubkey().buffer] = signer
+        return _address_of(signer)
+
+    def _signer_for(self, address):
+        if address is None:
+            if len(self.signers) != 1:
+                raise ValueError("An address is required when the agent holds several keys")
+            return next(iter(self.signers.values()))
+        signer = self.signers.get(Address.new_from_bech32(address).get_public_key())
+        if signer is None:
+            raise ValueError(f"No key loaded for {address}")
+        return signer
+
+    def handle_request(self, request):
+        op = request.get("op")
+        if op == "keys":
+            return {"keys": [_address_of(signer) for signer in self.signers.values()]}
+        if op == "sign":
+            signer = self._signer_for(request.get("address"))
+            signature = signer.sign(bytes.fromhex(request["data"]))
+            return {"signature": signature.hex()}
+        raise ValueError(f"Unknown op: {op}")
+
+    def serve(self, socket_path=DEFAULT_SOCKET_PATH):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        # Only the current user may talk to the agent
+        old_umask = os.umask(0o177)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(socket_path, _AgentHandler)
+        finally:
+            os.umask(old_umask)
+        server.daemon_threads = True
+        server.agent = self
+
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            os.unlink(socket_path)
+
+
+# Drop-in replacement for UserSigner that forwards sign() to the agent
+class AgentSigner:
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, address=None):
+        self.socket_path = socket_path
+        self.address = address
+        self._lock = threading.Lock()
+        self._socket = None
+        self._reader = None
+
+    def _connect(self):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.socket_path)
+        except OSError:
+            connection.close()
+            raise
+        self._socket = connection
+        self._reader = connection.makefile("rb")
+
+    def close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = None
+            self._reader = None
+
+    def _request(self, request):
+        with self._lock:
+            try:
+                if self._socket is None:
+                    self._connect()
+                self._socket.sendall(json.dumps(request).encode() + b"\n")
+                line = self._reader.readline()
+                if not line:
+                    raise ConnectionError("Signer agent closed the connection")
+            except OSError as e:
+                self.close()
+                raise RuntimeError(f"Error talking to signer agent at {self.socket_path}: {e}")
+
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"Signer agent error: {response['error']}")
+        return response
+
+    def keys(self):
+        return self._request({"op": "keys"})["keys"]
+
+    def sign(self, data):
+        response = self._request({"op": "sign", "address": self.address, "data": bytes(data).hex()})
+        return bytes.fromhex(response["signature"])
+
+    def get_pubkey(self):
+        address = self.address or self.keys()[0]
+        return UserPublicKey(Address.new_from_bech32(address).get_public_key())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep decrypted wallets in memory and sign over a Unix socket.")
+    parser.add_argument("--wallet", action="append", default=[], help="Path to a JSON keystore (repeatable)")
+    parser.add_argument("--pem", action="append", default=[], help="Path to a PEM file (repeatable)")
+    parser.add_argument("--socket", default=os.getenv("SIGNER_AGENT_SOCK", DEFAULT_SOCKET_PATH))
+    args = parser.parse_args()
+
+    if not args.wallet and not args.pem:
+        parser.error("at least one --wallet or --pem is required")
+
+    agent = SignerAgent()
+    password = None
+    if args.wallet:
+        password = os.getenv("WALLET_PASSWORD") or getpass.getpass("Keystore password: ")
+    for wallet_path in args.wallet:
+        print(f"Loaded {agent.add_wallet(wallet_path, password)}")
+    for pem_path in args.pem:
+        print(f"Loaded {agent.add_pem(pem_path)}")
+
+    print(f"Signer agent listening on {args.socket}")
+    agent.serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
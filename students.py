@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from multiversx_sdk import Address
+
+from abi_codegen import load_codec
+
+# Bulk reads of the demand side of the contract: every registered student and
+# the card each one has to obtain.
+
+
+def _query(query_controller, sc_address, function, arguments=()):
+    query = query_controller.create_query(
+        contract=Address.new_from_bech32(sc_address).bech32(),
+        function=function,
+        arguments=list(arguments),
+    )
+    return query_controller.run_query(query).return_data_parts
+
+
+def fetch_students_addresses(query_controller, sc_address, codec, hrp="erd"):
+    parts = _query(query_controller, sc_address, "studentsAddresses")
+    return [Address(pubkey, hrp).to_bech32() for pubkey in codec.iter_studentsAddresses_output(parts)]
+
+
+def fetch_cards_properties(query_controller, sc_address, codec):
+    return codec.decode_cardsProperties_output(_query(query_controller, sc_address, "cardsProperties"))
+
+
+def fetch_student_card(query_controller, sc_address, codec, student_address):
+    parts = _query(query_controller, sc_address, "studentsCards", [Address.new_from_bech32(student_address)])
+    return codec.decode_studentsCards_output(parts) if parts and parts[0] else None
+
+
+def fetch_students_cards(
+    query_controller,
+    sc_address,
+    addresses=None,
+    max_workers=16,
+    use_cards_properties=False,
+    verify_sample=8,
+    codec=None,
+):
+    """
+    Fetch the card assigned to every student.
+
+    Per-address studentsCards queries are fanned out over a bounded thread
+    pool; retries are left to the provider's traffic controller.
+
+    With use_cards_properties (opt-in), the variadic cardsProperties view is
+    used for everyone instead when it has one entry per student and a fixed
+    sample of verify_sample addresses, spread evenly over the list, agrees
+    with it. The contract does not promise that view is in studentsAddresses
+    order, so only opt in for contracts known to keep them aligned.
+
+    Parameters:
+    addresses (list | None): Bech32 addresses; defaults to studentsAddresses.
+    max_workers (int): Concurrent queries.
+    use_cards_properties (bool): Try the single cardsProperties view first.
+    verify_sample (int): Addresses cross-checked before trusting cardsProperties.
+    codec (module | None): Generated codec (abi_codegen.load_codec) decoding the views.
+
+    Returns:
+    dict: Address -> CardProperties (None if the student has no card),
+    in the order of the addresses.
+    """
+    codec = codec or load_codec()
+    if addresses is None:
+        addresses = fetch_students_addresses(query_controller, sc_address, codec)
+    addresses = list(addresses)
+
+    def fetch(address):
+        return fetch_student_card(query_controller, sc_address, codec, address)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if use_cards_properties:
+            cards = fetch_cards_properties(query_controller, sc_address, codec)
+            if len(cards) == len(addresses):
+                count = min(verify_sample, len(addresses))
+                # First, last and evenly spaced in between, the same on every run
+                sample = sorted({i * (len(addresses) - 1) // max(count - 1, 1) for i in range(count)})
+                checked = executor.map(fetch, [addresses[i] for i in sample])
+                if all(card == cards[i] for i, card in zip(sample, checked)):
+                    return dict(zip(addresses, cards))
+
+        return dict(zip(addresses, executor.map(fetch, addresses)))
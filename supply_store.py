@@ -0,0 +1,388 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from multiversx_sdk import Address
+
+from abi_codegen import load_codec
+from nft_attributes import decode_attributes
+
+DEFAULT_DB_PATH = "output/nft_supply.sqlite3"
+
+# Largest property value an INTEGER column holds; larger ones are stored as undecodable
+_SQLITE_MAX = 2 ** 63 - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_data (
+    nonce INTEGER PRIMARY KEY,
+    amount INTEGER NOT NULL,
+    name BLOB,
+    hash BLOB,
+    attributes BLOB,
+    creator TEXT,
+    royalties INTEGER,
+    uris TEXT,
+    class INTEGER,
+    rarity INTEGER,
+    power INTEGER,
+    digest BLOB,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS token_data_match ON token_data (class, rarity, power) WHERE amount > 0;
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _digest(part):
+    # Identifies one encoded EsdtTokenData; nftSupply and getTokenData encode a token the same way
+    return hashlib.blake2b(bytes(part), digest_size=16).digest()
+
+
+def _nft(token_nonce, token_hash, rarity, class_, power):
+    # One available NFT in the shape of query_available_nfts(), with its token nonce
+    return {
+        "nonce": token_nonce,
+        "token_id": token_hash.hex() if token_hash else None,
+        "rarity": rarity,
+        "class": class_,
+        "power": power,
+    }
+
+
+# Local SQLite copy of the contract's token data, keyed by token nonce.
+#
+# nftSupply lists what the contract holds but not the token nonces, so every
+# sync reads it once and compares a digest of each entry with the stored
+# rows: stored NFTs missing from it were exchanged (by anyone) or changed,
+# and entries matching no stored row are new. Only those are looked up, with
+# getTokenData(token_nonce) from the last known high-water mark up to the
+# last minted nonce still in the supply. Entries that scan cannot place are
+# remembered and not scanned for again while they stay in the supply.
+# Queries are answered from the local database.
+#
+# With a root_hash_fn, nftSupply is only downloaded when the contract
+# account's storage root hash has moved since the last sync: the NFTs it
+# holds live in that storage, so the hash changes with every mint, exchange
+# or transfer.
+#
+# In-memory views of the available NFTs (nft_catalog.NftCatalog,
+# nft_columns.NftColumns) can be attached: every committed change, whether
+# from a sync, a refresh or a local exchange, reaches them as one batched
+# remove() and insert(), so they never have to be rebuilt.
+class SupplyStore:
+    def __init__(self, query_controller, sc_address, db_path=DEFAULT_DB_PATH, max_empty_nonces=1000, codec=None,
+                 root_hash_fn=None):
+        self.query_controller = query_controller
+        # Returns the contract account's storage root hash, see above
+        self.root_hash_fn = root_hash_fn
+        self.codec = codec or load_codec()
+        self.sc_address = sc_address
+        self.db_path = db_path
+        # Guard against a supply entry getTokenData never returns: give up
+        # the forward scan after this many nonces in a row are not in the supply
+        self.max_empty_nonces = max_empty_nonces
+        self._lock = threading.Lock()
+        self._views = []
+        # nonce -> NFT dict, or None once it is not available; published to the views on commit
+        self._changes = {}
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(token_data)")}
+        if "digest" not in columns:
+            # Databases written before supply entries were digested
+            self._db.execute("ALTER TABLE token_data ADD COLUMN digest BLOB")
+
+    def close(self):
+        self._db.close()
+
+    def attach(self, view):
+        """
+        Keep a view (NftCatalog, NftColumns) in step with the store: it gets
+        the available NFTs now and every later change through insert() and
+        remove(). Readers on other threads than the one changing the store
+        hold locked() while they use it.
+
+        Returns:
+        The view.
+        """
+        with self._lock:
+            view.insert(self._available())
+            self._views.append(view)
+        return view
+
+    def detach(self, view):
+        with self._lock:
+            self._views.remove(view)
+
+    def locked(self):
+        # Held while the store and its attached views change
+        return self._lock
+
+    def _commit(self):
+        # Views are updated first, so one that cannot take a change leaves
+        # both them and the database as they were
+        changes, self._changes = self._changes, {}
+        if changes:
+            removed = [token_nonce for token_nonce, nft in changes.items() if nft is None]
+            inserted = [nft for nft in changes.values() if nft is not None]
+            try:
+                for view in self._views:
+                    view.remove(removed)
+                    view.insert(inserted)
+            except Exception as e:
+                self._db.rollback()
+                self._restore_views(changes)
+                raise RuntimeError(f"Error updating supply views: {e}")
+        self._db.commit()
+
+    def _restore_views(self, nonces):
+        # Put the given nonces of every view back to their committed state
+        committed = [nft for nft in self._available() if nft["nonce"] in nonces]
+        for view in self._views:
+            view.remove(nonces)
+            view.insert(committed)
+
+    def _rollback(self):
+        self._db.rollback()
+        self._changes.clear()
+
+    def _get_state(self, key, default=None):
+        row = self._db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, key, value):
+        self._db.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    @property
+    def high_water_mark(self):
+        return int(self._get_state("high_water_mark", 0))
+
+    @property
+    def last_sync(self):
+        return float(self._get_state("last_sync", 0))
+
+    def _unplaced(self):
+        # Digest -> count of supply entries the forward scan gave up on
+        unplaced = json.loads(self._get_state("unplaced", "{}"))
+        return Counter({bytes.fromhex(digest): count for digest, count in unplaced.items()})
+
+    def _forget_root_hash(self):
+        # Local changes are not confirmed by the chain yet: the next sync reads nftSupply
+        self._db.execute("DELETE FROM sync_state WHERE key = 'root_hash'")
+
+    def _run_query(self, function, arguments):
+        query = self.query_controller.create_query(
+            contract=Address.new_from_bech32(self.sc_address).bech32(),
+            function=function,
+            arguments=arguments,
+        )
+        return self.query_controller.run_query(query).return_data_parts or []
+
+    def _fetch_part(self, token_nonce):
+        parts = self._run_query("getTokenData", [token_nonce])
+        return bytes(parts[0]) if parts and parts[0] else None
+
+    def fetch_token_data(self, token_nonce):
+        part = self._fetch_part(token_nonce)
+        return self.codec.top_decode_EsdtTokenData(part) if part else None
+
+    def _save(self, token_nonce, part):
+        token_data = self.codec.top_decode_EsdtTokenData(part) if part else None
+        amount = int(getattr(token_data, "amount", 0) or 0) if token_data is not None else 0
+        if amount == 0:
+            # Not (or no longer) held by the contract
+            self._db.execute(
+                "INSERT INTO token_data (nonce, amount, updated_at) VALUES (?, 0, ?) "
+                "ON CONFLICT(nonce) DO UPDATE SET amount = 0, updated_at = excluded.updated_at",
+                (token_nonce, time.time()),
+            )
+            self._changes[token_nonce] = None
+            return False
+
+        decoded = decode_attributes(token_data.attributes)
+        class_, rarity, power = decoded if decoded and max(decoded) <= _SQLITE_MAX else (None, None, None)
+        self._db.execute(
+            "INSERT OR REPLACE INTO token_data "
+            "(nonce, amount, name, hash, attributes, creator, royalties, uris, class, rarity, power, digest, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                token_nonce,
+                amount,
+                token_data.name,
+                token_data.hash,
+                token_data.attributes,
+                token_data.creator.hex(),
+                int(token_data.royalties or 0),
+                json.dumps([uri.decode(errors="replace") for uri in token_data.uris or []]),
+                class_,
+                rarity,
+                power,
+                _digest(part),
+                time.time(),
+            ),
+        )
+        self._changes[token_nonce] = None if class_ is None else _nft(
+            token_nonce, token_data.hash, rarity, class_, power
+        )
+        return True
+
+    def sync(self, max_age=None):
+        """
+        Reconcile the store with nftSupply and pull token data for new NFTs.
+
+        Parameters:
+        max_age (float | None): Skip the gateway entirely if the last sync is
+        more recent than this many seconds.
+
+        Returns:
+        int: Number of NFTs stored or updated.
+        """
+        with self._lock:
+            if max_age is not None and time.time() - self.last_sync < max_age:
+                return 0
+
+            try:
+                # Read before nftSupply, so a change in between shows up next time
+                root_hash = self.root_hash_fn() if self.root_hash_fn is not None else None
+                if root_hash and root_hash == self._get_state("root_hash"):
+                    self._set_state("last_sync", time.time())
+                    self._commit()
+                    return 0
+                unseen = Counter(_digest(part) for part in self._run_query("nftSupply", []))
+            except Exception as e:
+                raise RuntimeError(f"Error syncing token data: {e}")
+
+            try:
+                stored = self._reconcile(unseen)
+            except Exception:
+                self._rollback()
+                raise
+            if root_hash:
+                self._set_state("root_hash", root_hash)
+            self._set_state("last_sync", time.time())
+            self._commit()
+            return stored
+
+    def _reconcile(self, unseen):
+        # Stored NFTs still in the supply; the others left it or changed
+        gone = []
+        rows = self._db.execute("SELECT nonce, digest FROM token_data WHERE amount > 0 ORDER BY nonce")
+        for token_nonce, digest in rows.fetchall():
+            if unseen[digest] > 0:
+                unseen[digest] -= 1
+            else:
+                gone.append(token_nonce)
+        now = time.time()
+        self._db.executemany(
+            "UPDATE token_data SET amount = 0, updated_at = ? WHERE nonce = ?",
+            [(now, token_nonce) for token_nonce in gone],
+        )
+        self._changes.update((token_nonce, None) for token_nonce in gone)
+        unseen = +unseen
+
+        # A changed NFT keeps its nonce, and one that left may come back
+        stored = 0
+        if unseen:
+            rows = self._db.execute("SELECT nonce, digest FROM token_data WHERE amount = 0 AND digest IS NOT NULL")
+            candidates = set(gone) | {token_nonce for token_nonce, digest in rows.fetchall() if digest in unseen}
+            for token_nonce in sorted(candidates):
+                if not unseen:
+                    break
+                if self._pull(token_nonce, unseen) is not None:
+                    stored += 1
+
+        # Whatever is still unmatched was minted after the high-water mark.
+        # Entries an earlier scan gave up on are still matched when found,
+        # but only new ones keep the scan going.
+        unplaced = self._unplaced() & unseen
+        pending = sum((unseen - unplaced).values())
+        empty_in_a_row = 0
+        token_nonce = self.high_water_mark + 1
+        while pending and empty_in_a_row < self.max_empty_nonces:
+            digest = self._pull(token_nonce, unseen)
+            if digest is None:
+                empty_in_a_row += 1
+            else:
+                stored += 1
+                empty_in_a_row = 0
+                self._set_state("high_water_mark", token_nonce)
+                if unplaced[digest] > 0:
+                    unplaced[digest] -= 1
+                else:
+                    pending -= 1
+            token_nonce += 1
+        self._set_state("unplaced", json.dumps({digest.hex(): count for digest, count in unseen.items() if count > 0}))
+        return stored
+
+    def _pull(self, token_nonce, unseen):
+        # Store one nonce; its digest (crossed off unseen) if it is one of the supply entries looked for, else None
+        try:
+            part = self._fetch_part(token_nonce)
+        except Exception as e:
+            raise RuntimeError(f"Error syncing token data for nonce {token_nonce}: {e}")
+        held = self._save(token_nonce, part)
+        digest = _digest(part) if held else None
+        if digest is None or unseen[digest] == 0:
+            if held:
+                # Held by the contract but not offered in nftSupply
+                self._db.execute("UPDATE token_data SET amount = 0 WHERE nonce = ?", (token_nonce,))
+                self._changes[token_nonce] = None
+            return None
+        unseen[digest] -= 1
+        if unseen[digest] == 0:
+            del unseen[digest]
+        return digest
+
+    def refresh(self, nonces):
+        # Re-fetch nonces known to have changed, e.g. after an exchange
+        with self._lock:
+            try:
+                for token_nonce in nonces:
+                    self._save(token_nonce, self._fetch_part(token_nonce))
+            except Exception:
+                self._rollback()
+                raise
+            self._forget_root_hash()
+            self._commit()
+
+    def mark_exchanged(self, token_nonce):
+        # Record locally that the contract gave this NFT away
+        with self._lock:
+            self._db.execute(
+                "UPDATE token_data SET amount = 0, updated_at = ? WHERE nonce = ?",
+                (time.time(), token_nonce),
+            )
+            self._changes[token_nonce] = None
+            self._forget_root_hash()
+            self._commit()
+
+    def available_nfts(self, nft_class=None, rarity=None, power=None):
+        """
+        Return the NFTs held by the contract, in the same dict shape as
+        query_available_nfts(), without calling the gateway.
+        """
+        with self._lock:
+            return self._available(nft_class, rarity, power)
+
+    def _available(self, nft_class=None, rarity=None, power=None):
+        sql = "SELECT nonce, hash, rarity, class, power FROM token_data WHERE amount > 0 AND class IS NOT NULL"
+        params = []
+        for column, value in (("class", nft_class), ("rarity", rarity), ("power", power)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        sql += " ORDER BY nonce"
+        return [_nft(*row) for row in self._db.execute(sql, params).fetchall()]
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+
+import pytest
+from multiversx_sdk import UserSecretKey, UserSigner
+
+# The modules are flat files at the repository root and load tema1.abi.json
+# relative to the working directory
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import assignment1  # noqa: E402
+from mock_gateway import MockGateway, Tema1Model  # noqa: E402
+
+TICKER = "TEMA1-a1b2c3"
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+class Wallet:
+    def __init__(self):
+        self.secret_key = UserSecretKey.generate()
+        self.address = self.secret_key.generate_public_key().to_address("erd").to_bech32()
+        self.signer = UserSigner(self.secret_key)
+
+
+@pytest.fixture
+def wallet():
+    return Wallet()
+
+
+@pytest.fixture
+def model():
+    model = Tema1Model(supply_size=30, students=8, block_time=0.05, max_nonce_gap=1000, seed=1).start()
+    yield model
+    model.stop()
+
+
+@pytest.fixture
+def gateway(model):
+    with MockGateway(model) as gateway:
+        yield gateway
+
+
+@pytest.fixture
+def client(gateway, model, wallet, tmp_path, monkeypatch):
+    """
+    assignment1 pointed at the mock gateway with a fresh wallet, no journal
+    and a supply store under tmp_path.
+    """
+    monkeypatch.delenv("TX_JOURNAL", raising=False)
+    monkeypatch.delenv("SUPPLY_INDEX", raising=False)
+    monkeypatch.setenv("SUPPLY_DB", str(tmp_path / "supply.sqlite3"))
+    assignment1.configure(gateway.url, wallet.address, model.contract_address, wallet.signer)
+    yield assignment1
+    if assignment1.get_supply_store.cache_info().currsize:
+        assignment1.get_supply_store().close()
+    assignment1.configure()
+
+
+def mint(client, count, name="card"):
+    # Mint count NFTs from the configured wallet and wait for them; returns their token nonces
+    results = client.create_nft_many(
+        [(f"{name}{index}", 1, 2, 0, "https://example.com/card.png") for index in range(count)],
+        TICKER,
+        flush_interval=0.02,
+    )
+    tracker = client.get_tracker()
+    tracker.track_many([result["tx_hash"] for result in results], "ESDTNFTCreate")
+    return [result.values for result in tracker.run()]
+
+
+@pytest.fixture
+def exchange(client, model):
+    """
+    A contract NFT and the token identifier of a minted card that can pay for it.
+    """
+    token_nonce = mint(client, 1)[0]
+    wanted = model._mint_to_contract((1, 2, 2))
+    return wanted, f"{TICKER}-{token_nonce:02x}"
+
+
+@pytest.fixture
+def journal(client, monkeypatch, tmp_path):
+    # assignment1's own journal (TX_JOURNAL), as used by the exchange functions
+    monkeypatch.setenv("TX_JOURNAL", str(tmp_path / "journal.jsonl"))
+    client.get_journal.cache_clear()
+    yield client.get_journal()
+    client.get_journal().close()
+
+
+def sent_transactions(model):
+    # Transactions the model has accepted so far
+    return sum(model.stats()["transactions"].values())
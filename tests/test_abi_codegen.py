@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+import pytest
+from multiversx_sdk.abi import Abi
+
+from abi_codegen import DEFAULT_ABI_PATH, load_codec
+from nft_attributes import encode_raw_attributes, encode_text_attributes
+
+
+@pytest.fixture(scope="module")
+def codec():
+    return load_codec(Path(__file__).resolve().parent.parent / DEFAULT_ABI_PATH)
+
+
+def token_data(codec, attributes, name=b"card"):
+    return codec.EsdtTokenData(
+        token_type=1, amount=1, frozen=False, hash=bytes(range(32)), name=name, attributes=attributes,
+        creator=bytes(32), royalties=250, uris=[b"https://example.com/card.png"],
+    )
+
+
+def test_token_data_round_trip(codec):
+    original = token_data(codec, encode_text_attributes(8, 3, 2))
+    decoded = codec.top_decode_EsdtTokenData(codec.top_encode_EsdtTokenData(original))
+    assert decoded.attributes == original.attributes
+    assert decoded.uris == original.uris
+    assert decoded.royalties == 250
+
+
+def test_matches_the_generic_abi_decoder(codec):
+    abi = Abi.load(DEFAULT_ABI_PATH)
+    parts = [codec.top_encode_EsdtTokenData(token_data(codec, encode_raw_attributes(index % 4, 1, 2))) for index in range(5)]
+    generated = codec.decode_nftSupply_output(parts)
+    generic = abi.decode_endpoint_output_parameters("nftSupply", parts)[0]
+    assert [bytes(item.attributes) for item in generated] == [bytes(item.attributes) for item in generic]
+    assert [item.name for item in codec.iter_nftSupply_output(parts)] == [item.name for item in generated]
+
+
+def test_codec_is_recompiled_when_the_abi_changes(tmp_path):
+    abi_json = json.loads(Path(DEFAULT_ABI_PATH).read_text())
+    abi_path = tmp_path / "tema1.abi.json"
+    abi_path.write_text(json.dumps(abi_json))
+    cache_dir = tmp_path / "cache"
+    load_codec(abi_path, cache_dir)
+    load_codec(abi_path, cache_dir)
+    assert len(list(cache_dir.glob("*.py"))) == 1
+
+    abi_json["endpoints"] = [endpoint for endpoint in abi_json["endpoints"] if endpoint["name"] != "nftSupply"]
+    abi_path.write_text(json.dumps(abi_json))
+    changed = load_codec(abi_path, cache_dir)
+    assert len(list(cache_dir.glob("*.py"))) == 2
+    assert not hasattr(changed, "decode_nftSupply_output")
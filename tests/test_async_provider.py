@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from multiversx_sdk.network_providers.errors import GenericError
+
+from async_provider import AsyncProxyNetworkProvider
+from conftest import TICKER
+from traffic_control import GatewayHTTPError, classify_error, is_not_found
+
+
+def run(coroutine_function, *args):
+    return asyncio.run(coroutine_function(*args))
+
+
+def test_transaction_with_its_process_status(client, gateway):
+    (result,) = client.create_nft_many([("card", 1, 2, 0, "uri")], TICKER, flush_interval=0.02)
+    client._wait_for(result["tx_hash"], "ESDTNFTCreate")
+
+    async def fetch():
+        async with AsyncProxyNetworkProvider(gateway.url) as provider:
+            return await provider.get_transaction(result["tx_hash"], with_process_status=True)
+
+    transaction = run(fetch)
+    assert transaction.status.is_successful()
+    assert transaction.function == "ESDTNFTCreate"
+
+
+def test_errors_match_the_blocking_provider(gateway):
+    async def fetch(url):
+        async with AsyncProxyNetworkProvider(url, timeout=2) as provider:
+            return await provider.get_transaction_status("ab" * 32)
+
+    with pytest.raises(GatewayHTTPError) as raised:
+        run(fetch, gateway.url)
+    assert is_not_found(raised.value)
+
+    with pytest.raises(GenericError) as raised:
+        run(fetch, "http://127.0.0.1:1")
+    assert classify_error(raised.value) == "unavailable"
+
+
+def test_async_supply_query_agrees_with_the_blocking_one(client):
+    async def fetch():
+        async with client.create_async_provider() as provider:
+            return await client.query_available_nfts_async(provider)
+
+    assert run(fetch) == client.query_available_nfts()
+
+
+def test_async_exchange_is_sent_once(client, model, exchange, journal):
+    wanted, payment_token = exchange
+
+    async def trade():
+        async with client.create_async_provider() as provider:
+            first = await client.create_and_trade_nft_async(provider, wanted, payment_token=payment_token)
+            second = await client.create_and_trade_nft_async(provider, wanted, payment_token=payment_token)
+            return first, second
+
+    first, second = run(trade)
+    assert first == second
+    assert client._wait_for(first, "exchangeNft").ok
+    assert wanted not in model.supply
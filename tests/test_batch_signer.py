@@ -0,0 +1,37 @@
+import pytest
+
+from batch_signer import BatchSigner
+from conftest import TICKER
+
+
+@pytest.fixture
+def batch_signer(wallet):
+    signer = BatchSigner(wallet.secret_key, max_workers=2, chunk_size=3)
+    yield signer
+    signer.close()
+
+
+def test_signatures_match_inline_signing_in_order(client, wallet, batch_signer):
+    data = client.build_nft_create_data("card", TICKER, 1, 2, 0, "uri")
+    transactions = [client.build_nft_create_transaction(data, nonce) for nonce in range(8)]
+    signed = batch_signer.sign_transactions(transactions)
+    assert signed == transactions
+    for transaction in transactions:
+        expected = wallet.signer.sign(client.transaction_computer.compute_bytes_for_signing(transaction))
+        assert transaction.signature == expected
+
+
+def test_create_nft_many_with_a_batch_signer(client, model, wallet, batch_signer):
+    records = [(f"card{index}", 1, 2, 0, "uri") for index in range(7)]
+    results = client.create_nft_many(records, TICKER, chunk_size=3, flush_interval=0.02, batch_signer=batch_signer)
+    assert all(result["tx_hash"] and result["error"] is None for result in results)
+
+    tracker = client.get_tracker()
+    tracker.track_many([result["tx_hash"] for result in results], "ESDTNFTCreate")
+    assert all(result.ok for result in tracker.run())
+    assert model.account(wallet.address)["nonce"] == 7
+
+
+def test_a_batch_signer_cannot_sign_for_a_sender_pool(client, batch_signer):
+    with pytest.raises(ValueError, match="cannot sign for a sender pool"):
+        client.create_nft_many([], TICKER, batch_signer=batch_signer, sender_pool=object())
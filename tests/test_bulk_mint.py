@@ -0,0 +1,53 @@
+from conftest import TICKER
+
+
+def records(count):
+    return [(f"card{index}", 1, 2, 0, "https://example.com/card.png") for index in range(count)]
+
+
+def test_results_follow_input_order_across_chunks(client, model):
+    results = client.create_nft_many(records(10), TICKER, chunk_size=4, queue_size=2, flush_interval=0.02)
+    assert len(results) == 10
+    assert all(result["tx_hash"] and result["error"] is None for result in results)
+
+    tracker = client.get_tracker()
+    tracker.track_many([result["tx_hash"] for result in results], "ESDTNFTCreate")
+    by_hash = {result.tx_hash: result.values for result in tracker.run()}
+    token_nonces = [by_hash[result["tx_hash"]] for result in results]
+    # Nonces were handed out in record order, so the mints executed in that order too
+    assert token_nonces == sorted(token_nonces)
+
+
+def test_bad_record_fails_alone(client):
+    batch = records(3)
+    batch[1] = ("broken", 1, 2)
+    results = client.create_nft_many(batch, TICKER, flush_interval=0.02)
+    assert results[1]["error"].startswith("Error encoding NFT")
+    assert results[0]["tx_hash"] and results[2]["tx_hash"]
+
+
+def test_signing_failure_stops_the_rest_without_a_nonce_gap(client, gateway, model, wallet):
+    class FailingSigner:
+        # Signs the first `count` transactions, then fails
+        def __init__(self, count):
+            self.count = count
+
+        def sign(self, data):
+            if self.count == 0:
+                raise ValueError("key unavailable")
+            self.count -= 1
+            return wallet.signer.sign(data)
+
+    client.configure(gateway.url, wallet.address, model.contract_address, FailingSigner(3))
+    results = client.create_nft_many(records(8), TICKER, flush_interval=0.02)
+    assert results[3]["error"] == "Error signing NFT: key unavailable"
+    assert all(result["error"] for result in results[4:])
+    # The first three went out, or were held back with the rest once signing failed
+    sent = [result["tx_hash"] for result in results[:3] if result["tx_hash"]]
+    assert [bool(result["tx_hash"]) for result in results[:3]] == [True] * len(sent) + [False] * (3 - len(sent))
+
+    tracker = client.get_tracker()
+    tracker.track_many(sent, "ESDTNFTCreate")
+    tracker.run()
+    # Nonces of everything not sent were given back: the next mint follows the last one sent
+    assert client.get_wallet_nonce() == len(sent) == model.account(wallet.address)["nonce"]
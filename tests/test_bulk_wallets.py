@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from multiversx_sdk import Mnemonic, UserSigner
+
+from bulk_wallets import addresses_from_pem, generate_wallets
+from sender_pool import SenderPool
+
+
+@pytest.fixture(scope="module")
+def mnemonic():
+    return Mnemonic.generate().get_text()
+
+
+def test_same_mnemonic_same_wallets(tmp_path, mnemonic):
+    first = generate_wallets(5, tmp_path / "a", mnemonic=mnemonic, keystores=False, max_workers=2, chunk_size=2)
+    second = generate_wallets(5, tmp_path / "b", mnemonic=mnemonic, keystores=False, max_workers=1)
+    assert first == [dict(entry, keystore=None) for entry in second]
+    assert [entry["index"] for entry in first] == list(range(5))
+
+    expected = [Mnemonic(mnemonic).derive_key(index).generate_public_key().to_address("erd").to_bech32()
+                for index in range(5)]
+    assert [entry["address"] for entry in first] == expected
+    assert addresses_from_pem(tmp_path / "a" / "wallets.pem") == expected
+    assert json.loads((tmp_path / "a" / "addresses.json").read_text()) == first
+    assert (tmp_path / "a" / "mnemonic.json").exists()
+
+
+def test_shard_filter(tmp_path, mnemonic):
+    manifest = generate_wallets(4, tmp_path, shard=1, mnemonic=mnemonic, keystores=False, max_workers=2, chunk_size=3)
+    assert len(manifest) == 4
+    assert {entry["shard"] for entry in manifest} == {1}
+    indices = [entry["index"] for entry in manifest]
+    assert indices == sorted(indices)
+
+    pool = SenderPool.from_pem(None, tmp_path / "wallets.pem")
+    assert [sender.address for sender in pool.senders] == [entry["address"] for entry in manifest]
+    assert set(pool.by_shard()) == {1}
+
+
+def test_keystores_unlock_with_the_password(tmp_path, mnemonic):
+    (entry,) = generate_wallets(1, tmp_path, password="secret", mnemonic=mnemonic, max_workers=1)
+    signer = UserSigner.from_wallet(tmp_path / "wallet0.json", "secret")
+    assert signer.get_pubkey().to_address("erd").to_bech32() == entry["address"]
+
+
+def test_invalid_shard(tmp_path):
+    with pytest.raises(ValueError, match="Shard 3 is not one of the 3 shards"):
+        generate_wallets(1, tmp_path, shard=3)
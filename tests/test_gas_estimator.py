@@ -0,0 +1,105 @@
+import math
+from types import SimpleNamespace
+
+import pytest
+from multiversx_sdk import Transaction
+
+from gas_estimator import GasEstimator, function_of, size_bucket
+from mock_gateway import EXECUTION_GAS, NETWORK_CONFIG
+
+ADDRESS = "erd1qyu5wthldzr8wx5c9ucg8kjagg0jfs53s8nr3zpz3hypefsdd8ssycr6th"
+MIN_GAS = NETWORK_CONFIG["erd_min_gas_limit"]
+PER_BYTE = NETWORK_CONFIG["erd_gas_per_data_byte"]
+
+
+def transaction(data):
+    return Transaction(sender=ADDRESS, receiver=ADDRESS, gas_limit=0, chain_id="D", nonce=0, value=0, data=data)
+
+
+class FakeProvider:
+    # Charges `execution` gas on top of the base cost of the last simulate()d data; fails while `failing` is set
+    def __init__(self, execution=1_000_000):
+        self.execution = execution
+        self.failing = False
+        self.simulations = 0
+        self.min_gas_limit = MIN_GAS
+
+    def get_network_config(self):
+        config = {"min_gas_limit": self.min_gas_limit, "gas_per_data_byte": PER_BYTE}
+        return SimpleNamespace(**config, to_dictionary=lambda: config)
+
+    def do_post_generic(self, url, payload):
+        self.simulations += 1
+        if self.failing:
+            raise ConnectionError("gateway went away")
+        return {"txGasUnits": self.min_gas_limit + PER_BYTE * self.length + self.execution, "returnMessage": ""}
+
+    def simulate(self, data):
+        self.length = len(data)
+        return transaction(data)
+
+
+def test_function_of():
+    assert function_of(b"ESDTNFTCreate@01") == "ESDTNFTCreate"
+    exchange = b"ESDTNFTTransfer@41@03@01@" + b"erd1contract".hex().encode() + b"@" + b"exchangeNft".hex().encode()
+    assert function_of(exchange) == "exchangeNft"
+    assert function_of(b"") == ""
+
+
+def test_size_bucket():
+    assert [size_bucket(length) for length in (0, 1, 3, 4, 5, 100)] == [0, 1, 4, 4, 8, 128]
+
+
+def test_one_simulation_per_shape():
+    provider = FakeProvider()
+    estimator = GasEstimator(provider, margin=1.0)
+    data = b"ESDTNFTCreate@" + b"a" * 50
+    first = estimator.estimate(provider.simulate(data))
+    assert first == MIN_GAS + PER_BYTE * len(data) + 1_000_000
+    assert estimator.estimate(provider.simulate(data)) == first
+    assert provider.simulations == 1
+    assert estimator.stats()["hits"] == 1
+
+
+def test_longer_data_scales_the_execution_gas():
+    provider = FakeProvider()
+    estimator = GasEstimator(provider, margin=1.0)
+    short = b"ESDTNFTCreate@" + b"a" * 36
+    longer = b"ESDTNFTCreate@" + b"a" * 50
+    assert size_bucket(len(short)) == size_bucket(len(longer))
+    estimator.estimate(provider.simulate(short))
+    estimate = estimator.estimate(provider.simulate(longer))
+    assert estimate == MIN_GAS + PER_BYTE * len(longer) + math.ceil(1_000_000 * len(longer) / len(short))
+    assert provider.simulations == 1
+
+
+def test_failed_simulation_falls_back_and_is_not_retried_at_once():
+    provider = FakeProvider()
+    provider.failing = True
+    estimator = GasEstimator(provider, retry_after=60)
+    data = b"exchangeNft@01"
+    assert estimator.estimate(provider.simulate(data), fallback=6_000_000) == 6_000_000
+    assert estimator.estimate(provider.simulate(data), fallback=6_000_000) == 6_000_000
+    assert provider.simulations == 1
+    with pytest.raises(RuntimeError, match="simulation failed"):
+        estimator.estimate(provider.simulate(data))
+
+
+def test_network_config_change_drops_the_cache():
+    provider = FakeProvider()
+    estimator = GasEstimator(provider, config_check_interval=0)
+    data = b"exchangeNft@01"
+    estimator.estimate(provider.simulate(data))
+    provider.min_gas_limit += 1
+    estimator.estimate(provider.simulate(data))
+    assert provider.simulations == 2
+    assert estimator.stats()["refreshes"] == 1
+
+
+def test_estimates_against_the_mock(client):
+    estimator = GasEstimator(client.get_provider(), margin=1.0)
+    data = client.build_nft_create_data("card", "TEMA1-a1b2c3", 1, 2, 0, "https://example.com/card.png")
+    minted = client.build_nft_create_transaction(data, 0)
+    assert estimator.estimate(minted) == MIN_GAS + PER_BYTE * len(minted.data) + EXECUTION_GAS["ESDTNFTCreate"]
+    assert estimator.apply(minted) == minted.gas_limit
+    assert estimator.stats()["simulations"] == 1
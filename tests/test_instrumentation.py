@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+
+import instrumentation
+from instrumentation import Histogram, InstrumentedProvider, Metrics
+
+
+@pytest.fixture
+def events():
+    collected = []
+    instrumentation.set_sink(lambda level, message: collected.append((level, message)))
+    yield collected
+    instrumentation.set_sink(None)
+    instrumentation.set_level("info")
+
+
+def test_events_below_the_level_are_dropped(events):
+    instrumentation.set_level("warning")
+    assert not instrumentation.DEBUG
+    instrumentation.info("hidden %s", 1)
+    instrumentation.warning("shown %s", 2)
+
+    instrumentation.set_level("trace")
+    assert instrumentation.DEBUG and instrumentation.TRACE
+    instrumentation.trace("raw %s")
+    assert events == [(instrumentation.WARNING, "shown 2"), (instrumentation.TRACE_LEVEL, "raw %s")]
+
+
+def test_histogram_quantiles_stay_inside_the_observed_range():
+    histogram = Histogram()
+    for value in [0.002] * 90 + [0.2] * 10:
+        histogram.observe(value)
+    assert histogram.count == 100
+    assert histogram.sum == pytest.approx(2.18)
+    assert 0.001 <= histogram.quantile(0.5) <= 0.0025
+    assert 0.1 <= histogram.quantile(0.95) <= 0.2
+    assert histogram.quantile(1.0) == pytest.approx(0.2)
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_snapshot_and_prometheus_output(tmp_path):
+    metrics = Metrics()
+    metrics.increment("sent", 3, wallet="a")
+    metrics.observe("stage_seconds", 0.003, stage="sign")
+    with pytest.raises(ValueError):
+        with metrics.timer("stage_seconds", stage="sign"):
+            raise ValueError("boom")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == [{"name": "sent", "labels": {"wallet": "a"}, "value": 3}]
+    assert [entry["labels"] for entry in snapshot["histograms"]] == [
+        {"outcome": "error", "stage": "sign"},
+        {"stage": "sign"},
+    ]
+
+    text = metrics.to_prometheus()
+    assert "# TYPE tema1_sent_total counter" in text
+    assert 'tema1_sent_total{wallet="a"} 3' in text
+    assert 'tema1_stage_seconds_bucket{stage="sign",le="0.005"} 1' in text
+    assert 'tema1_stage_seconds_bucket{stage="sign",le="+Inf"} 1' in text
+    assert text.count("# TYPE tema1_stage_seconds histogram") == 1
+
+    metrics.write(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text())["counters"][0]["value"] == 3
+    metrics.write(tmp_path / "metrics.prom")
+    assert (tmp_path / "metrics.prom").read_text() == text
+
+
+class FakeProvider:
+    url = "http://gateway"
+
+    def get_network_config(self):
+        return "config"
+
+    def get_account(self, address):
+        raise ConnectionError("gateway went away")
+
+    async def get_transaction(self, tx_hash):
+        raise TimeoutError(tx_hash)
+
+
+def test_instrumented_provider_times_calls_and_counts_errors():
+    instrumentation.METRICS.reset()
+    provider = InstrumentedProvider(FakeProvider())
+    assert provider.url == "http://gateway"
+    assert provider.get_network_config() == "config"
+    with pytest.raises(ConnectionError):
+        provider.get_account("erd1")
+    with pytest.raises(TimeoutError):
+        asyncio.run(provider.get_transaction("ab"))
+
+    snapshot = instrumentation.METRICS.snapshot()
+    instrumentation.METRICS.reset()
+    assert [(entry["labels"]["method"], entry["value"]) for entry in snapshot["counters"]] == [
+        ("get_account", 1),
+        ("get_transaction", 1),
+    ]
+    assert sorted(entry["labels"]["method"] for entry in snapshot["histograms"]) == [
+        "get_account", "get_network_config", "get_transaction",
+    ]
@@ -0,0 +1,65 @@
+import pytest
+
+from matching_engine import match_students
+from nft_attributes import decode_attributes
+from nft_catalog import NftCatalog
+from nft_columns import NftColumns
+
+
+def nft(nonce, nft_class, rarity, power):
+    return {"nonce": nonce, "token_id": f"{nonce:04x}", "class": nft_class, "rarity": rarity, "power": power}
+
+
+SUPPLY = [
+    nft(1, 1, 2, 0),
+    nft(2, 1, 2, 2),
+    nft(3, 1, 2, 2),
+    nft(4, 1, 2, 0),
+    nft(5, 2, 0, 1),
+]
+
+
+@pytest.mark.parametrize("view", [list, NftCatalog, NftColumns.from_nfts], ids=["list", "catalog", "columns"])
+def test_exact_power_first_then_the_nearest(view):
+    demands = {"alice": (1, 2, 2), "bob": (1, 2, 1), "carol": (1, 2, 2), "dave": (1, 2, 0)}
+    matching = match_students(demands, view(SUPPLY))
+    by_student = matching.by_student()
+    # Among equal powers the lowest nonce goes first
+    assert (by_student["alice"].nonce, by_student["carol"].nonce) == (2, 3)
+    assert by_student["dave"].nonce == 1
+    # Powers 0 and 2 are equally near 1: the higher one would win, but both
+    # power-2 cards are taken, so bob gets the last power 0
+    assert (by_student["bob"].nonce, by_student["bob"].power) == (4, 0)
+    assert [assignment.student for assignment in matching] == list(demands)
+
+
+def test_ties_go_to_the_higher_power():
+    matching = match_students({"bob": (1, 2, 1)}, SUPPLY)
+    (assignment,) = matching
+    assert (assignment.nonce, assignment.power, assignment.exact) == (2, 2, False)
+
+
+def test_no_nft_is_assigned_twice_and_the_rest_are_unmatched():
+    demands = [("alice", (2, 0, 1)), ("bob", {"class": 2, "rarity": 0, "power": 1}), ("carol", (3, 1, 0)), ("dave", None)]
+    matching = match_students(demands, SUPPLY)
+    assert matching.nonces() == [5]
+    assert matching.unmatched == ["bob", "carol"]
+    assert matching.stats() == {
+        "assigned": 1, "exact_power": 1, "nearest_power": 0, "unmatched": 2, "power_distance": 0,
+    }
+
+
+def test_plan_exchanges_assigns_matching_nfts(client, model):
+    matching = client.plan_exchanges()
+    assert len(matching) > 0
+    assert len(set(matching.nonces())) == len(matching)
+    for assignment in matching:
+        nft_class, rarity, _ = decode_attributes(model.supply[assignment.nonce].attributes)
+        assert (nft_class, rarity) == (assignment.nft_class, assignment.rarity)
+
+    # The supply index follows a local exchange
+    index = client.get_supply_index()
+    taken = matching.nonces()[0]
+    client.get_supply_store().mark_exchanged(taken)
+    assert taken not in index
+    assert taken not in client.plan_exchanges(max_age=60).nonces()
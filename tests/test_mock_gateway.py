@@ -0,0 +1,60 @@
+import pytest
+import requests
+
+from conftest import TICKER, mint
+from mock_gateway import MockGateway, Tema1Model
+
+
+def test_serves_the_network_config(client):
+    config = client.get_provider().get_network_config()
+    assert config.chain_id == "D"
+    assert config.min_gas_limit == 50000
+
+
+def test_minted_transactions_execute_in_blocks(client, model, wallet):
+    token_nonces = mint(client, 4)
+    assert len(set(token_nonces)) == 4
+    assert model.account(wallet.address)["nonce"] == 4
+    assert model.stats()["transactions"] == {"success": 4}
+
+
+def test_send_multiple_leaves_rejected_transactions_out(client, model):
+    transactions = [
+        client.build_nft_create_transaction(client.build_nft_create_data("card", TICKER, 1, 2, 0, "uri"), nonce)
+        for nonce in (0, 1, 5000)
+    ]
+    for transaction in transactions:
+        transaction.signature = client.get_signer().sign(client.transaction_computer.compute_bytes_for_signing(transaction))
+    sent, hashes = client.get_provider().send_transactions(transactions)
+    assert sent == 2
+    assert sorted(hashes) == ["0", "1"]
+
+
+def test_bad_signatures_are_rejected_when_verified(wallet):
+    model = Tema1Model(supply_size=1, students=1, block_time=0.05, verify_signatures=True, seed=1).start()
+    try:
+        with MockGateway(model) as gateway:
+            transaction = {
+                "nonce": 0, "value": "0", "receiver": wallet.address, "sender": wallet.address,
+                "gasPrice": 1000000000, "gasLimit": 100000, "chainID": "D", "version": 2,
+                "signature": "00" * 64,
+            }
+            response = requests.post(f"{gateway.url}/transaction/send", json=transaction, timeout=5)
+            assert response.status_code == 400
+            assert response.json()["error"] == "invalid signature"
+    finally:
+        model.stop()
+
+
+@pytest.mark.parametrize("throttle_share, status", [(1.0, 429), (0.0, 500)])
+def test_injected_errors(model, throttle_share, status):
+    with MockGateway(model, error_rate=1.0, throttle_share=throttle_share) as gateway:
+        response = requests.get(f"{gateway.url}/network/config", timeout=5)
+    assert response.status_code == status
+    assert (response.headers.get("Retry-After") == "1") == (status == 429)
+
+
+def test_unknown_transaction_is_not_found(gateway):
+    response = requests.get(f"{gateway.url}/transaction/{'ab' * 32}", timeout=5)
+    assert response.status_code == 404
+    assert "not found" in response.json()["error"]
@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+import requests
+from multiversx_sdk.network_providers.errors import GenericError
+
+from mock_gateway import MockGateway
+from multi_gateway import MultiGatewayProvider, is_gateway_fault, provider_for
+from traffic_control import (
+    SEND, ControlledProvider, GatewayHTTPError, StatusAwareProvider, TrafficController, traffic_class_of,
+)
+
+
+class Transaction:
+    def __init__(self, sender, nonce):
+        self.sender = sender
+        self.nonce = nonce
+
+
+class FakeGateway:
+    # Records which senders each URL got; fails with the errors queued for it
+    log = []
+
+    def __init__(self, url):
+        self.url = url
+        self.errors = []
+
+    def _next_error(self):
+        if self.errors:
+            raise self.errors.pop(0)
+
+    def get_network_config(self):
+        FakeGateway.log.append(("get_network_config", self.url))
+        self._next_error()
+        return self.url
+
+    def send_transactions(self, transactions):
+        FakeGateway.log.append(("send_transactions", self.url, [tx.sender for tx in transactions]))
+        self._next_error()
+        return len(transactions), {str(index): f"{tx.sender}-{tx.nonce}" for index, tx in enumerate(transactions)}
+
+    def do_post_generic(self, resource_url, payload):
+        FakeGateway.log.append(("do_post_generic", self.url, resource_url))
+        self._next_error()
+        return self.url
+
+
+@pytest.fixture
+def multi():
+    FakeGateway.log = []
+    provider = MultiGatewayProvider(["a", "b", "c", "d"], failure_threshold=100, provider_factory=FakeGateway)
+    yield provider
+    provider.close()
+
+
+def by_url(multi):
+    return {gateway.url: gateway.provider for gateway in multi.gateways}
+
+
+def test_is_gateway_fault():
+    assert is_gateway_fault(GatewayHTTPError("url", "x", 502))
+    assert is_gateway_fault(GatewayHTTPError("url", "x", 408))
+    assert is_gateway_fault(GenericError("url", requests.ConnectionError()))
+    assert is_gateway_fault(GenericError("url", requests.ReadTimeout()))
+    # HTTP 200 with an application error, and 4xx answers, are the request's fault
+    assert not is_gateway_fault(GenericError("url", "code: internal_issue, error: lowerNonceInTx"))
+    assert not is_gateway_fault(GatewayHTTPError("url", {"error": "bad"}, 400))
+    assert not is_gateway_fault(GatewayHTTPError("url", "x", 429))
+
+
+def test_batches_are_split_and_pinned_per_sender(multi):
+    transactions = [Transaction(sender, nonce) for nonce, sender in enumerate("xyxzyx")]
+    sent, hashes = multi.send_transactions(transactions)
+    assert sent == 6
+    assert hashes == {str(index): f"{tx.sender}-{tx.nonce}" for index, tx in enumerate(transactions)}
+
+    sends = [entry for entry in FakeGateway.log if entry[0] == "send_transactions"]
+    assert sorted(senders for _, _, senders in sends) == [["x", "x", "x"], ["y", "y"], ["z"]]
+    for _, url, senders in sends:
+        assert multi.pinned(senders[0])[0].url == url
+
+
+def test_failed_sender_reports_the_hashes_of_the_others(multi):
+    by_url(multi)[multi.pinned("y")[0].url].errors.append(GatewayHTTPError("url", {"error": "bad"}, 400))
+    transactions = [Transaction("x", 0), Transaction("y", 1), Transaction("x", 2)]
+    with pytest.raises(GatewayHTTPError) as raised:
+        multi.send_transactions(transactions)
+    assert raised.value.tx_hashes == {"0": "x-0", "2": "x-2"}
+
+
+def test_fails_over_on_gateway_faults_only(multi):
+    first = multi.ranked()[0].provider
+    first.errors.append(GatewayHTTPError("url", "x", 500))
+    assert multi.get_network_config() != first.url
+
+    FakeGateway.log = []
+    first = multi.ranked()[0].provider
+    first.errors.append(GenericError("url", "code: bad_request, error: no such view"))
+    with pytest.raises(GenericError):
+        multi.get_network_config()
+    assert len(FakeGateway.log) == 1
+
+
+@pytest.mark.parametrize("error, failed_over", [
+    (GatewayHTTPError("url", "x", 503), False),
+    (GenericError("url", requests.ReadTimeout()), False),
+    (GatewayHTTPError("url", "x", 503, retry_after=1), True),
+])
+def test_sends_fail_over_only_when_throttled(multi, error, failed_over):
+    by_url(multi)[multi.pinned("x")[0].url].errors.append(error)
+    if failed_over:
+        assert multi.send_transactions([Transaction("x", 0)])[0] == 1
+    else:
+        with pytest.raises(type(error)):
+            multi.send_transactions([Transaction("x", 0)])
+    assert len(FakeGateway.log) == 1 + failed_over
+
+
+def test_send_posts_are_recognised_by_keyword(multi):
+    multi.ranked()[0].provider.errors.append(GatewayHTTPError("url", "x", 503))
+    with pytest.raises(GatewayHTTPError):
+        multi.do_post_generic(resource_url="transaction/send", payload={})
+    assert len(FakeGateway.log) == 1
+    assert traffic_class_of("do_post_generic", (), {"resource_url": "transaction/send"}) == SEND
+
+
+def test_failover_spends_the_controller_retry_budget(multi):
+    for provider in by_url(multi).values():
+        provider.errors.extend([GatewayHTTPError("url", "x", 500)] * 10)
+    controlled = ControlledProvider(multi, TrafficController(max_retries=2, backoff=0.001))
+    with pytest.raises(GatewayHTTPError):
+        controlled.get_network_config()
+    assert len(FakeGateway.log) == 3
+
+
+def test_failing_gateway_cools_down():
+    provider = MultiGatewayProvider(["a", "b"], failure_threshold=2, cooldown=60, provider_factory=FakeGateway)
+    broken = provider.gateways[0]
+    for _ in range(2):
+        broken.provider.errors.append(GatewayHTTPError("url", "x", 500))
+        provider._call_in_order([broken, provider.gateways[1]], "get_network_config", (), {})
+    assert provider.ranked()[-1] is broken
+    assert provider.stats()[0]["down"]
+    provider.close()
+
+
+def test_provider_for_single_url_is_plain():
+    assert not isinstance(provider_for("http://one"), MultiGatewayProvider)
+    assert isinstance(provider_for("http://one, http://two"), MultiGatewayProvider)
+
+
+def test_reads_survive_a_failing_mock_gateway(model):
+    with MockGateway(model, error_rate=1.0, throttle_share=0.0) as broken, MockGateway(model) as healthy:
+        provider = MultiGatewayProvider([broken.url, healthy.url], provider_factory=StatusAwareProvider)
+        for _ in range(5):
+            assert provider.get_network_status(0).nonce >= 0
+        stats = {gateway["url"]: gateway for gateway in provider.stats()}
+        assert stats[broken.url]["errors"] > 0
+        assert stats[healthy.url]["errors"] == 0
+        provider.close()
+
+
+def test_async_gateways_route_like_sync_ones(model):
+    from async_provider import AsyncProxyNetworkProvider
+
+    async def run(urls):
+        async with MultiGatewayProvider(urls, provider_factory=AsyncProxyNetworkProvider) as provider:
+            return [(await provider.get_network_config()).chain_id for _ in range(3)]
+
+    with MockGateway(model, error_rate=1.0, throttle_share=0.0) as broken, MockGateway(model) as healthy:
+        assert asyncio.run(run([broken.url, healthy.url])) == ["D"] * 3
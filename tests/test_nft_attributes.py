@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from abi_codegen import DEFAULT_ABI_PATH, load_codec
+from nft_attributes import decode_attributes, decode_many, decode_supply, encode_raw_attributes, encode_text_attributes
+
+
+@pytest.fixture(scope="module")
+def codec():
+    return load_codec(Path(__file__).resolve().parent.parent / DEFAULT_ABI_PATH)
+
+
+def token_data(codec, attributes):
+    return codec.EsdtTokenData(
+        token_type=1, amount=1, frozen=False, hash=bytes(32), name=b"card", attributes=attributes,
+        creator=bytes(32), royalties=0, uris=[],
+    )
+
+
+@pytest.mark.parametrize("attributes, expected", [
+    (b"tags:class8;rarity3;power2", (8, 3, 2)),
+    (b"tags:power2;class8;rarity3", (8, 3, 2)),
+    (encode_raw_attributes(1, 2, 3), (1, 2, 3)),
+    (b"tags:class8;rarity3", None),
+    (b"\x01\x02", None),
+    # Only exactly three bytes are the raw layout
+    (b"\x01\x02\x03\x04", None),
+])
+def test_decode_attributes(attributes, expected):
+    assert decode_attributes(attributes) == expected
+
+
+def test_decode_many_marks_invalid_entries():
+    columns = decode_many([
+        encode_text_attributes(8, 3, 2),
+        b"garbage",
+        f"tags:class{2 ** 64};rarity1;power1".encode(),
+    ])
+    assert list(columns.valid) == [1, 0, 0]
+    assert list(columns.class_) == [8, 0, 0]
+
+
+def test_decode_supply(codec):
+    parts = [codec.top_encode_EsdtTokenData(token_data(codec, encode_text_attributes(index, 1, 2))) for index in range(3)]
+    columns = decode_supply(parts, codec)
+    assert list(columns.class_) == [0, 1, 2]
+    assert list(columns.valid) == [1, 1, 1]
@@ -0,0 +1,90 @@
+import pytest
+
+import assignment1
+from nft_catalog import NftCatalog
+from supply_store import SupplyStore
+
+
+def nft(nonce, nft_class=1, rarity=2, power=0):
+    return {"nonce": nonce, "token_id": f"{nonce:04x}", "class": nft_class, "rarity": rarity, "power": power}
+
+
+def test_catalog_remove_returns_the_removed_nfts():
+    catalog = NftCatalog([nft(1), nft(2, nft_class=3)])
+    assert [entry["nonce"] for entry in catalog.remove({2, 5})] == [2]
+    assert catalog.candidates(nft_class=3) == []
+    assert [entry["nonce"] for entry in catalog.candidates(rarity=2)] == [1]
+
+
+def test_catalog_finds_the_oldest_match():
+    catalog = NftCatalog([nft(3, nft_class=2), nft(1, nft_class=2), nft(2, nft_class=2, rarity=0)])
+    assert catalog.find(nft_class=2)["nonce"] == 3
+    assert catalog.find(nft_class=2, rarity=0)["nonce"] == 2
+    assert catalog.find(power=1) is None
+    assert len(catalog) == 3 and 1 in catalog
+
+
+def test_find_matching_nft_on_lists_and_catalogs():
+    nfts = [nft(1, nft_class=1, rarity=0), nft(2, nft_class=2, rarity=1)]
+    target = {"class": 2, "rarity": 1}
+    assert assignment1.find_matching_nft(nfts, target)["nonce"] == 2
+    assert assignment1.find_matching_nft(NftCatalog(nfts), target)["nonce"] == 2
+    assert assignment1.find_matching_nft(nfts, {"class": 3, "rarity": 1}) is None
+
+
+@pytest.fixture
+def store(client, model, tmp_path):
+    store = SupplyStore(client.get_query_controller(), model.contract_address, str(tmp_path / "store.sqlite3"),
+                        codec=client.get_codec())
+    yield store
+    store.close()
+
+
+def held(store):
+    return sorted(entry["nonce"] for entry in store.available_nfts())
+
+
+def available(catalog):
+    return sorted(entry["nonce"] for entry in catalog)
+
+
+def test_attached_views_stay_in_step(store, model):
+    store.sync()
+    catalog = store.attach(NftCatalog())
+    assert available(catalog) == held(store)
+
+    del model.supply[25]
+    model._mint_to_contract((3, 1, 2))
+    store.query_controller.invalidate()
+    store.sync()
+    store.mark_exchanged(21)
+    assert 21 not in catalog
+    assert available(catalog) == held(store)
+
+    store.detach(catalog)
+    store.mark_exchanged(22)
+    assert 22 in catalog
+
+
+def test_failed_sync_rolls_back(store, model):
+    store.sync()
+    catalog = store.attach(NftCatalog())
+    before = held(store)
+    del model.supply[5]
+    model._mint_to_contract((1, 2, 2))
+    store.query_controller.invalidate()
+
+    def broken(function, arguments):
+        if function == "getTokenData":
+            raise ConnectionError("gateway went away")
+        return SupplyStore._run_query(store, function, arguments)
+
+    store._run_query = broken
+    with pytest.raises(RuntimeError, match="Error syncing token data for nonce"):
+        store.sync()
+    assert held(store) == before
+    assert available(catalog) == before
+
+    del store._run_query
+    store.sync()
+    assert held(store) == available(catalog) == sorted(model.supply)
@@ -0,0 +1,96 @@
+import pytest
+
+from nft_attributes import encode_text_attributes
+from nft_columns import NftColumns
+from supply_store import SupplyStore
+
+
+def nft(nonce, nft_class=1, rarity=2, power=0):
+    return {"nonce": nonce, "token_id": f"{nonce:04x}", "class": nft_class, "rarity": rarity, "power": power}
+
+
+def available(view):
+    if isinstance(view, NftColumns):
+        return sorted(int(nonce) for nonce in view.nonce[view.available])
+    return sorted(entry["nonce"] for entry in view)
+
+
+def test_columns_take_batches_from_any_iterable():
+    view = NftColumns([], [], [], [])
+    view.insert(nft(nonce, nft_class=nonce % 3) for nonce in range(1, 7))
+    view.remove(iter([2, 4, 99]))
+    assert available(view) == [1, 3, 5, 6]
+
+    # A re-inserted nonce replaces its previous entry
+    view.insert([nft(3, nft_class=2, rarity=1)])
+    assert available(view) == [1, 3, 5, 6]
+    assert view.find(nft_class=2, rarity=1)["nonce"] == 3
+    # Nonce 3 no longer matches its old class 0
+    assert view.find(nft_class=0)["nonce"] == 6
+    assert view.find(nft_class=1, rarity=1) is None
+
+
+def test_columns_compact_once_most_rows_are_gone():
+    columns = NftColumns.from_nfts(nft(nonce) for nonce in range(1, 5))
+    columns.remove([1, 2, 3])
+    columns.insert([nft(5, nft_class=2)])
+    assert len(columns) == 2
+    assert columns.to_dicts(range(2)) == [nft(4), nft(5, nft_class=2)]
+
+
+def test_columns_hold_values_above_a_byte():
+    columns = NftColumns.from_nfts([nft(1, nft_class=300, power=2 ** 40)])
+    columns.insert([nft(2, rarity=70000)])
+    assert columns.find(nft_class=300)["power"] == 2 ** 40
+    assert columns.find(rarity=70000)["nonce"] == 2
+
+
+@pytest.fixture
+def store(client, model, tmp_path):
+    store = SupplyStore(client.get_query_controller(), model.contract_address, str(tmp_path / "store.sqlite3"),
+                        codec=client.get_codec())
+    yield store
+    store.close()
+
+
+def test_store_and_columns_agree_on_large_values(store, model):
+    store.sync()
+    columns = store.attach(NftColumns([], [], [], []))
+    token_nonce = max(model.supply)
+    entry = model.supply[token_nonce]
+    model.supply[token_nonce] = model._token_data(entry.name, encode_text_attributes(300, 1, 2), entry.creator)
+    store.query_controller.invalidate()
+    store.sync()
+    assert store.available_nfts(nft_class=300) == [columns.find(nft_class=300)]
+    assert available(columns) == sorted(nft["nonce"] for nft in store.available_nfts())
+
+
+def test_a_failing_view_rolls_the_store_back(store, model):
+    store.sync()
+    columns = store.attach(NftColumns([], [], [], []))
+    before = available(columns)
+
+    class Broken:
+        failing = False
+
+        def insert(self, nfts):
+            # Refuses the new NFTs, takes the committed ones back
+            if self.failing:
+                self.failing = False
+                raise OverflowError("value too large")
+
+        def remove(self, nonces):
+            pass
+
+    broken = store.attach(Broken())
+    broken.failing = True
+    del model.supply[before[0]]
+    model._mint_to_contract((1, 2, 2))
+    store.query_controller.invalidate()
+    with pytest.raises(RuntimeError, match="Error updating supply views: value too large"):
+        store.sync()
+    assert sorted(nft["nonce"] for nft in store.available_nfts()) == available(columns) == before
+
+    store.detach(broken)
+    store.sync()
+    assert available(columns) == sorted(model.supply)
@@ -0,0 +1,107 @@
+import requests
+from multiversx_sdk.network_providers.errors import GenericError
+
+from nonce_manager import NonceManager
+from traffic_control import GatewayHTTPError
+
+ADDRESS = "erd1qyu5wthldzr8wx5c9ucg8kjagg0jfs53s8nr3zpz3hypefsdd8ssycr6th"
+
+
+class _Account:
+    def __init__(self, nonce):
+        self.nonce = nonce
+
+
+class FakeProvider:
+    # Account nonce as the gateway reports it, i.e. what it has executed
+    def __init__(self, nonce=5):
+        self.nonce = nonce
+        self.calls = 0
+
+    def get_account(self, address):
+        self.calls += 1
+        return _Account(self.nonce)
+
+
+def test_nonces_are_fetched_once_then_counted_locally():
+    provider = FakeProvider(5)
+    nonces = NonceManager(provider)
+    assert [nonces.get_nonce(ADDRESS) for _ in range(3)] == [5, 6, 7]
+    assert provider.calls == 1
+
+
+def test_release_of_latest_nonce_steps_back():
+    nonces = NonceManager(FakeProvider(5))
+    first, second = nonces.get_nonce(ADDRESS), nonces.get_nonce(ADDRESS)
+    nonces.release(ADDRESS, second)
+    nonces.release(ADDRESS, first)
+    assert nonces.get_nonce(ADDRESS) == 5
+    assert nonces.gaps(ADDRESS) == []
+
+
+def test_released_nonce_below_the_top_is_filled_first():
+    nonces = NonceManager(FakeProvider(5))
+    reserved = [nonces.get_nonce(ADDRESS) for _ in range(4)]
+    nonces.release(ADDRESS, reserved[1])
+    assert nonces.gaps(ADDRESS) == [6]
+    assert nonces.get_nonce(ADDRESS) == 6
+    assert nonces.get_nonce(ADDRESS) == 9
+
+
+def test_rejected_send_gives_its_nonce_back():
+    nonces = NonceManager(FakeProvider(5))
+    nonce = nonces.get_nonce(ADDRESS)
+    rejected = GatewayHTTPError("transaction/send", {"error": "bad signature"}, 400)
+    nonces.send_failed(ADDRESS, nonce, rejected)
+    assert nonces.get_nonce(ADDRESS) == nonce
+
+
+def test_timed_out_send_keeps_its_nonce():
+    # The gateway may have accepted it: handing the nonce out again would replace or clash with it
+    nonces = NonceManager(FakeProvider(5))
+    nonce = nonces.get_nonce(ADDRESS)
+    timeout = GenericError("transaction/send", requests.ReadTimeout("read timed out"))
+    nonces.send_failed(ADDRESS, nonce, timeout)
+    assert nonces.get_nonce(ADDRESS) == nonce + 1
+
+
+def test_bare_503_on_send_keeps_its_nonce():
+    nonces = NonceManager(FakeProvider(5))
+    nonce = nonces.get_nonce(ADDRESS)
+    nonces.send_failed(ADDRESS, nonce, GatewayHTTPError("transaction/send", "unavailable", 503))
+    assert nonces.get_nonce(ADDRESS) == nonce + 1
+
+
+def test_unsent_batch_releases_every_nonce():
+    nonces = NonceManager(FakeProvider(5))
+    reserved = [nonces.get_nonce(ADDRESS) for _ in range(3)]
+    nonces.send_failed(ADDRESS, reserved, ValueError("signing failed"), sent=False)
+    assert nonces.get_nonce(ADDRESS) == 5
+
+
+def test_resync_only_moves_forward_and_drops_stale_gaps():
+    provider = FakeProvider(5)
+    nonces = NonceManager(provider)
+    reserved = [nonces.get_nonce(ADDRESS) for _ in range(4)]
+    nonces.release(ADDRESS, reserved[0])
+
+    # Another client used the account meanwhile
+    provider.nonce = 12
+    assert nonces.resync(ADDRESS) == 12
+    assert nonces.gaps(ADDRESS) == []
+    assert nonces.get_nonce(ADDRESS) == 12
+
+    # Transactions still in the mempool keep the local counter ahead
+    provider.nonce = 10
+    nonces.resync(ADDRESS)
+    assert nonces.get_nonce(ADDRESS) == 13
+
+
+def test_skip_to_and_reset():
+    provider = FakeProvider(5)
+    nonces = NonceManager(provider)
+    nonces.skip_to(ADDRESS, 20)
+    assert nonces.get_nonce(ADDRESS) == 20
+    nonces.reset()
+    assert nonces.get_nonce(ADDRESS) == 5
+    assert provider.calls == 2
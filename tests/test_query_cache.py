@@ -0,0 +1,138 @@
+import time
+from types import SimpleNamespace
+
+from query_cache import CachedQueryController, readonly_endpoints
+
+
+def query(function="nftSupply", *arguments):
+    return SimpleNamespace(contract="erd1contract", function=function, arguments=list(arguments), caller=None)
+
+
+class FakeController:
+    def __init__(self):
+        self.calls = 0
+        self.return_code = "ok"
+        # Run during a query, as if another thread did it meanwhile
+        self.during_query = None
+
+    def run_query(self, query):
+        self.calls += 1
+        if self.during_query is not None:
+            self.during_query()
+        return SimpleNamespace(return_code=self.return_code, return_data_parts=[bytes([self.calls])])
+
+    def create_query(self, **kwargs):
+        return "created"
+
+
+def cached(controller, **kwargs):
+    return CachedQueryController(controller, {"nftSupply", "getYourNftCardProperties"}, **kwargs)
+
+
+def test_readonly_endpoints():
+    endpoints = readonly_endpoints("tema1.abi.json")
+    assert "nftSupply" in endpoints
+    assert "exchangeNft" not in endpoints
+
+
+def test_results_are_cached_per_arguments():
+    controller = FakeController()
+    cache = cached(controller)
+    first = cache.run_query(query())
+    assert cache.run_query(query()) is first
+    cache.run_query(query("nftSupply", b"\x01"))
+    assert controller.calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_uncacheable_functions_always_go_through():
+    controller = FakeController()
+    cache = cached(controller)
+    cache.run_query(query("exchangeNft"))
+    cache.run_query(query("exchangeNft"))
+    assert controller.calls == 2
+    assert cache.create_query() == "created"
+
+
+def test_failed_queries_are_not_cached():
+    controller = FakeController()
+    controller.return_code = "user error"
+    cache = cached(controller)
+    cache.run_query(query())
+    cache.run_query(query())
+    assert controller.calls == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_result_raced_by_an_invalidation_is_not_stored():
+    controller = FakeController()
+    cache = cached(controller)
+    controller.during_query = cache.invalidate
+    cache.run_query(query())
+    controller.during_query = None
+    cache.run_query(query())
+    assert controller.calls == 2
+
+
+def test_entries_expire_after_their_ttl():
+    controller = FakeController()
+    cache = cached(controller, ttls={"nftSupply": 0.05})
+    cache.run_query(query())
+    cache.run_query(query())
+    time.sleep(0.06)
+    cache.run_query(query())
+    assert controller.calls == 2
+
+
+def test_new_block_drops_all_but_stable_results():
+    controller = FakeController()
+    cache = cached(controller, stable_functions={"getYourNftCardProperties"})
+    cache.observe_block_nonce(10)
+    cache.run_query(query())
+    cache.run_query(query("getYourNftCardProperties"))
+    cache.observe_block_nonce(9)
+    cache.run_query(query())
+    assert controller.calls == 2
+
+    cache.observe_block_nonce(11)
+    cache.run_query(query())
+    cache.run_query(query("getYourNftCardProperties"))
+    assert controller.calls == 3
+
+
+def test_block_nonce_is_read_at_most_every_interval():
+    controller = FakeController()
+    nonces = iter(range(100))
+    reads = []
+
+    def block_nonce():
+        reads.append(1)
+        return next(nonces)
+
+    cache = cached(controller, block_nonce_fn=block_nonce, block_check_interval=60)
+    for _ in range(5):
+        cache.run_query(query())
+    assert len(reads) == 1
+    assert controller.calls == 1
+
+
+def test_invalidate_only_the_given_contract():
+    controller = FakeController()
+    cache = cached(controller)
+    other = SimpleNamespace(contract="erd1other", function="nftSupply", arguments=[], caller=None)
+    cache.run_query(query())
+    cache.run_query(other)
+    cache.invalidate("erd1other")
+    cache.run_query(query())
+    cache.run_query(other)
+    assert controller.calls == 3
+
+
+def test_least_recently_used_entries_are_evicted():
+    controller = FakeController()
+    cache = cached(controller, max_entries=2)
+    for argument in (b"\x01", b"\x02", b"\x01", b"\x03"):
+        cache.run_query(query("nftSupply", argument))
+    assert cache.stats()["evictions"] == 1
+    cache.run_query(query("nftSupply", b"\x01"))
+    assert controller.calls == 3
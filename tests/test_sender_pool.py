@@ -0,0 +1,75 @@
+import pytest
+from multiversx_sdk import AddressComputer, UserSecretKey, UserSigner
+
+from conftest import Wallet
+from sender_pool import SenderPool
+
+
+def signers_by_shard(per_shard):
+    # per_shard: shard -> number of wallets wanted there
+    address_computer = AddressComputer(number_of_shards=3)
+    wanted = dict(per_shard)
+    signers = []
+    while any(wanted.values()):
+        secret_key = UserSecretKey.generate()
+        address = secret_key.generate_public_key().to_address("erd")
+        shard = address_computer.get_shard_of_address(address)
+        if wanted.get(shard):
+            wanted[shard] -= 1
+            signers.append(UserSigner(secret_key))
+    return signers
+
+
+def test_acquire_balances_senders_and_shards(client):
+    pool = SenderPool(client.get_provider(), signers_by_shard({0: 2, 1: 1}))
+    assert {shard: len(senders) for shard, senders in pool.by_shard().items()} == {0: 2, 1: 1}
+
+    first, second, third = pool.acquire(), pool.acquire(), pool.acquire()
+    assert len({first.address, second.address, third.address}) == 3
+    # With one transaction in flight each, the least-loaded shard goes next
+    assert pool.acquire().shard == 1
+
+    pool.release(first)
+    assert pool.acquire() is first
+    assert sum(sender.in_flight for sender in pool.senders) == 4
+
+
+def test_acquire_prefers_the_given_shard(client):
+    pool = SenderPool(client.get_provider(), signers_by_shard({0: 1, 2: 2}))
+    picked = [pool.acquire(shard=2) for _ in range(4)]
+    assert {sender.shard for sender in picked} == {2}
+    assert sorted(sender.in_flight for sender in pool.by_shard()[2]) == [2, 2]
+    # A shard without senders falls back to the whole pool
+    with pool.lease(shard=1) as sender:
+        assert sender.shard == 0 and sender.in_flight == 1
+    assert sender.in_flight == 0
+
+
+def test_top_up_funds_only_low_balances(client, model):
+    pool = SenderPool(client.get_provider(), signers_by_shard({0: 1, 1: 1}))
+    low, rich = pool.senders
+    model.fund(rich.address, 10**18)
+    funder = Wallet()
+    starting = int(model.account(low.address)["balance"])
+
+    tx_hashes = pool.top_up(funder.signer, min_balance=starting + 1, amount=5 * 10**18)
+    assert list(tx_hashes) == [low.address]
+
+    tracker = client.get_tracker()
+    tracker.track_many(list(tx_hashes.values()))
+    assert all(result.ok for result in tracker.run())
+    balances = pool.balances()
+    assert balances[low.address] == starting + 5 * 10**18
+    assert balances[rich.address] == starting + 10**18
+    assert pool.top_up(funder.signer, min_balance=starting + 1, amount=10**18) == {}
+
+
+def test_top_up_reports_a_failed_balance_fetch(client, monkeypatch):
+    pool = SenderPool(client.get_provider(), signers_by_shard({0: 1}))
+
+    def unavailable(address):
+        raise ConnectionError("gateway went away")
+
+    monkeypatch.setattr(pool.provider, "get_account", unavailable)
+    with pytest.raises(RuntimeError, match="Error topping up senders: gateway went away"):
+        pool.top_up(Wallet().signer, min_balance=1, amount=1)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+from multiversx_sdk import UserPEM, UserSecretKey, UserSigner
+
+from signer_agent import AgentSigner, SignerAgent
+
+
+@pytest.fixture
+def pems(tmp_path):
+    paths = []
+    for index in range(2):
+        path = tmp_path / f"key{index}.pem"
+        secret_key = UserSecretKey.generate()
+        UserPEM(secret_key.generate_public_key().to_address("erd").to_bech32(), secret_key).save(path)
+        paths.append(path)
+    return paths
+
+
+def serve(agent, socket_path):
+    thread = threading.Thread(target=agent.serve, args=(str(socket_path),), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if socket_path.exists():
+            return thread
+        time.sleep(0.01)
+    raise TimeoutError("signer agent did not start")
+
+
+@pytest.fixture
+def agent_socket(tmp_path_factory, pems):
+    # Unix socket paths are limited to about 100 characters
+    socket_path = tmp_path_factory.mktemp("agent", numbered=True) / "s.sock"
+    agent = SignerAgent()
+    addresses = [agent.add_pem(path) for path in pems]
+    serve(agent, socket_path)
+    return socket_path, addresses
+
+
+def test_signatures_match_the_local_signer(agent_socket, pems):
+    socket_path, addresses = agent_socket
+    data = b"transaction bytes"
+    for path, address in zip(pems, addresses):
+        signer = AgentSigner(str(socket_path), address)
+        try:
+            assert signer.sign(data) == UserSigner.from_pem_file(path).sign(data)
+            assert signer.get_pubkey().to_address("erd").to_bech32() == address
+        finally:
+            signer.close()
+
+
+def test_keys_and_errors(agent_socket):
+    socket_path, addresses = agent_socket
+    signer = AgentSigner(str(socket_path))
+    try:
+        assert sorted(signer.keys()) == sorted(addresses)
+        with pytest.raises(RuntimeError, match="An address is required"):
+            signer.sign(b"data")
+
+        other = UserSecretKey.generate().generate_public_key().to_address("erd").to_bech32()
+        signer.address = other
+        with pytest.raises(RuntimeError, match=f"No key loaded for {other}"):
+            signer.sign(b"data")
+        # The connection stays usable after an error answer
+        signer.address = addresses[0]
+        assert len(signer.sign(b"data")) == 64
+    finally:
+        signer.close()
+
+
+def test_missing_agent_is_reported(tmp_path):
+    signer = AgentSigner(str(tmp_path / "missing.sock"))
+    with pytest.raises(RuntimeError, match="Error talking to signer agent"):
+        signer.keys()
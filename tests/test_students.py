@@ -0,0 +1,15 @@
+from students import fetch_students_addresses
+
+
+def test_students_cards_from_either_view_agree(client):
+    one_by_one = client.query_students_cards()
+    assert len(one_by_one) == 8
+    assert client.query_students_cards(use_cards_properties=True) == one_by_one
+
+
+def test_cards_follow_the_given_addresses(client, model):
+    addresses = fetch_students_addresses(client.get_query_controller(), model.contract_address, client.get_codec())
+    picked = addresses[::-3]
+    cards = client.query_students_cards(addresses=picked, max_workers=2)
+    assert list(cards) == picked
+    assert cards == {address: client.query_students_cards()[address] for address in picked}
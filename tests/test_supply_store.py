@@ -0,0 +1,110 @@
+import pytest
+
+from supply_store import SupplyStore
+
+
+class CountingController:
+    # Counts the queries a store sends through the real (cached) controller
+    def __init__(self, query_controller):
+        self.query_controller = query_controller
+        self.functions = []
+
+    def create_query(self, **kwargs):
+        return self.query_controller.create_query(**kwargs)
+
+    def run_query(self, query):
+        self.functions.append(query.function)
+        return self.query_controller.run_query(query)
+
+    def invalidate(self):
+        self.query_controller.invalidate()
+        self.functions.clear()
+
+
+@pytest.fixture
+def store(client, model, tmp_path):
+    controller = CountingController(client.get_query_controller())
+    store = SupplyStore(controller, model.contract_address, str(tmp_path / "store.sqlite3"), codec=client.get_codec())
+    yield store
+    store.close()
+
+
+def held(store):
+    return sorted(entry["nonce"] for entry in store.available_nfts())
+
+
+def test_cold_and_warm_sync(store, model):
+    # The contract gave its first NFTs away before the first sync
+    for token_nonce in range(1, 8):
+        del model.supply[token_nonce]
+    assert store.sync() == len(model.supply)
+    assert held(store) == sorted(model.supply)
+    assert store.high_water_mark == max(model.supply)
+
+    store.query_controller.invalidate()
+    assert store.sync() == 0
+    assert store.query_controller.functions == ["nftSupply"]
+
+
+def test_sync_follows_exchanges_mints_and_changes(store, model):
+    store.sync()
+    del model.supply[12]
+    minted = [model._mint_to_contract((1, 1, 1)), model._mint_to_contract((2, 2, 2))]
+    changed = model.supply[20]
+    model.supply[20] = model._token_data(b"changed", changed.attributes, changed.creator)
+    store.query_controller.invalidate()
+
+    assert store.sync() == 3
+    assert held(store) == sorted(model.supply)
+    assert set(minted) <= set(held(store))
+    # Only the changed nonce and the new ones are fetched one by one
+    assert store.query_controller.functions.count("getTokenData") < 10
+
+
+def test_unchanged_root_hash_skips_the_supply_download(client, model, tmp_path):
+    controller = CountingController(client.get_query_controller())
+    store = SupplyStore(controller, model.contract_address, str(tmp_path / "store.sqlite3"), codec=client.get_codec(),
+                        root_hash_fn=client._contract_root_hash)
+    try:
+        store.sync()
+        controller.invalidate()
+        assert store.sync() == 0
+        assert controller.functions == []
+
+        model._mint_to_contract((1, 2, 2))
+        assert store.sync() == 1
+        assert controller.functions[0] == "nftSupply"
+
+        # A local exchange is checked against the chain on the next sync
+        controller.invalidate()
+        store.mark_exchanged(min(model.supply))
+        store.sync()
+        assert controller.functions == ["nftSupply", "getTokenData"]
+        assert held(store) == sorted(model.supply)
+    finally:
+        store.close()
+
+
+def test_unplaced_entries_are_not_scanned_for_again(store, model, monkeypatch):
+    store.max_empty_nonces = 5
+    store.sync()
+    lost = model._mint_to_contract((1, 2, 2))
+    fetch_part = store._fetch_part
+    # getTokenData never returns this one
+    monkeypatch.setattr(store, "_fetch_part", lambda nonce: None if nonce == lost else fetch_part(nonce))
+
+    store.query_controller.invalidate()
+    assert store.sync() == 0
+    # Five empty nonces in a row, the lost one included
+    assert store.query_controller.functions.count("getTokenData") == 4
+
+    store.query_controller.invalidate()
+    assert store.sync() == 0
+    assert store.query_controller.functions == ["nftSupply"]
+
+    # A new mint is still found, right past the lost one
+    minted = model._mint_to_contract((2, 1, 1))
+    store.query_controller.invalidate()
+    assert store.sync() == 1
+    assert store.query_controller.functions.count("getTokenData") == 1
+    assert minted in held(store) and lost not in held(store)
@@ -0,0 +1,59 @@
+import types
+from pathlib import Path
+
+import pytest
+
+from abi_codegen import DEFAULT_ABI_PATH, load_codec
+from nft_attributes import encode_raw_attributes
+
+
+@pytest.fixture(scope="module")
+def codec():
+    return load_codec(Path(__file__).resolve().parent.parent / DEFAULT_ABI_PATH)
+
+
+def supply_parts(codec, count):
+    return [
+        codec.top_encode_EsdtTokenData(codec.EsdtTokenData(
+            token_type=1, amount=1, frozen=False, hash=bytes([index]) * 32, name=f"card{index}".encode(),
+            attributes=encode_raw_attributes(index % 4, 1, 2), creator=bytes(32),
+            royalties=250, uris=[b"https://example.com/card.png"],
+        ))
+        for index in range(count)
+    ]
+
+
+def test_records_share_creators_and_uris(codec):
+    parts = supply_parts(codec, 4)
+    records = codec.decode_nftSupply_output(parts)
+    assert all(record.creator is records[0].creator for record in records)
+    assert all(record.uris[0] is records[0].uris[0] for record in records)
+    assert records == [codec.top_decode_EsdtTokenData(part) for part in parts]
+    # A shared interner spans several responses
+    intern = codec.Interner()
+    first = next(codec.iter_nftSupply_output(parts[:1], intern))
+    second = next(codec.iter_nftSupply_output(parts[1:], intern))
+    assert first.creator is second.creator
+
+
+def test_streamed_supply_matches_the_list(client):
+    streamed = client.query_available_nfts(stream=True)
+    assert isinstance(streamed, types.GeneratorType)
+    assert list(streamed) == client.query_available_nfts()
+
+
+def test_matching_stops_decoding_at_the_first_match(client, monkeypatch):
+    decoded = []
+    decode_attributes = client.decode_attributes
+
+    def counting(attributes):
+        decoded.append(attributes)
+        return decode_attributes(attributes)
+
+    monkeypatch.setattr(client, "decode_attributes", counting)
+    supply = client.query_available_nfts()
+    first = supply[0]
+    decoded.clear()
+    target = {"class": first["class"], "rarity": first["rarity"]}
+    assert client.find_matching_nft(client.query_available_nfts(stream=True), target) == first
+    assert len(decoded) == 1 < len(supply)
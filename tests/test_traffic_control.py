@@ -0,0 +1,204 @@
+import asyncio
+
+import pytest
+import requests
+from multiversx_sdk.network_providers.errors import GenericError
+
+from traffic_control import (
+    QUERY,
+    SEND,
+    ControlledProvider,
+    GatewayHTTPError,
+    RetryBudget,
+    StatusAwareProvider,
+    TokenBucket,
+    TrafficController,
+    classify_error,
+    current_retry_budget,
+    is_not_found,
+    parse_retry_after,
+)
+
+
+def http_error(status, retry_after=None, data="error"):
+    return GatewayHTTPError("http://gateway/test", data, status, retry_after)
+
+
+@pytest.mark.parametrize("error, kind", [
+    (http_error(429), "throttled"),
+    (http_error(503, retry_after=2), "throttled"),
+    (http_error(503), "unavailable"),
+    (http_error(500), "unavailable"),
+    (http_error(408), "timeout"),
+    (http_error(504), "timeout"),
+    (http_error(400), None),
+    (http_error(404), None),
+    (GenericError("url", requests.ReadTimeout()), "timeout"),
+    (GenericError("url", requests.ConnectionError()), "unavailable"),
+    # An error body in an HTTP 200 answer is the request's fault
+    (GenericError("url", "code: internal_issue, error: bad nonce"), None),
+    (ValueError("not a gateway error"), None),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_is_not_found():
+    assert is_not_found(http_error(404))
+    assert is_not_found(GenericError("url", {"error": "transaction not found", "code": "bad_request"}))
+    assert is_not_found(GenericError("url", "code: bad_request, error: transaction not found"))
+    assert not is_not_found(GenericError("url", requests.ConnectionError("refused")))
+    assert not is_not_found(http_error(500))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+class Flaky:
+    # Raises the given errors in turn, then returns "ok"
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def controller(**kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    return TrafficController(**kwargs)
+
+
+def test_queries_are_retried_on_gateway_errors():
+    function = Flaky(http_error(500), GenericError("url", requests.ReadTimeout()))
+    assert controller().call(QUERY, "get_account", function) == "ok"
+    assert function.calls == 3
+
+
+def test_sends_are_retried_only_when_throttled():
+    function = Flaky(http_error(429, retry_after=0.01))
+    assert controller().call(SEND, "send_transaction", function) == "ok"
+    assert function.calls == 2
+
+    # A proxy may answer a bare 503 after forwarding the transaction
+    function = Flaky(http_error(503))
+    with pytest.raises(GatewayHTTPError):
+        controller().call(SEND, "send_transaction", function)
+    assert function.calls == 1
+
+
+def test_request_errors_are_not_retried():
+    function = Flaky(http_error(400))
+    with pytest.raises(GatewayHTTPError):
+        controller().call(QUERY, "run_query", function)
+    assert function.calls == 1
+
+
+def test_retries_stop_at_the_budget():
+    function = Flaky(*[http_error(500)] * 10)
+    with pytest.raises(GatewayHTTPError):
+        controller(max_retries=2).call(QUERY, "get_account", function)
+    assert function.calls == 3
+
+
+def test_nested_calls_share_one_budget():
+    traffic = controller(max_retries=3)
+    inner = Flaky(*[http_error(500)] * 10)
+    budgets = []
+
+    def outer():
+        budgets.append(current_retry_budget())
+        return traffic.call(QUERY, "inner", inner)
+
+    with pytest.raises(GatewayHTTPError):
+        traffic.call(QUERY, "outer", outer)
+    # 4 attempts in total, not 4 inner attempts for each of 4 outer ones
+    assert inner.calls == 4
+    assert len({id(budget) for budget in budgets}) == 1
+    assert current_retry_budget() is None
+
+
+def test_retry_budget():
+    budget = RetryBudget(2)
+    assert budget.spend() and budget.spend()
+    assert not budget.spend()
+
+
+def test_retry_after_pauses_the_bucket():
+    bucket = TokenBucket(rate=1000, burst=10)
+    assert bucket.try_acquire() == 0
+    bucket.pause(0.5)
+    assert bucket.try_acquire() > 0.4
+
+
+def test_throttling_halves_the_concurrency_limit():
+    traffic = controller(initial_concurrency=8)
+    traffic.call(SEND, "send_transaction", Flaky(http_error(429)))
+    assert traffic.stats()[SEND]["limit"] < 8
+
+
+def test_interrupted_calls_give_their_slot_back():
+    traffic = controller(initial_concurrency=1)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        traffic.call(QUERY, "get_account", interrupted)
+    assert traffic.stats()[QUERY]["in_flight"] == 0
+
+    async def cancelled():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(traffic.call_async(QUERY, "get_account", slow))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled())
+    assert traffic.stats()[QUERY]["in_flight"] == 0
+    # The only slot is free again
+    assert traffic.call(QUERY, "get_account", Flaky()) == "ok"
+
+
+def test_controlled_provider_keeps_coroutines():
+    class AsyncProvider:
+        def __init__(self):
+            self.calls = 0
+
+        async def send_transaction(self, transaction):
+            self.calls += 1
+            if self.calls == 1:
+                raise http_error(429, retry_after=0.01)
+            return "hash"
+
+    provider = AsyncProvider()
+    controlled = ControlledProvider(provider, controller())
+    assert asyncio.run(controlled.send_transaction(object())) == "hash"
+    assert provider.calls == 2
+
+
+def test_status_aware_provider_against_the_mock(gateway):
+    from mock_gateway import MockGateway
+
+    with pytest.raises(GatewayHTTPError) as raised:
+        StatusAwareProvider(gateway.url).get_transaction("ab" * 32)
+    assert is_not_found(raised.value)
+
+    with MockGateway(gateway.model, error_rate=1.0, throttle_share=1.0, seed=1) as throttling:
+        with pytest.raises(GatewayHTTPError) as raised:
+            StatusAwareProvider(throttling.url).get_network_status(0)
+    assert raised.value.status == 429
+    assert raised.value.retry_after == 1.0
+    assert classify_error(raised.value) == "throttled"
@@ -0,0 +1,172 @@
+import pytest
+
+from conftest import TICKER, sent_transactions
+from mock_gateway import MockGateway
+from traffic_control import TrafficController
+from tx_journal import TransactionJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "journal.jsonl"
+
+
+def test_records_are_replayed_with_their_latest_state(path, client):
+    transaction = client.build_nft_create_transaction(client.build_nft_create_data("card", TICKER, 1, 2, 0, "uri"), 7)
+    with TransactionJournal(path) as journal:
+        journal.record("mint:a", "signed", transaction=transaction, sender="erd1a", nonce=7, hash="aa")
+        journal.record("mint:a", "submitted")
+        journal.record("mint:b", "built", sender="erd1a")
+
+    journal = TransactionJournal(path)
+    assert len(journal) == 2
+    assert journal.get("mint:a")["state"] == "submitted"
+    assert journal.by_hash("aa")["key"] == "mint:a"
+    assert journal.by_nonce("erd1a", 7)["key"] == "mint:a"
+    assert journal.transaction(journal.get("mint:a")).data == transaction.data
+    assert journal.get("missing") is None
+    journal.close()
+
+
+def test_unknown_state_is_rejected(path):
+    with TransactionJournal(path) as journal, pytest.raises(ValueError):
+        journal.record("mint:a", "sent")
+
+
+def test_torn_last_line_is_cut_off(path):
+    with TransactionJournal(path) as journal:
+        journal.record("mint:a", "submitted", hash="aa")
+    size = path.stat().st_size
+    with open(path, "a") as journal_file:
+        journal_file.write('{"key":"mint:b","sta')
+
+    with TransactionJournal(path) as journal:
+        assert len(journal) == 1
+        journal.record("mint:c", "submitted", hash="cc")
+    assert path.stat().st_size > size
+    with TransactionJournal(path) as journal:
+        assert journal.get("mint:c")["state"] == "submitted"
+
+
+def test_next_nonce_counts_only_spent_nonces(path):
+    with TransactionJournal(path) as journal:
+        assert journal.next_nonce("erd1a") is None
+        journal.record("mint:a", "confirmed", sender="erd1a", nonce=4)
+        journal.record("mint:b", "signed", sender="erd1a", nonce=5)
+        journal.record("mint:c", "failed", sender="erd1a", nonce=9)
+        journal.record("mint:d", "submitted", sender="erd1b", nonce=20)
+        assert journal.next_nonce("erd1a") == 6
+
+
+def test_compact_keeps_one_line_per_key(path):
+    with TransactionJournal(path) as journal:
+        for state in ("built", "signed", "submitted", "confirmed"):
+            journal.record("mint:a", state, sender="erd1a", nonce=1)
+        journal.record("mint:b", "failed", error="rejected")
+        journal.compact()
+        journal.record("mint:c", "built")
+    assert len(path.read_text().splitlines()) == 3
+    with TransactionJournal(path) as journal:
+        assert journal.get("mint:a")["state"] == "confirmed"
+        assert journal.get("mint:b")["error"] == "rejected"
+
+
+def test_interrupted_mint_resumes_without_sending_twice(client, gateway, model, wallet, path):
+    records = [(f"card{index}", 1, 2, 0, "https://example.com/card.png") for index in range(12)]
+    journal = TransactionJournal(path)
+    first = client.create_nft_many(records[:8], TICKER, journal=journal, flush_interval=0.02)
+    assert all(result["tx_hash"] for result in first)
+    journal.close()
+
+    # A crash left a torn line and record 8 signed but never sent
+    with open(path, "a") as journal_file:
+        journal_file.write('{"key":"torn')
+    journal = TransactionJournal(path)
+    name, nft_class, rarity, power, uri = records[8]
+    data = client.build_nft_create_data(name, TICKER, nft_class, rarity, power, uri)
+    transaction = client.build_nft_create_transaction(data, client.get_wallet_nonce())
+    transaction.signature = wallet.signer.sign(client.transaction_computer.compute_bytes_for_signing(transaction))
+    signed_hash = client.transaction_computer.compute_transaction_hash(transaction).hex()
+    journal.record(f"mint:{TICKER}:8:card8", "signed", transaction=transaction, sender=wallet.address,
+                   nonce=transaction.nonce, hash=signed_hash)
+
+    # A restarted process has a fresh nonce manager
+    client.configure(gateway.url, wallet.address, model.contract_address, wallet.signer)
+    second = client.create_nft_many(records, TICKER, journal=journal, flush_interval=0.02)
+    assert [result["tx_hash"] for result in second[:8]] == [result["tx_hash"] for result in first]
+    assert second[8]["tx_hash"] == signed_hash
+    assert all(result["tx_hash"] and not result["error"] for result in second)
+
+    tracker = client.get_tracker()
+    tracker.track_many([result["tx_hash"] for result in second], "ESDTNFTCreate")
+    results = tracker.run()
+    assert all(result.ok for result in results)
+    for result in results:
+        journal.record_result(result)
+    assert {entry["state"] for entry in journal.entries()} == {"confirmed"}
+    # Every mint landed exactly once
+    assert len({result.values for result in results}) == len(records)
+    journal.close()
+
+
+def test_exchange_is_journaled_and_sent_once(client, model, exchange, journal, wallet):
+    wanted, payment_token = exchange
+    before = sent_transactions(model)
+    tx_hash = client.create_and_trade_nft(wanted, payment_token=payment_token)
+    assert client.create_and_trade_nft(wanted, payment_token=payment_token) == tx_hash
+    assert sent_transactions(model) == before + 1
+    assert journal.get(f"exchange:{wallet.address}:{wanted}")["state"] == "submitted"
+
+    assert client._wait_for(tx_hash, "exchangeNft").ok
+    assert journal.get(f"exchange:{wallet.address}:{wanted}")["state"] == "confirmed"
+    assert wanted not in model.supply
+
+
+def test_exchange_signed_before_a_crash_is_not_sent_again(client, model, exchange, journal):
+    wanted, payment_token = exchange
+    key = client._exchange_key(wanted, None)
+    transaction = client._sign_exchange(journal, key, wanted, client.get_wallet_nonce(), payment_token, None)
+    client.get_provider().send_transaction(transaction)
+    before = sent_transactions(model)
+
+    tx_hash = client.create_and_trade_nft(wanted, payment_token=payment_token)
+    assert tx_hash == journal.get(key)["hash"]
+    assert journal.get(key)["state"] == "submitted"
+    assert sent_transactions(model) == before
+
+
+def test_single_mint_is_journaled_until_confirmed(client, journal, wallet, capsys):
+    client.main(["mint", "card", TICKER, "1", "2", "0", "https://example.com/card.png", "--wait"])
+    entry = journal.get(f"mint:{TICKER}:{wallet.address}:0:card")
+    assert len(journal) == 1
+    assert entry["state"] == "confirmed"
+    assert entry["function"] == "ESDTNFTCreate"
+    assert f"NFT nonce: {entry['values']}" in capsys.readouterr().out
+
+
+def test_single_mint_skips_nonces_signed_before_a_crash(client, model, journal, wallet):
+    # A previous run signed nonce 0 and stopped before sending it
+    transaction = client.build_nft_create_transaction(client.build_nft_create_data("lost", TICKER, 1, 2, 0, "uri"), 0)
+    journal.record("mint:lost", "signed", transaction=transaction, sender=wallet.address, nonce=0, hash="aa")
+    tx_hash = client.create_nft("card", TICKER, 1, 2, 0, "uri")
+    assert journal.by_hash(tx_hash)["nonce"] == 1
+
+
+def test_on_network(client, exchange):
+    wanted, payment_token = exchange
+    tx_hash = client.create_and_trade_nft(wanted, payment_token=payment_token)
+    assert client._on_network(tx_hash)
+    assert not client._on_network("ab" * 32)
+
+
+def test_on_network_raises_when_the_gateway_cannot_answer(client, model, wallet, monkeypatch):
+    # Only "not found" means the transaction is unknown; anything else must not be guessed
+    monkeypatch.setattr(client, "get_traffic_controller", lambda: TrafficController(max_retries=1, backoff=0.001))
+    with MockGateway(model, error_rate=1.0, throttle_share=0.0) as broken:
+        client.configure(broken.url, wallet.address, model.contract_address, wallet.signer)
+        with pytest.raises(RuntimeError, match="Error checking transaction"):
+            client._on_network("ab" * 32)
+
+    client.configure("http://127.0.0.1:1")
+    with pytest.raises(RuntimeError, match="Error checking transaction"):
+        client._on_network("ab" * 32)
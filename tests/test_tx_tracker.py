@@ -0,0 +1,90 @@
+import pytest
+
+from conftest import TICKER, mint
+from tx_tracker import FAILED, SUCCESS, TIMEOUT, TransactionTracker
+
+
+def send_mints(client, count):
+    results = client.create_nft_many(
+        [(f"card{index}", 1, 2, 0, "https://example.com/card.png") for index in range(count)],
+        TICKER,
+        flush_interval=0.02,
+    )
+    return [result["tx_hash"] for result in results]
+
+
+@pytest.mark.parametrize("use_hyperblocks", [True, False], ids=["hyperblocks", "per-hash"])
+def test_mints_resolve_with_their_token_nonces(client, use_hyperblocks):
+    tx_hashes = send_mints(client, 5)
+    resolved = []
+    with TransactionTracker(client.get_provider(), client.get_codec(), use_hyperblocks=use_hyperblocks) as tracker:
+        tracker.track_many(tx_hashes, "ESDTNFTCreate", callback=resolved.append)
+        results = tracker.run()
+        assert len(tracker) == 0
+    assert {result.tx_hash for result in results} == set(tx_hashes)
+    assert {result.status for result in results} == {SUCCESS}
+    # One new token nonce per mint
+    assert len({result.values for result in results}) == 5
+    assert len(resolved) == 5
+
+
+def test_failed_exchange_reports_the_contract_error(client, model):
+    token_nonce = mint(client, 1)[0]
+    # The minted card is class 1, rarity 2; this one is not
+    wanted = model._mint_to_contract((3, 1, 0))
+    tx_hash = client.create_and_trade_nft(wanted, payment_token=f"{TICKER}-{token_nonce:02x}")
+    tracker = client.get_tracker()
+    tracker.track(tx_hash, "exchangeNft")
+    result = tracker.wait(tx_hash)
+    assert result.status == FAILED
+    assert "do not match" in result.error
+
+
+def test_unknown_hash_times_out(client):
+    with TransactionTracker(client.get_provider(), timeout=0.2, use_hyperblocks=False) as tracker:
+        tracker.track("ab" * 32)
+        (result,) = tracker.run()
+    assert result.status == TIMEOUT
+
+
+def test_decode_error_is_raised_and_not_left_pending(client):
+    class BrokenCodec:
+        def decode_ESDTNFTCreate_output(self, parts):
+            raise ValueError("boom")
+
+    (tx_hash,) = send_mints(client, 1)
+    with TransactionTracker(client.get_provider(), BrokenCodec()) as tracker:
+        tracker.track(tx_hash, "ESDTNFTCreate")
+        with pytest.raises(RuntimeError, match="boom"):
+            tracker.wait(tx_hash)
+        assert len(tracker) == 0
+        assert tracker._results == {}
+
+
+def test_decode_error_stays_with_its_own_hash(client):
+    class PartlyBrokenCodec:
+        # Mints tracked as "broken" fail to decode; the others read their token nonce
+        def decode_broken_output(self, parts):
+            raise ValueError("boom")
+
+    broken, waited, other = send_mints(client, 3)
+    with TransactionTracker(client.get_provider(), PartlyBrokenCodec()) as tracker:
+        resolved = []
+        tracker.track(broken, "broken")
+        tracker.track_many([waited, other], "ESDTNFTCreate", callback=resolved.append)
+        # The broken hash resolves in the same rounds without failing this wait
+        assert tracker.wait(waited).ok
+        tracker.run()
+        assert len(tracker) == 0
+    assert sorted(result.tx_hash for result in resolved) == sorted([waited, other])
+
+
+def test_only_waited_hashes_keep_their_outcome(client):
+    tx_hashes = send_mints(client, 3)
+    with TransactionTracker(client.get_provider(), client.get_codec()) as tracker:
+        tracker.track_many(tx_hashes, "ESDTNFTCreate")
+        assert tracker.wait(tx_hashes[0]).ok
+        tracker.run()
+        assert tracker._results == {}
+        with pytest.raises(KeyError):
+            tracker.wait(tx_hashes[0])
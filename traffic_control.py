@@ -0,0 +1,416 @@
+import asyncio
+import contextvars
+import inspect
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from multiversx_sdk import ProxyNetworkProvider
+from multiversx_sdk.network_providers.errors import GenericError
+
+import instrumentation
+
+# Keeps gateway traffic at the highest rate the gateway tolerates.
+#
+# Calls are split into two classes, "query" and "send", and each class has
+# its own token bucket (a steady request rate with some burst) and its own
+# AIMD concurrency limit: every success raises the limit by about one per
+# window of calls, every 429 or timeout halves it (at most once per
+# decrease_interval, so one burst of failures counts once). A Retry-After
+# from the gateway pauses the whole class for that long. Failed calls are
+# retried with full-jitter exponential backoff when that is safe: reads on
+# any gateway-side failure, sends only when they were throttled (a 429, or a
+# 503 that says when to come back), since such a request was never
+# processed. A bare 503 may come from a proxy that already forwarded the
+# send, so it is not retried.
+#
+# The retries of one call are counted once across layers: the controller
+# opens a RetryBudget for the call and the layers below it (e.g. the
+# failover of multi_gateway) spend from the same budget, so a call is tried
+# at most max_retries + 1 times in total, not once per gateway per retry.
+
+QUERY = "query"
+SEND = "send"
+
+SEND_METHODS = {"send_transaction", "send_transactions"}
+
+
+class GatewayHTTPError(GenericError):
+    # GenericError that keeps the HTTP status and the Retry-After delay
+    def __init__(self, url, data, status, retry_after=None):
+        super().__init__(url, data)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    # Seconds to wait from a Retry-After header (delay in seconds or an HTTP date)
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class StatusAwareProvider(ProxyNetworkProvider):
+    """
+    ProxyNetworkProvider whose HTTP errors are GatewayHTTPError, so callers can
+    tell throttling (429 + Retry-After) from other failures.
+    """
+
+    def _request(self, method, url, payload=None):
+        try:
+            response = requests.request(method, url, json=payload, auth=self.auth, **self.config.requests_options)
+            response.raise_for_status()
+            return self.get_data(response.json(), url)
+        except requests.HTTPError as err:
+            raise GatewayHTTPError(
+                url,
+                self._extract_error_from_response(err.response),
+                err.response.status_code,
+                parse_retry_after(err.response.headers.get("Retry-After")),
+            )
+        except GenericError:
+            raise
+        except Exception as err:
+            raise GenericError(url, err)
+
+    def do_get(self, url):
+        return self._request("GET", url)
+
+    def do_post(self, url, payload):
+        return self._request("POST", url, payload)
+
+
+def classify_error(error):
+    """
+    Returns:
+    str | None: "throttled", "timeout" or "unavailable" for gateway-side
+    failures, None for errors caused by the request itself. Only a 429, or a
+    503 with a Retry-After, is "throttled": the gateway turned the request
+    away unprocessed.
+    """
+    status = getattr(error, "status", None)
+    if status == 429 or (status == 503 and getattr(error, "retry_after", None) is not None):
+        return "throttled"
+    if status in (408, 504):
+        return "timeout"
+    if status is not None:
+        return "unavailable" if status >= 500 else None
+    cause = error.data if isinstance(error, GenericError) else error
+    if isinstance(cause, (requests.Timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(cause, (requests.ConnectionError, ConnectionError)):
+        return "unavailable"
+    return None
+
+
+def is_not_found(error):
+    # The gateway answered that it does not know the requested item (e.g. a transaction hash)
+    if getattr(error, "status", None) == 404:
+        return True
+    data = error.data if isinstance(error, GenericError) else None
+    message = data.get("error", "") if isinstance(data, dict) else str(data or "")
+    return "not found" in message.lower()
+
+
+class RetryBudget:
+    # Retries left for one logical call, shared by every layer that retries it
+    __slots__ = ("remaining",)
+
+    def __init__(self, retries):
+        self.remaining = retries
+
+    def spend(self):
+        # Take one retry; False once the budget is used up
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+_retry_budget = contextvars.ContextVar("retry_budget", default=None)
+
+
+def current_retry_budget():
+    """
+    Returns:
+    RetryBudget | None: Budget of the controlled call running in this context,
+    None outside of one (callers then retry on their own terms).
+    """
+    return _retry_budget.get()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        """
+        Parameters:
+        rate (float): Tokens added per second.
+        burst (int): Bucket size, the most calls that can start back to back.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        # Take a token if one is there; otherwise the seconds until one might be
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = self._paused_until - now
+            if delay <= 0:
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return 0.0
+                delay = (1 - self._tokens) / self.rate
+            return delay
+
+    def acquire(self):
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds):
+        # Retry-After: no call of this class starts before the delay is over
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AimdLimiter:
+    def __init__(self, initial=8, minimum=1, maximum=64, decrease=0.5, decrease_interval=1.0):
+        """
+        Parameters:
+        initial (int): Concurrent calls allowed at first.
+        minimum (int), maximum (int): Bounds of the limit.
+        decrease (float): Factor applied to the limit on congestion.
+        decrease_interval (float): Seconds between two decreases at most.
+        """
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.decrease_interval = decrease_interval
+        self.in_flight = 0
+        self._decreased_at = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def try_acquire(self):
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self, poll_interval=0.005):
+        # Threads waiting in acquire() are woken by release(); coroutines poll
+        while not self.try_acquire():
+            await asyncio.sleep(poll_interval)
+
+    def release(self, congested=False):
+        with self._condition:
+            self.in_flight -= 1
+            if congested:
+                now = time.monotonic()
+                if now - self._decreased_at >= self.decrease_interval:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._decreased_at = now
+            else:
+                # Additive increase: about +1 for every `limit` successful calls
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class TrafficController:
+    def __init__(self, query_rate=100, query_burst=200, send_rate=50, send_burst=100, initial_concurrency=8,
+                 max_concurrency=64, max_retries=4, backoff=0.25, max_backoff=10.0):
+        """
+        Parameters:
+        query_rate (float), query_burst (int): Token bucket of reads.
+        send_rate (float), send_burst (int): Token bucket of transaction sends.
+        initial_concurrency (int), max_concurrency (int): AIMD concurrency limit of each class.
+        max_retries (int): Retries of a call after its first failure, counting
+            the retries of the layers below the controller as well.
+        backoff (float): Base of the exponential backoff, in seconds.
+        max_backoff (float): Upper bound of one backoff delay.
+        """
+        self.buckets = {QUERY: TokenBucket(query_rate, query_burst), SEND: TokenBucket(send_rate, send_burst)}
+        self.limiters = {
+            QUERY: AimdLimiter(initial_concurrency, maximum=max_concurrency),
+            SEND: AimdLimiter(initial_concurrency, maximum=max_concurrency),
+        }
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def call(self, traffic_class, method, function, *args, **kwargs):
+        """
+        Run function(*args, **kwargs) under the limits of traffic_class, retrying it when safe.
+
+        Parameters:
+        traffic_class (str): QUERY or SEND.
+        method (str): Name used in metrics.
+        """
+        budget = _retry_budget.get()
+        if budget is not None:
+            # Nested call: the outer controller already counts the retries
+            return self._call(traffic_class, method, budget, function, args, kwargs)
+        token = _retry_budget.set(RetryBudget(self.max_retries))
+        try:
+            return self._call(traffic_class, method, _retry_budget.get(), function, args, kwargs)
+        finally:
+            _retry_budget.reset(token)
+
+    async def call_async(self, traffic_class, method, function, *args, **kwargs):
+        """
+        call() for a coroutine function, sharing the same buckets, limits and
+        retry rules; waits are awaited instead of blocking the event loop.
+        """
+        budget = _retry_budget.get()
+        token = None
+        if budget is None:
+            # Each task runs in its own copy of the context, so this budget is the task's
+            budget = RetryBudget(self.max_retries)
+            token = _retry_budget.set(budget)
+        try:
+            bucket = self.buckets[traffic_class]
+            limiter = self.limiters[traffic_class]
+            attempt = 0
+            while True:
+                await bucket.acquire_async()
+                await limiter.acquire_async()
+                try:
+                    result = await function(*args, **kwargs)
+                except Exception as e:
+                    delay = self._failed(traffic_class, method, budget, attempt, e)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                except BaseException:
+                    # Cancelled or interrupted: free the slot without counting a failure
+                    limiter.release()
+                    raise
+                limiter.release()
+                return result
+        finally:
+            if token is not None:
+                _retry_budget.reset(token)
+
+    def _call(self, traffic_class, method, budget, function, args, kwargs):
+        bucket = self.buckets[traffic_class]
+        limiter = self.limiters[traffic_class]
+        attempt = 0
+        while True:
+            bucket.acquire()
+            limiter.acquire()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                delay = self._failed(traffic_class, method, budget, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                limiter.release()
+                raise
+            limiter.release()
+            return result
+
+    def _failed(self, traffic_class, method, budget, attempt, error):
+        # Account for a failed attempt; the backoff before the next one, or None to give up
+        kind = classify_error(error)
+        limiter = self.limiters[traffic_class]
+        limiter.release(congested=kind in ("throttled", "timeout"))
+        if kind == "throttled":
+            instrumentation.increment("gateway_throttled", method=method)
+            if getattr(error, "retry_after", None):
+                self.buckets[traffic_class].pause(error.retry_after)
+        retryable = kind == "throttled" or (kind is not None and traffic_class == QUERY)
+        if not retryable or not budget.spend():
+            return None
+        # Full jitter spreads the retries of many threads apart
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        instrumentation.increment("gateway_retries", method=method, reason=kind)
+        instrumentation.debug("Retrying %s in %.2fs after %s: %s", method, delay, kind, error)
+        return delay
+
+    def stats(self):
+        return {
+            traffic_class: {"limit": limiter.limit, "in_flight": limiter.in_flight}
+            for traffic_class, limiter in self.limiters.items()
+        }
+
+
+def resource_url_of(args, kwargs):
+    # URL of a do_post()/do_post_generic() call, passed by position or by keyword
+    if args:
+        return str(args[0])
+    return str(kwargs.get("url", kwargs.get("resource_url", "")))
+
+
+def is_send_post(name, args, kwargs):
+    return name in ("do_post", "do_post_generic") and resource_url_of(args, kwargs).startswith("transaction/send")
+
+
+def traffic_class_of(name, args, kwargs=None):
+    if name in SEND_METHODS or is_send_post(name, args, kwargs or {}):
+        return SEND
+    return QUERY
+
+
+class ControlledProvider:
+    """
+    Wraps a network provider so every call goes through a TrafficController.
+    Coroutine methods (async_provider.AsyncProxyNetworkProvider) stay
+    coroutines and go through TrafficController.call_async().
+    """
+
+    def __init__(self, provider, controller=None):
+        self.provider = provider
+        self.controller = controller or TrafficController()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.provider, name)
+        if not callable(attribute):
+            return attribute
+
+        if inspect.iscoroutinefunction(attribute):
+            async def call_async(*args, **kwargs):
+                return await self.controller.call_async(traffic_class_of(name, args, kwargs), name, attribute, *args, **kwargs)
+
+            return call_async
+
+        def call(*args, **kwargs):
+            return self.controller.call(traffic_class_of(name, args, kwargs), name, attribute, *args, **kwargs)
+
+        return call
@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from multiversx_sdk import TransactionsConverter
+
+DEFAULT_JOURNAL_PATH = "output/tx_journal.jsonl"
+
+# Lifecycle of a journaled transaction; later states win when the journal is replayed
+STATES = ("built", "signed", "submitted", "confirmed", "failed")
+
+# States whose nonce is spent (or about to be) on the network
+NONCE_STATES = ("signed", "submitted", "confirmed")
+
+# Append-only record of every transaction a run sends.
+#
+# Each line is a small JSON object: an idempotency key chosen by the caller
+# (e.g. "mint:TICKER:17:name"), the new state and the fields known so far
+# (sender, nonce, hash, the signed transaction, error, values). Lines are
+# written as they happen and fsync'ed in batches: every sync_every records,
+# every sync_interval seconds, and whenever the caller calls sync(), which
+# the pipelines do right before transactions leave the process. On startup
+# the file is replayed into in-memory indexes by key, by (sender, nonce) and
+# by hash; a torn last line from a crash is cut off. A resumed run asks the
+# journal what it already did instead of re-sending or re-scanning the chain.
+
+
+def _json_default(value):
+    # Decoded results may hold raw bytes
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return str(value)
+
+
+class TransactionJournal:
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, sync_every=64, sync_interval=0.5):
+        """
+        Parameters:
+        path (str | Path): JSONL file, created if missing.
+        sync_every (int): Records written between two fsyncs at most.
+        sync_interval (float): Seconds between two fsyncs at most, while records keep coming.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._converter = TransactionsConverter()
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._by_nonce = {}
+        self._by_hash = {}
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        valid_size = 0
+        with open(self.path, "rb") as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash; everything after it is dropped
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self._apply(record)
+                valid_size += len(line)
+        if valid_size != self.path.stat().st_size:
+            with open(self.path, "r+b") as journal_file:
+                journal_file.truncate(valid_size)
+
+    def _apply(self, record):
+        entry = self._entries.setdefault(record["key"], {"key": record["key"]})
+        entry.update(record)
+        if entry.get("sender") is not None and entry.get("nonce") is not None:
+            self._by_nonce[(entry["sender"], entry["nonce"])] = record["key"]
+        if entry.get("hash"):
+            self._by_hash[entry["hash"]] = record["key"]
+
+    def record(self, key, state, transaction=None, **fields):
+        """
+        Append a state change for the transaction identified by key.
+
+        Parameters:
+        key (str): Idempotency key of the transaction.
+        state (str): One of STATES.
+        transaction (Transaction | None): Stored in full, e.g. once signed, so it can be re-sent as is.
+        fields: sender, nonce, hash, function, error, values, ...; None values are left out.
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown journal state: {state}")
+        record = {"key": key, "state": state, "ts": round(time.time(), 3)}
+        record.update((name, value) for name, value in fields.items() if value is not None)
+        if transaction is not None:
+            record["tx"] = self._converter.transaction_to_dictionary(transaction)
+        line = json.dumps(record, separators=(",", ":"), default=_json_default) + "\n"
+        with self._lock:
+            self._apply(record)
+            self._file.write(line)
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._synced_at >= self.sync_interval:
+                self._sync()
+
+    def _sync(self):
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def sync(self):
+        # Make everything recorded so far durable, e.g. before sending what was just signed
+        with self._lock:
+            self._sync()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry is not None else None
+
+    def by_hash(self, tx_hash):
+        with self._lock:
+            key = self._by_hash.get(tx_hash)
+            return dict(self._entries[key]) if key is not None else None
+
+    def by_nonce(self, sender, nonce):
+        with self._lock:
+            key = self._by_nonce.get((sender, nonce))
+            return dict(self._entries[key]) if key is not None else None
+
+    def transaction(self, entry):
+        # The signed transaction stored with an entry, ready to be re-sent
+        return self._converter.dictionary_to_transaction(entry["tx"]) if entry.get("tx") else None
+
+    def entries(self, states=None):
+        with self._lock:
+            return [dict(entry) for entry in self._entries.values() if states is None or entry["state"] in states]
+
+    def next_nonce(self, sender):
+        """
+        Returns:
+        int | None: One past the highest nonce this sender has signed, or None if it signed nothing.
+        """
+        with self._lock:
+            nonces = [
+                entry["nonce"] for entry in self._entries.values()
+                if entry.get("sender") == sender and entry["state"] in NONCE_STATES and entry.get("nonce") is not None
+            ]
+        return max(nonces) + 1 if nonces else None
+
+    def record_result(self, result):
+        # Record a tx_tracker.TrackedResult as confirmed or failed
+        entry = self.by_hash(result.tx_hash)
+        if entry is None:
+            return
+        if result.ok:
+            self.record(entry["key"], "confirmed", values=result.values)
+        else:
+            self.record(entry["key"], "failed", error=result.error or result.status)
+
+    def compact(self):
+        """
+        Rewrite the file with one line per key holding its latest state.
+        """
+        temporary_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with self._lock:
+            self._file.close()
+            with open(temporary_path, "w", encoding="utf-8") as compacted:
+                for entry in self._entries.values():
+                    compacted.write(json.dumps(entry, separators=(",", ":"), default=_json_default) + "\n")
+                compacted.flush()
+                os.fsync(compacted.fileno())
+            os.replace(temporary_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._unsynced = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
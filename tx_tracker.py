@@ -0,0 +1,388 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+
+# Waits for many sent transactions at once.
+#
+# Executed transactions are found by walking the final metachain
+# hyperblocks: one request per block lists every transaction notarized in
+# it, however many of those are tracked, so a round costs a network status
+# read plus one request per new block instead of one per pending hash. Only
+# tracked transactions that show up are fetched in full and their smart
+# contract results decoded. A hash the walk has not reported after
+# max_interval_rounds blocks (e.g. executed before the walk started) is also
+# checked on its own through the process-status endpoint, on a backoff that
+# grows by backoff_factor. Without hyperblocks every hash is polled that way,
+# at most max_batch per round, starting one block after it was tracked.
+
+SUCCESS = "success"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+RETURN_CODE_OK = "6f6b"  # "ok"
+DEFAULT_ROUND_DURATION = 6.0
+METACHAIN_ID = 4294967295
+
+# Statuses of hyperblock transactions; anything else is not final yet
+_BLOCK_SUCCESS = ("success", "executed")
+_BLOCK_FAILED = ("fail", "invalid")
+
+
+class TrackedResult:
+    __slots__ = ("tx_hash", "status", "function", "values", "transaction", "error")
+
+    def __init__(self, tx_hash, status, function=None, values=None, transaction=None, error=None):
+        self.tx_hash = tx_hash
+        self.status = status
+        self.function = function
+        self.values = values
+        self.transaction = transaction
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status == SUCCESS
+
+    def __repr__(self):
+        return f"TrackedResult({self.tx_hash!r}, {self.status!r}, values={self.values!r}, error={self.error!r})"
+
+
+class _Pending:
+    __slots__ = ("tx_hash", "function", "callback", "tracked_at", "deadline", "due", "delay")
+
+    def __init__(self, tx_hash, function, callback, tracked_at, deadline, due, delay):
+        self.tx_hash = tx_hash
+        self.tracked_at = tracked_at
+        self.function = function
+        self.callback = callback
+        self.deadline = deadline
+        self.due = due
+        self.delay = delay
+
+
+def _result_parts(transaction):
+    # Smart contract results carry "@<return code>@<value>@..." as their data;
+    # intra-shard calls may report it through a writeLog event instead
+    candidates = [item.data for item in transaction.contract_results.items]
+    for event in transaction.logs.events:
+        if event.identifier == "writeLog" and event.data:
+            candidates.append(event.data.decode(errors="replace"))
+    for data in candidates:
+        if data.startswith("@"):
+            fields = data.split("@")[1:]
+            if fields and fields[0] == RETURN_CODE_OK:
+                return [bytes.fromhex(field) for field in fields[1:]]
+    return None
+
+
+def _failure_reason(transaction):
+    for event in transaction.logs.events:
+        if event.identifier in ("signalError", "internalVMErrors") and len(event.topics) > 1:
+            return event.topics[1].raw.decode(errors="replace")
+    for item in transaction.contract_results.items:
+        if item.return_message:
+            return item.return_message
+    return "transaction failed"
+
+
+class TransactionTracker:
+    def __init__(
+        self,
+        provider,
+        codec=None,
+        round_duration=None,
+        timeout=120,
+        max_batch=100,
+        max_workers=16,
+        backoff_factor=1.5,
+        max_interval_rounds=4,
+        use_hyperblocks=True,
+    ):
+        """
+        Parameters:
+        provider: ProxyNetworkProvider used to poll statuses and fetch transactions.
+        codec (module | None): Generated codec (abi_codegen.load_codec) used to
+            decode the results of contract endpoints.
+        round_duration (float | None): Seconds per block; read from the network config if None.
+        timeout (float): Seconds after track() before a transaction is given up on.
+        max_batch (int): Most hashes (or hyperblocks) polled in one round.
+        max_workers (int): Concurrent gateway requests within a round.
+        use_hyperblocks (bool): Find executed transactions by walking hyperblocks.
+        """
+        self.provider = provider
+        self.codec = codec
+        if round_duration is None:
+            try:
+                round_duration = provider.get_network_config().round_duration / 1000
+            except Exception:
+                round_duration = DEFAULT_ROUND_DURATION
+        self.round_duration = round_duration
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.max_workers = max_workers
+        self.backoff_factor = backoff_factor
+        self.max_interval = max_interval_rounds * round_duration
+        self.use_hyperblocks = use_hyperblocks
+
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._pending = {}
+        # Outcomes kept only for hashes a wait() is blocked on
+        self._waiting = set()
+        self._results = {}
+        self._block_cursor = None
+        self._blocks_behind = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def track(self, tx_hash, function=None, callback=None):
+        """
+        Start tracking a sent transaction.
+
+        Parameters:
+        tx_hash (str): Hash returned by send_transaction(s).
+        function (str | None): Endpoint called, used to decode the results;
+            taken from the transaction itself if None.
+        callback (callable | None): Called with the TrackedResult once resolved.
+        """
+        now = time.monotonic()
+        # With hyperblocks the per-hash check is only a fallback
+        delay = self.max_interval if self.use_hyperblocks else self.round_duration
+        entry = _Pending(tx_hash, function, callback, now, now + self.timeout, now + delay, delay)
+        with self._lock:
+            self._pending[tx_hash] = entry
+
+    def track_many(self, tx_hashes, function=None, callback=None):
+        for tx_hash in tx_hashes:
+            if tx_hash:
+                self.track(tx_hash, function, callback)
+
+    def next_due(self):
+        # Seconds until the next poll is worth doing, None if nothing is pending
+        with self._lock:
+            if not self._pending:
+                return None
+            if self._blocks_behind:
+                return 0.0
+            # Hashes being checked by another thread are due at infinity
+            due = min(entry.due for entry in self._pending.values())
+        return max(0.0, min(due - time.monotonic(), self.round_duration))
+
+    def _decode(self, function, parts):
+        if parts is None:
+            return None
+        decode = getattr(self.codec, f"decode_{function}_output", None) if self.codec else None
+        if decode is not None:
+            return decode(parts)
+        if function == "ESDTNFTCreate" and parts:
+            return int.from_bytes(parts[0], "big")  # nonce of the new NFT
+        return parts
+
+    def _scan_blocks(self):
+        """
+        Walk the final hyperblocks not seen yet, at most max_batch of them.
+
+        Returns:
+        dict: Hash -> hyperblock status of every transaction in those blocks.
+        """
+        if not self._scan_lock.acquire(blocking=False):
+            # Another thread is walking them already
+            return {}
+        found = {}
+        try:
+            final_nonce = self.provider.get_network_status(METACHAIN_ID).highest_final_nonce
+            with self._lock:
+                if self._block_cursor is None:
+                    # Start a little before the oldest tracked transaction was sent
+                    oldest = min((entry.tracked_at for entry in self._pending.values()), default=time.monotonic())
+                    blocks_ago = math.ceil((time.monotonic() - oldest) / self.round_duration) + 1
+                    self._block_cursor = max(0, final_nonce - blocks_ago)
+                first = self._block_cursor + 1
+            nonces = range(first, min(final_nonce, first + self.max_batch - 1) + 1)
+            for block_nonce, hyperblock in zip(nonces, self._executor.map(self.provider.get_hyperblock, nonces)):
+                for transaction in hyperblock.get("transactions") or []:
+                    found[transaction.get("hash")] = transaction.get("status")
+                with self._lock:
+                    self._block_cursor = block_nonce
+            with self._lock:
+                self._blocks_behind = self._block_cursor < final_nonce
+        except Exception as e:
+            instrumentation.increment("tracker_poll_errors")
+            instrumentation.warning("Error walking hyperblocks: %s", e)
+        finally:
+            self._scan_lock.release()
+        return found
+
+    def _fetch(self, entry, block_status):
+        """
+        Returns:
+        tuple | None: (transaction, successful) once executed, None if still pending.
+        """
+        if block_status is None:
+            status = self.provider.get_transaction_status(entry.tx_hash)
+            if not status.is_executed():
+                return None
+            successful = status.is_successful()
+        else:
+            successful = block_status in _BLOCK_SUCCESS
+        return self.provider.get_transaction(entry.tx_hash), successful
+
+    def _result(self, entry, transaction, successful):
+        function = entry.function or transaction.function
+        if successful:
+            values = self._decode(function, _result_parts(transaction))
+            return TrackedResult(entry.tx_hash, SUCCESS, function, values, transaction)
+        return TrackedResult(entry.tx_hash, FAILED, function, None, transaction, _failure_reason(transaction))
+
+    def _resolve_locked(self, entry, outcome, resolved):
+        # outcome: TrackedResult, or the exception raised decoding it
+        self._pending.pop(entry.tx_hash, None)
+        if entry.tx_hash in self._waiting:
+            self._results[entry.tx_hash] = outcome
+        if isinstance(outcome, TrackedResult):
+            resolved.append((entry, outcome))
+
+    def poll_once(self):
+        """
+        Walk new hyperblocks and check the hashes that are due, up to max_batch of them.
+
+        A transaction whose results cannot be decoded is resolved with the
+        RuntimeError as its outcome: wait() raises it for that hash, and it is
+        only logged for hashes nobody waits on.
+
+        Returns:
+        list: TrackedResult for every transaction resolved in this round.
+        """
+        now = time.monotonic()
+        resolved = []
+        with self._lock:
+            for entry in list(self._pending.values()):
+                if entry.deadline <= now:
+                    self._resolve_locked(entry, TrackedResult(entry.tx_hash, TIMEOUT, entry.function, error="timed out"), resolved)
+            pending = bool(self._pending)
+
+        executed = self._scan_blocks() if self.use_hyperblocks and pending else {}
+
+        with self._lock:
+            # Claim the hashes to check so a concurrent poll_once() skips them
+            tasks = []
+            for tx_hash, status in executed.items():
+                entry = self._pending.get(tx_hash)
+                if entry is not None and entry.due != math.inf and status in _BLOCK_SUCCESS + _BLOCK_FAILED:
+                    tasks.append((entry, status))
+            claimed = {entry.tx_hash for entry, _ in tasks}
+            due = sorted(
+                (entry for entry in self._pending.values() if entry.due <= now and entry.tx_hash not in claimed),
+                key=lambda entry: entry.due,
+            )
+            tasks += [(entry, None) for entry in due[:self.max_batch]]
+            for entry, _ in tasks:
+                entry.due = math.inf
+
+        def check(task):
+            entry, block_status = task
+            try:
+                fetched = self._fetch(entry, block_status)
+            except Exception as e:
+                # A gateway error is not a verdict on the transaction; check again later
+                instrumentation.increment("tracker_poll_errors")
+                instrumentation.warning("Error polling transaction %s: %s", entry.tx_hash, e)
+                return None
+            if fetched is None:
+                return None
+            try:
+                return self._result(entry, *fetched)
+            except Exception as e:
+                return RuntimeError(f"Error decoding results of transaction {entry.tx_hash}: {e}")
+
+        checked = list(self._executor.map(check, tasks))
+
+        now = time.monotonic()
+        unclaimed = []
+        with self._lock:
+            for (entry, _), outcome in zip(tasks, checked):
+                if outcome is None:
+                    entry.delay = min(entry.delay * self.backoff_factor, self.max_interval)
+                    entry.due = now + entry.delay
+                    continue
+                if isinstance(outcome, Exception) and entry.tx_hash not in self._waiting:
+                    unclaimed.append(outcome)
+                self._resolve_locked(entry, outcome, resolved)
+
+        for error in unclaimed:
+            instrumentation.increment("tracker_decode_errors")
+            instrumentation.warning("%s", error)
+
+        for entry, result in resolved:
+            # Time from track() until the outcome was known
+            instrumentation.observe_stage("confirm", now - entry.tracked_at, status=result.status)
+            if entry.callback is not None:
+                entry.callback(result)
+        return [result for _, result in resolved]
+
+    def run(self):
+        """
+        Poll until every tracked transaction is resolved, firing callbacks.
+
+        Returns:
+        list: All TrackedResults resolved during the run.
+        """
+        results = []
+        while True:
+            results.extend(self.poll_once())
+            delay = self.next_due()
+            if delay is None:
+                return results
+            time.sleep(delay)
+
+    def wait(self, tx_hash):
+        # Block until one transaction is resolved; other hashes keep being polled too
+        with self._lock:
+            if tx_hash not in self._pending:
+                raise KeyError(f"Transaction {tx_hash} is not tracked")
+            self._waiting.add(tx_hash)
+        try:
+            while True:
+                with self._lock:
+                    outcome = self._results.pop(tx_hash, None)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                if outcome is not None:
+                    return outcome
+                self.poll_once()
+                delay = self.next_due()
+                if delay:
+                    time.sleep(delay)
+        finally:
+            with self._lock:
+                self._waiting.discard(tx_hash)
+                self._results.pop(tx_hash, None)
+
+    async def results(self):
+        """
+        Async iterator over TrackedResults as they resolve, until nothing is pending.
+        Polling runs in a worker thread so the event loop is not blocked.
+        """
+        while True:
+            for result in await asyncio.to_thread(self.poll_once):
+                yield result
+            delay = self.next_due()
+            if delay is None:
+                return
+            await asyncio.sleep(delay)